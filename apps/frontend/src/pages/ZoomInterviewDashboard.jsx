@@ -47,6 +47,9 @@ const ZoomInterviewDashboard = () => {
   const mediaRecorderRef = useRef(null);
   const audioChunksRef = useRef([]);
   const analysisIntervalRef = useRef(null);
+  // Coalesced dashboard state: the merged fields and the version of the last snapshot or delta applied
+  const liveStateRef = useRef({});
+  const stateVersionRef = useRef(0);
 
   // Initialize WebSocket connection
   useEffect(() => {
@@ -57,6 +60,9 @@ const ZoomInterviewDashboard = () => {
 
         websocketRef.current.onopen = () => {
           console.log('WebSocket connected');
+          // Every join starts with a fresh preface (history, state_snapshot)
+          liveStateRef.current = {};
+          stateVersionRef.current = 0;
           setIsConnected(true);
         };
 
@@ -101,6 +107,25 @@ const ZoomInterviewDashboard = () => {
       case 'session_ended':
         handleSessionEnd(data.data);
         break;
+      case 'history':
+        data.data.forEach(handleWebSocketMessage);
+        break;
+      case 'state_snapshot':
+        // Full state: replaces whatever was merged before, including after dropped deltas
+        liveStateRef.current = { ...data.data };
+        stateVersionRef.current = data.version;
+        applyLiveState(data);
+        break;
+      case 'state_delta':
+        if (data.version <= stateVersionRef.current) {
+          break; // already covered by a snapshot
+        }
+        liveStateRef.current = { ...liveStateRef.current, ...data.data };
+        stateVersionRef.current = data.version;
+        applyLiveState(data);
+        break;
+      case 'stream_config':
+        break;
       case 'error':
         console.error('WebSocket error:', data.message);
         break;
@@ -162,6 +187,28 @@ const ZoomInterviewDashboard = () => {
     generateAIFeedback(data);
   };
 
+  const applyLiveState = (message) => {
+    const state = liveStateRef.current;
+    (message.lines || []).forEach(line => {
+      setTranscriptHistory(prev => [...prev, {
+        id: Date.now() + Math.random(),
+        text: line.text,
+        timestamp: line.timestamp,
+        confidence: state.confidence
+      }]);
+      setCurrentTranscript(line.text);
+    });
+    if (state.overall_score !== undefined) {
+      handleAnalysisResult({
+        sentiment_score: 0,
+        confidence_score: 0,
+        stress_level: 0,
+        engagement_score: 0,
+        ...state
+      });
+    }
+  };
+
   const generateAIFeedback = (data) => {
     const feedback = [];
     
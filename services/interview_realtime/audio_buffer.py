@@ -0,0 +1,123 @@
+"""
+Audio Ring Buffer
+Preallocated int16 sample buffer with zero-copy reads and per-sample timestamps
+"""
+
+import bisect
+import logging
+from typing import List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AudioRingBuffer:
+    """Fixed-capacity int16 ring buffer
+
+    Every sample is stored twice, at ``i`` and ``i + capacity``, so any window
+    of up to ``capacity`` samples is one contiguous slice and can be handed out
+    as a memoryview without copying. Positions are absolute sample indices
+    counted from the first write.
+    """
+
+    def __init__(self, capacity: int, sample_rate: int = 16000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self._data = np.zeros(2 * capacity, dtype=np.int16)
+        self.write_index = 0
+        self.read_index = 0
+        self.dropped_samples = 0
+        # Timestamp anchors: the sample at _anchor_indices[i] was recorded at _anchor_times[i]
+        self._anchor_indices: List[int] = []
+        self._anchor_times: List[float] = []
+
+    @classmethod
+    def from_duration(cls, seconds: float, sample_rate: int = 16000) -> "AudioRingBuffer":
+        return cls(int(seconds * sample_rate), sample_rate)
+
+    @property
+    def available(self) -> int:
+        """Samples written but not yet consumed"""
+        return self.write_index - self.read_index
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.available
+
+    def write(self, audio: Union[bytes, np.ndarray], timestamp: Optional[float] = None) -> int:
+        """Append samples, overwriting the oldest unread audio if the buffer is full"""
+        samples = np.frombuffer(audio, dtype=np.int16) if isinstance(audio, (bytes, bytearray, memoryview)) else audio
+        count = samples.size
+        if count == 0:
+            return 0
+
+        if count > self.capacity:
+            skipped = count - self.capacity
+            samples = samples[skipped:]
+            if timestamp is not None:
+                timestamp += skipped / self.sample_rate
+            self.dropped_samples += skipped + self.available
+            self.write_index += skipped
+            self.read_index = self.write_index
+            count = self.capacity
+
+        overflow = count - self.free
+        if overflow > 0:
+            self.dropped_samples += overflow
+            self.read_index += overflow
+            logger.warning(f"Audio ring buffer full, dropped {overflow} samples")
+
+        if timestamp is not None:
+            self._anchor_indices.append(self.write_index)
+            self._anchor_times.append(timestamp)
+
+        position = self.write_index % self.capacity
+        end = position + count
+        self._data[position:end] = samples
+        head = min(end, self.capacity) - position
+        self._data[position + self.capacity:position + self.capacity + head] = samples[:head]
+        if end > self.capacity:
+            self._data[:end - self.capacity] = samples[head:]
+
+        self.write_index += count
+        self._prune_anchors()
+        return count
+
+    def view(self, start: int, end: int) -> memoryview:
+        """Zero-copy byte view of absolute samples [start, end)"""
+        if start < self.write_index - self.capacity or end > self.write_index or start > end:
+            raise IndexError(f"Samples [{start}, {end}) are not in the buffer")
+        position = start % self.capacity
+        return memoryview(self._data[position:position + end - start]).cast("B")
+
+    def peek(self, count: Optional[int] = None) -> memoryview:
+        """Zero-copy view of the oldest unread samples"""
+        count = self.available if count is None else min(count, self.available)
+        return self.view(self.read_index, self.read_index + count)
+
+    def consume(self, count: int):
+        """Mark samples as read"""
+        self.read_index = min(self.write_index, self.read_index + count)
+        self._prune_anchors()
+
+    def timestamp_at(self, index: int) -> float:
+        """Recording time of an absolute sample index"""
+        if not self._anchor_indices:
+            return index / self.sample_rate
+        anchor = max(0, bisect.bisect_right(self._anchor_indices, index) - 1)
+        return self._anchor_times[anchor] + (index - self._anchor_indices[anchor]) / self.sample_rate
+
+    def clear(self):
+        self.read_index = self.write_index
+        self._prune_anchors()
+
+    def _prune_anchors(self):
+        """Drop anchors no longer needed to time any sample still in the buffer"""
+        oldest = max(self.read_index, self.write_index - self.capacity)
+        keep_from = max(0, bisect.bisect_right(self._anchor_indices, oldest) - 1)
+        if keep_from:
+            del self._anchor_indices[:keep_from]
+            del self._anchor_times[:keep_from]
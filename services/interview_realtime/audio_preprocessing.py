@@ -0,0 +1,184 @@
+"""
+Streaming Audio Preprocessing
+Mono downmix, DC removal, polyphase resampling and peak-limited gain, chunk by chunk
+"""
+
+import logging
+import math
+from typing import Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INT16_SCALE = 1.0 / 32768.0
+INT16_MAX_FLOAT = 32767.0 / 32768.0
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler built on a Kaiser-windowed sinc filter bank"""
+
+    def __init__(self, source_rate: int, target_rate: int, taps_per_phase: int = 16,
+                 kaiser_beta: float = 8.0, rolloff: float = 0.9):
+        divisor = math.gcd(source_rate, target_rate)
+        self.up = target_rate // divisor
+        self.down = source_rate // divisor
+        # Keep the filter span constant in output samples when decimating
+        self.taps = int(math.ceil(taps_per_phase * max(1.0, self.down / self.up)))
+
+        length = self.taps * self.up
+        cutoff = rolloff * 0.5 / max(self.up, self.down)
+        t = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(length, kaiser_beta)
+        prototype *= self.up / prototype.sum()
+        # bank[tap, phase] = prototype[phase + tap * up]; one row per tap for the accumulation loop
+        self._bank = np.ascontiguousarray(prototype.reshape(self.taps, self.up), dtype=np.float32)
+
+        self._history = self.taps - 1
+        self._buffer = np.zeros(self._history, dtype=np.float32)
+        self._in_count = 0
+        self._out_count = 0
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def output_length(self, input_length: int) -> int:
+        """Total samples produced after `input_length` input samples"""
+        return -(-input_length * self.up // self.down)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample float32 samples; state carries across calls"""
+        if self.passthrough:
+            return samples
+
+        total = self._history + samples.size
+        if self._buffer.size < total:
+            grown = np.zeros(total, dtype=np.float32)
+            grown[:self._history] = self._buffer[:self._history]
+            self._buffer = grown
+        self._buffer[self._history:total] = samples
+
+        buffer_start = self._in_count - self._history
+        self._in_count += samples.size
+        end = self.output_length(self._in_count)
+        positions = np.arange(self._out_count, end, dtype=np.int64) * self.down
+        self._out_count = end
+
+        # Accumulate tap by tap into preallocated arrays: temporaries stay O(output), never output x taps
+        newest = positions // self.up - buffer_start
+        phases = positions % self.up
+        output = np.zeros(positions.size, dtype=np.float32)
+        samples_at = np.empty(positions.size, dtype=np.float32)
+        coefficients = np.empty(positions.size, dtype=np.float32)
+        for tap_bank in self._bank:
+            np.take(self._buffer, newest, out=samples_at)
+            np.take(tap_bank, phases, out=coefficients)
+            samples_at *= coefficients
+            output += samples_at
+            newest -= 1
+
+        self._buffer[:self._history] = self._buffer[total - self._history:total]
+        return output
+
+
+class StreamingPreprocessor:
+    """Converts arbitrary int16 PCM into normalized 16 kHz mono, one chunk at a time
+
+    Gain follows a peak envelope with instant attack and exponential release,
+    capped at ``max_gain`` so silence is never divided by zero, and the output
+    is hard-limited to int16 range.
+    """
+
+    def __init__(
+        self,
+        source_rate: int = 16000,
+        channels: int = 1,
+        target_rate: int = 16000,
+        target_peak: float = 0.5,
+        max_gain: float = 4.0,
+        release_seconds: float = 1.0,
+        dc_seconds: float = 0.5,
+    ):
+        self.source_rate = source_rate
+        self.channels = channels
+        self.target_rate = target_rate
+        self.target_peak = target_peak
+        self.max_gain = max_gain
+        self.release_seconds = release_seconds
+        self.dc_seconds = dc_seconds
+
+        self._resampler = PolyphaseResampler(source_rate, target_rate)
+        self._work = np.empty(0, dtype=np.float32)
+        self._remainder = np.empty(0, dtype=np.int16)
+        self._byte_remainder = b""
+        self._dc_offset = 0.0
+        self._envelope = 0.0
+        self._gain = 1.0
+
+    def output_length(self, input_frames: int) -> int:
+        return self._resampler.output_length(input_frames)
+
+    def process(self, audio: Union[bytes, memoryview, np.ndarray]) -> np.ndarray:
+        """Process interleaved int16 PCM and return int16 mono at the target rate"""
+        if isinstance(audio, np.ndarray):
+            samples = audio
+        else:
+            data = self._byte_remainder + bytes(audio) if self._byte_remainder else audio
+            usable = len(data) - (len(data) % 2)
+            self._byte_remainder = bytes(data[usable:])
+            samples = np.frombuffer(data, dtype=np.int16, count=usable // 2)
+        if self._remainder.size:
+            samples = np.concatenate((self._remainder, samples))
+
+        frames = samples.size // self.channels
+        self._remainder = samples[frames * self.channels:].copy()
+        if frames == 0:
+            return np.empty(0, dtype=np.int16)
+
+        mono = self._mono_float(samples[:frames * self.channels], frames)
+        self._remove_dc(mono)
+        resampled = self._resampler.process(mono)
+        self._apply_gain(resampled)
+
+        np.multiply(resampled, 32768.0, out=resampled)
+        return resampled.astype(np.int16)
+
+    def _mono_float(self, samples: np.ndarray, frames: int) -> np.ndarray:
+        """Downmix into the reusable float32 work buffer, scaled to [-1, 1)"""
+        if self._work.size < frames:
+            self._work = np.empty(frames, dtype=np.float32)
+        mono = self._work[:frames]
+
+        if self.channels == 1:
+            np.multiply(samples, INT16_SCALE, out=mono)
+        else:
+            np.mean(samples.reshape(frames, self.channels), axis=1, dtype=np.float32, out=mono)
+            mono *= INT16_SCALE
+        return mono
+
+    def _remove_dc(self, mono: np.ndarray):
+        """Subtract a slowly tracking per-block DC estimate in place"""
+        coefficient = 1.0 - math.exp(-mono.size / (self.dc_seconds * self.source_rate))
+        self._dc_offset += coefficient * (float(mono.mean()) - self._dc_offset)
+        mono -= self._dc_offset
+
+    def _apply_gain(self, samples: np.ndarray):
+        """Peak-envelope gain normalization followed by a hard limiter, in place"""
+        if samples.size == 0:
+            return
+
+        peak = max(float(samples.max()), -float(samples.min()))
+        decay = math.exp(-samples.size / (self.release_seconds * self.target_rate))
+        self._envelope = max(peak, self._envelope * decay)
+        target_gain = min(self.max_gain, self.target_peak / max(self._envelope, 1e-6))
+
+        if target_gain < self._gain:
+            # Attack: drop immediately so the loud chunk is not over-amplified
+            samples *= target_gain
+        else:
+            # Release: ramp up across the chunk to avoid zipper noise
+            samples *= np.linspace(self._gain, target_gain, samples.size, dtype=np.float32)
+        self._gain = target_gain
+
+        np.clip(samples, -1.0, INT16_MAX_FLOAT, out=samples)
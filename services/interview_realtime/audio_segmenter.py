@@ -0,0 +1,188 @@
+"""
+Voice Activity Segmentation
+Splits 16-bit PCM audio into utterance-sized segments using frame energy
+"""
+
+import logging
+from collections import deque
+from typing import Deque, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+INT16_FULL_SCALE = 32768.0
+
+
+class AudioSegment(BaseModel):
+    pcm: bytes
+    start_time: float
+    end_time: float
+    sample_rate: int = 16000
+
+    @property
+    def duration(self) -> float:
+        return self.end_time - self.start_time
+
+
+class VoiceActivitySegmenter:
+    """Energy-based voice activity detector emitting utterance segments
+
+    Segments are padded by ``padding_ms`` on both sides, force-split at
+    ``max_segment_ms``, and dropped when they hold less than
+    ``min_segment_ms`` of voiced audio.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        energy_threshold_db: float = -45.0,
+        noise_margin_db: float = 10.0,
+        min_segment_ms: int = 300,
+        max_segment_ms: int = 15000,
+        padding_ms: int = 300,
+        start_time: float = 0.0,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_samples = max(1, int(sample_rate * frame_ms / 1000))
+        self.frame_duration = self.frame_samples / sample_rate
+        self.energy_threshold_db = energy_threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.min_voiced_frames = max(1, int(round(min_segment_ms / 1000 / self.frame_duration)))
+        self.max_segment_frames = max(1, int(max_segment_ms / 1000 / self.frame_duration))
+        self.padding_frames = max(0, int(round(padding_ms / 1000 / self.frame_duration)))
+        self.start_time = start_time
+
+        self.segments_emitted = 0
+        self.segments_dropped = 0
+        self.reset()
+
+    def reset(self):
+        """Discard all buffered audio and detector state"""
+        self._byte_remainder = b""
+        self._sample_remainder = np.empty(0, dtype=np.int16)
+        self._frames_seen = 0
+        self._noise_floor_db = self.energy_threshold_db - self.noise_margin_db
+        self._preroll: Deque[np.ndarray] = deque(maxlen=self.padding_frames or 1)
+        self._segment_frames: List[np.ndarray] = []
+        self._segment_start_frame = 0
+        self._voiced_frames = 0
+        self._silence_run = 0
+        self._in_speech = False
+
+    def feed(self, audio_data: bytes) -> List[AudioSegment]:
+        """Add PCM bytes and return any segments completed by them"""
+        data = self._byte_remainder + bytes(audio_data)
+        usable = len(data) - (len(data) % 2)
+        self._byte_remainder = data[usable:]
+        return self.feed_samples(np.frombuffer(data[:usable], dtype=np.int16))
+
+    def feed_samples(self, samples: np.ndarray) -> List[AudioSegment]:
+        """Add int16 samples and return any segments completed by them"""
+        if self._sample_remainder.size:
+            samples = np.concatenate((self._sample_remainder, samples))
+
+        frame_count = samples.size // self.frame_samples
+        framed_size = frame_count * self.frame_samples
+        self._sample_remainder = samples[framed_size:].copy()
+        if frame_count == 0:
+            return []
+
+        frames = samples[:framed_size].reshape(frame_count, self.frame_samples)
+        energies_db = self._frame_energies_db(frames)
+
+        completed = []
+        for frame, energy_db in zip(frames, energies_db):
+            segment = self._process_frame(frame, float(energy_db))
+            if segment is not None:
+                completed.append(segment)
+            self._frames_seen += 1
+
+        return completed
+
+    def flush(self) -> List[AudioSegment]:
+        """Close any open segment at end of stream"""
+        completed = []
+        if self._in_speech:
+            segment = self._close_segment()
+            if segment is not None:
+                completed.append(segment)
+        self._preroll.clear()
+        self._sample_remainder = np.empty(0, dtype=np.int16)
+        self._byte_remainder = b""
+        return completed
+
+    def pending_segment(self) -> Optional[AudioSegment]:
+        """Snapshot of the utterance currently being accumulated, if any"""
+        if not self._in_speech or not self._segment_frames:
+            return None
+        return self._build_segment()
+
+    def _frame_energies_db(self, frames: np.ndarray) -> np.ndarray:
+        """Mean-square energy of each frame in dBFS"""
+        as_float = frames.astype(np.float32)
+        energies = np.einsum("ij,ij->i", as_float, as_float) / (self.frame_samples * INT16_FULL_SCALE ** 2)
+        return 10.0 * np.log10(energies + 1e-12)
+
+    def _process_frame(self, frame: np.ndarray, energy_db: float) -> Optional[AudioSegment]:
+        """Advance the detector state machine by one frame"""
+        threshold_db = max(self.energy_threshold_db, self._noise_floor_db + self.noise_margin_db)
+        voiced = energy_db > threshold_db
+        if not voiced:
+            # Speech must not pull the floor up, or a long answer would end up below the threshold
+            self._track_noise_floor(energy_db)
+
+        if not self._in_speech:
+            if voiced:
+                self._in_speech = True
+                self._segment_frames = list(self._preroll) + [frame]
+                self._segment_start_frame = self._frames_seen - len(self._preroll)
+                self._voiced_frames = 1
+                self._silence_run = 0
+                self._preroll.clear()
+            elif self.padding_frames:
+                self._preroll.append(frame)
+            return None
+
+        self._segment_frames.append(frame)
+        if voiced:
+            self._voiced_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        if self._silence_run >= max(1, self.padding_frames) or len(self._segment_frames) >= self.max_segment_frames:
+            return self._close_segment()
+        return None
+
+    def _track_noise_floor(self, energy_db: float):
+        """Follow the background level on unvoiced frames: fall immediately, rise slowly"""
+        if energy_db < self._noise_floor_db:
+            self._noise_floor_db = energy_db
+        else:
+            self._noise_floor_db += 0.005 * (energy_db - self._noise_floor_db)
+
+    def _close_segment(self) -> Optional[AudioSegment]:
+        segment = self._build_segment() if self._voiced_frames >= self.min_voiced_frames else None
+        if segment is None:
+            self.segments_dropped += 1
+        else:
+            self.segments_emitted += 1
+
+        self._in_speech = False
+        self._segment_frames = []
+        self._voiced_frames = 0
+        self._silence_run = 0
+        return segment
+
+    def _build_segment(self) -> AudioSegment:
+        start_time = self.start_time + self._segment_start_frame * self.frame_duration
+        end_time = start_time + len(self._segment_frames) * self.frame_duration
+        return AudioSegment(
+            pcm=np.concatenate(self._segment_frames).tobytes(),
+            start_time=start_time,
+            end_time=end_time,
+            sample_rate=self.sample_rate,
+        )
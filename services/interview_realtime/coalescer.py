@@ -0,0 +1,165 @@
+"""
+Dashboard Update Coalescing
+Merges high-frequency analysis updates into a per-session snapshot and flushes deltas at a fixed rate
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from fanout import FanoutHub
+
+logger = logging.getLogger(__name__)
+
+# Message types merged into the snapshot; everything else is passed straight through
+COALESCED_TYPES = ("analysis_result", "transcription_result")
+
+# Passed-through types where a newer message fully supersedes a queued one, so a
+# full viewer queue may replace rather than drop them
+SNAPSHOT_TYPES = ("state_snapshot", "stream_config")
+
+# Transcript lines carried in one delta before older ones are summarized away
+MAX_LINES_PER_DELTA = 50
+
+
+class _SessionState:
+    __slots__ = ("rate_hz", "snapshot", "sent", "lines", "updates", "version", "sequence", "next_flush")
+
+    def __init__(self, rate_hz: float):
+        self.rate_hz = rate_hz
+        self.snapshot: Dict[str, Any] = {}
+        self.sent: Dict[str, Any] = {}
+        self.lines: List[dict] = []
+        self.updates = 0
+        self.version = 0
+        self.sequence: Any = None
+        self.next_flush = 0.0
+
+
+class SessionCoalescer:
+    """Latest-state snapshot per session, published as deltas at ``rate_hz``
+
+    Each analysis or transcription result is merged into the snapshot;
+    every ``1 / rate_hz`` seconds the fields that changed since the last
+    flush go out as one ``state_delta`` message together with the
+    transcript lines received in between. Viewers that dropped a message
+    get the flush as a full ``state_snapshot`` instead, so a slow viewer
+    converges on the latest state. Sessions without a rate pass messages
+    through unchanged.
+    """
+
+    def __init__(self, hub: FanoutHub, default_rate_hz: float = 0.0, tick_seconds: float = 0.02):
+        self.hub = hub
+        self.default_rate_hz = default_rate_hz
+        self.tick_seconds = tick_seconds
+        self._sessions: Dict[str, _SessionState] = {}
+        self._rates: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, session_id: str, rate_hz: Optional[float]):
+        """Set a session's flush rate; 0 turns coalescing off, None restores the default"""
+        if rate_hz is None:
+            self._rates.pop(session_id, None)
+        else:
+            self._rates[session_id] = max(0.0, rate_hz)
+
+        state = self._sessions.get(session_id)
+        if state is not None:
+            if self.rate_for(session_id) > 0:
+                state.rate_hz = self.rate_for(session_id)
+            else:
+                self._flush(session_id, state)
+                del self._sessions[session_id]
+
+    def rate_for(self, session_id: str) -> float:
+        return self._rates.get(session_id, self.default_rate_hz)
+
+    def is_coalescing(self, session_id: str) -> bool:
+        return self.rate_for(session_id) > 0
+
+    def publish(self, session_id: str, message: dict, sequence: Any = None):
+        """Route a message: merge it if the session coalesces, otherwise send it now"""
+        if not self.is_coalescing(session_id):
+            coalesce_key = message.get("type") if message.get("type") in SNAPSHOT_TYPES else None
+            self.hub.publish(session_id, message, coalesce_key=coalesce_key, sequence=sequence)
+            return
+
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = _SessionState(self.rate_for(session_id))
+
+        if message.get("type") not in COALESCED_TYPES:
+            # Control messages keep their order relative to pending updates
+            self._flush(session_id, state)
+            self.hub.publish(session_id, message, sequence=sequence)
+            return
+
+        data = message.get("data", {})
+        state.snapshot.update(data)
+        if data.get("text"):
+            state.lines.append({"timestamp": data.get("timestamp"), "text": data["text"]})
+        state.updates += 1
+        if sequence is not None:
+            state.sequence = sequence
+
+    def snapshot(self, session_id: str) -> Optional[dict]:
+        """Full latest state, for viewers that join mid-session"""
+        state = self._sessions.get(session_id)
+        if state is None:
+            return None
+        return {"type": "state_snapshot", "version": state.version, "data": dict(state.snapshot)}
+
+    def discard(self, session_id: str):
+        self._sessions.pop(session_id, None)
+        self._rates.pop(session_id, None)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for session_id, state in list(self._sessions.items()):
+            self._flush(session_id, state)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            now = time.monotonic()
+            for session_id, state in list(self._sessions.items()):
+                if now >= state.next_flush:
+                    self._flush(session_id, state)
+                    state.next_flush = now + 1.0 / state.rate_hz
+                if self.hub.connection_count(session_id) == 0 and not state.updates:
+                    # Nobody is watching on this worker; rebuild from the next update
+                    del self._sessions[session_id]
+
+    def _flush(self, session_id: str, state: _SessionState):
+        if not state.updates:
+            return
+
+        changed = {key: value for key, value in state.snapshot.items() if state.sent.get(key) != value}
+        lines = state.lines[-MAX_LINES_PER_DELTA:]
+        state.version += 1
+        message = {
+            "type": "state_delta",
+            "version": state.version,
+            "data": changed,
+            "lines": lines,
+            "skipped_lines": len(state.lines) - len(lines),
+            "updates": state.updates,
+        }
+        # Deltas build on each other: viewers that lost one resync from the full state
+        resync = dict(message, type="state_snapshot", data=dict(state.snapshot))
+        self.hub.publish(session_id, message, sequence=state.sequence, resync=resync, resync_key="state_snapshot")
+
+        state.sent = dict(state.snapshot)
+        state.lines = []
+        state.updates = 0
@@ -0,0 +1,524 @@
+"""
+Interview Event Log
+Per-session Redis Streams of transcription and analysis events, read by consumer groups
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from redis.exceptions import ResponseError
+
+from score_calculator import InterviewScore, ScoreMetrics
+from zoom_listener import ACTIVE_SESSION_TTL, COMPLETED_SESSION_TTL
+
+if TYPE_CHECKING:  # the analyzer loads NLP models; the log only passes its results through
+    from analyzer import AnalysisResult, RealTimeAnalyzer
+
+logger = logging.getLogger(__name__)
+
+STREAM_PREFIX = "zoom_events"
+SESSION_INDEX_KEY = "zoom_events:sessions"
+REPORT_PREFIX = "zoom_report"
+# Kept beside the stream so MAXLEN trimming never loses them
+META_PREFIX = "zoom_events_meta"
+SCORES_PREFIX = "zoom_events_scores"
+
+# Event types
+SESSION_STARTED = "session_started"
+TRANSCRIPTION = "transcription"
+ANALYSIS_RESULT = "analysis_result"
+SESSION_ENDED = "session_ended"
+STREAM_CONFIG = "stream_config"
+
+# Shared consumer groups; fan-out groups are per worker
+SCORING_GROUP = "scoring"
+REPORT_GROUP = "report_builder"
+
+
+def id_key(entry_id: str) -> Tuple[int, int]:
+    """Sortable form of a stream entry id ("<ms>-<seq>")"""
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+# ----------------------
+# Event log
+# ----------------------
+class InterviewEvent:
+    __slots__ = ("id", "session_id", "type", "data")
+
+    def __init__(self, entry_id: str, session_id: str, event_type: str, data: dict):
+        self.id = entry_id
+        self.session_id = session_id
+        self.type = event_type
+        self.data = data
+
+    @classmethod
+    def from_entry(cls, session_id: str, entry_id: str, fields: Dict[str, str]) -> "InterviewEvent":
+        return cls(entry_id, session_id, fields.get("type", ""), json.loads(fields.get("data", "{}")))
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "session_id": self.session_id, "type": self.type, "data": self.data}
+
+
+class InterviewEventLog:
+    """Append-only per-session event streams
+
+    Every transcription and analysis result is XADDed to ``zoom_events:{id}``
+    (capped at ``maxlen``). Consumers read through consumer groups, so any
+    worker can score, fan out or build reports, and the full history can be
+    replayed for viewers that join late.
+
+    What must outlive trimming is written alongside in the same transaction:
+    the session_started data and the score of every analysis result, so
+    loading a session's score reads one list instead of replaying the stream.
+    """
+
+    def __init__(self, client, maxlen: int = 10000):
+        self.client = client
+        self.maxlen = maxlen
+
+    @staticmethod
+    def stream_key(session_id: str) -> str:
+        return f"{STREAM_PREFIX}:{session_id}"
+
+    @staticmethod
+    def session_id_from_key(stream_key: str) -> str:
+        return stream_key[len(STREAM_PREFIX) + 1:]
+
+    def _keys(self, session_id: str) -> Tuple[str, str, str]:
+        return (self.stream_key(session_id), f"{META_PREFIX}:{session_id}", f"{SCORES_PREFIX}:{session_id}")
+
+    async def append(self, session_id: str, event_type: str, data: dict, ttl: int = ACTIVE_SESSION_TTL) -> str:
+        """Append one event and return its stream id"""
+        key, meta_key, scores_key = self._keys(session_id)
+        pipe = self.client.pipeline()
+        pipe.xadd(key, {"type": event_type, "data": json.dumps(data)}, maxlen=self.maxlen, approximate=True)
+        if event_type == SESSION_STARTED:
+            pipe.set(meta_key, json.dumps(data))
+        elif event_type == ANALYSIS_RESULT and data.get("score"):
+            pipe.rpush(scores_key, json.dumps(data["score"]))
+        pipe.sadd(SESSION_INDEX_KEY, session_id)
+        for name in (key, meta_key, scores_key):
+            pipe.expire(name, ttl)
+        return pipe.execute()[0]
+
+    async def replay(self, session_id: str, start: str = "-", end: str = "+",
+                     types: Optional[Iterable[str]] = None) -> List[InterviewEvent]:
+        """Read the stored events of a session in order"""
+        wanted = set(types) if types is not None else None
+        events = []
+        for entry_id, fields in self.client.xrange(self.stream_key(session_id), start, end):
+            event = InterviewEvent.from_entry(session_id, entry_id, fields)
+            if wanted is None or event.type in wanted:
+                events.append(event)
+        return events
+
+    async def last_id(self, session_id: str) -> str:
+        latest = self.client.xrevrange(self.stream_key(session_id), count=1)
+        return latest[0][0] if latest else "0-0"
+
+    async def session_ids(self) -> Set[str]:
+        return set(self.client.smembers(SESSION_INDEX_KEY))
+
+    async def job_requirements(self, session_id: str) -> List[str]:
+        """Requirements recorded by the session_started event, if any"""
+        stored = self.client.get(self._keys(session_id)[1])
+        return json.loads(stored).get("job_requirements", []) if stored else []
+
+    async def load_score(self, session_id: str) -> Optional[InterviewScore]:
+        """A session's InterviewScore from its stored metadata and score history"""
+        _key, meta_key, scores_key = self._keys(session_id)
+        pipe = self.client.pipeline()
+        pipe.get(meta_key)
+        pipe.lrange(scores_key, 0, -1)
+        meta, scores = pipe.execute()
+        if meta is None and not scores:
+            return None
+
+        score = InterviewScore()
+        score.set_job_requirements(json.loads(meta).get("job_requirements", []) if meta else [])
+        score.score_history = [ScoreMetrics(**json.loads(stored)) for stored in scores]
+        return score
+
+    async def get_report(self, session_id: str) -> Optional[dict]:
+        stored = self.client.get(f"{REPORT_PREFIX}:{session_id}")
+        return json.loads(stored) if stored else None
+
+    async def finish_session(self, session_id: str):
+        """Shorten retention once a session is over and stop polling its stream"""
+        pipe = self.client.pipeline()
+        for name in self._keys(session_id):
+            pipe.expire(name, COMPLETED_SESSION_TTL)
+        pipe.srem(SESSION_INDEX_KEY, session_id)
+        pipe.execute()
+
+    # Consumer groups
+    def ensure_group(self, session_id: str, group: str, start_id: str = "0", mkstream: bool = False) -> bool:
+        """Create a consumer group on an existing stream; False if the stream is gone"""
+        try:
+            self.client.xgroup_create(self.stream_key(session_id), group, id=start_id, mkstream=mkstream)
+        except ResponseError as e:
+            if "BUSYGROUP" in str(e):
+                return True
+            if not self.client.exists(self.stream_key(session_id)):
+                return False
+            raise
+        return True
+
+    def group_consumed(self, session_id: str, group: str, entry_id: str) -> bool:
+        """Whether ``group`` has read and acknowledged every event up to ``entry_id``"""
+        key = self.stream_key(session_id)
+        try:
+            info = next((g for g in self.client.xinfo_groups(key) if g["name"] == group), None)
+        except ResponseError:
+            return False
+        if info is None or id_key(info["last-delivered-id"]) < id_key(entry_id):
+            return False
+        return not self.client.xpending_range(key, group, min="-", max=entry_id, count=1)
+
+    async def wait_for_group(self, session_id: str, group: str, entry_id: str,
+                             timeout: float = 10.0, poll_interval: float = 0.1) -> bool:
+        """Wait until ``group`` has consumed up to ``entry_id``; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while not self.group_consumed(session_id, group, entry_id):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(poll_interval)
+        return True
+
+    def destroy_group(self, session_id: str, group: str):
+        try:
+            self.client.xgroup_destroy(self.stream_key(session_id), group)
+        except ResponseError:
+            pass
+
+    async def read_group(self, group: str, consumer: str, session_ids: Iterable[str],
+                         count: int = 100, block_ms: int = 1000) -> List[InterviewEvent]:
+        """Next undelivered events for this group across the given sessions
+
+        The blocking read runs in a thread so the event loop keeps serving.
+        """
+        streams = {self.stream_key(session_id): ">" for session_id in session_ids}
+        if not streams:
+            await asyncio.sleep(block_ms / 1000)
+            return []
+
+        response = await asyncio.to_thread(
+            self.client.xreadgroup, group, consumer, streams, count=count, block=block_ms
+        )
+        return [
+            InterviewEvent.from_entry(self.session_id_from_key(key), entry_id, fields)
+            for key, entries in response or []
+            for entry_id, fields in entries
+            if fields
+        ]
+
+    async def claim_stale(self, group: str, consumer: str, session_ids: Iterable[str],
+                          min_idle_ms: int = 30000) -> List[InterviewEvent]:
+        """Take over events delivered to consumers that died before acknowledging them"""
+        claimed = []
+        for session_id in session_ids:
+            response = self.client.xautoclaim(self.stream_key(session_id), group, consumer, min_idle_ms)
+            claimed.extend(
+                InterviewEvent.from_entry(session_id, entry_id, fields)
+                for entry_id, fields in response[1]
+                if fields
+            )
+        return claimed
+
+    def ack(self, event: InterviewEvent, group: str):
+        self.client.xack(self.stream_key(event.session_id), group, event.id)
+
+
+# ----------------------
+# Consumers
+# ----------------------
+class EventConsumer(ABC):
+    """Consumer-group read loop; subclasses implement `handle`
+
+    An event is acknowledged once `handle` returns. If it raises, the event
+    stays pending and is claimed again after ``claim_interval``, up to
+    ``max_deliveries`` attempts by this worker before it is logged and dropped.
+    """
+
+    group = "base"
+    claim_interval = 30.0
+    max_deliveries = 5
+
+    def __init__(self, event_log: InterviewEventLog, consumer_name: Optional[str] = None,
+                 batch_size: int = 100, block_ms: int = 1000):
+        self.event_log = event_log
+        self.consumer_name = consumer_name or worker_name()
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self._grouped: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._last_claim = 0.0
+        self._failures: Dict[str, int] = {}
+
+    @abstractmethod
+    async def handle(self, event: InterviewEvent):
+        """Process one event; raising leaves it pending for redelivery"""
+
+    async def session_ids(self) -> Set[str]:
+        """Sessions whose streams this consumer reads"""
+        return await self.event_log.session_ids()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self):
+        while True:
+            try:
+                sessions = await self._ready_sessions()
+                events = await self.event_log.read_group(
+                    self.group, self.consumer_name, sessions, count=self.batch_size, block_ms=self.block_ms
+                )
+                if sessions and time.monotonic() - self._last_claim > self.claim_interval:
+                    self._last_claim = time.monotonic()
+                    events.extend(await self.event_log.claim_stale(self.group, self.consumer_name, sessions))
+                for event in events:
+                    await self._dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except ResponseError as e:
+                # A stream expired under us; re-validate groups on the next pass
+                logger.warning(f"{self.group} consumer read failed: {e}")
+                self._grouped.clear()
+            except Exception as e:
+                logger.error(f"{self.group} consumer error: {e}")
+                await asyncio.sleep(1.0)
+
+    async def _ready_sessions(self) -> List[str]:
+        sessions = await self.session_ids()
+        self._grouped &= sessions
+        for session_id in sessions - self._grouped:
+            if self.event_log.ensure_group(session_id, self.group, self.group_start_id()):
+                self._grouped.add(session_id)
+        return sorted(self._grouped)
+
+    def group_start_id(self) -> str:
+        return "0"
+
+    async def _dispatch(self, event: InterviewEvent):
+        try:
+            await self.handle(event)
+        except Exception as e:
+            attempts = self._failures.get(event.id, 0) + 1
+            if attempts < self.max_deliveries:
+                self._failures[event.id] = attempts
+                logger.warning(f"{self.group} consumer failed on event {event.id} of session {event.session_id} "
+                               f"(attempt {attempts}), leaving it pending: {e}")
+                return
+            logger.error(f"{self.group} consumer giving up on event {event.id} of session {event.session_id} "
+                         f"after {attempts} attempts: {e}")
+        self._failures.pop(event.id, None)
+        self.event_log.ack(event, self.group)
+
+
+class ScoringConsumer(EventConsumer):
+    """Analyzes and scores transcription events, appending analysis_result events
+
+    Scoring only depends on the analysis and the session's job requirements,
+    so events can be handled by whichever worker reads them.
+    """
+
+    group = SCORING_GROUP
+
+    def __init__(self, event_log: InterviewEventLog, analyzer: "RealTimeAnalyzer", **kwargs):
+        super().__init__(event_log, **kwargs)
+        self.analyzer = analyzer
+        self._scorers: Dict[str, InterviewScore] = {}
+
+    async def handle(self, event: InterviewEvent):
+        if event.type == SESSION_ENDED:
+            self._scorers.pop(event.session_id, None)
+            return
+        if event.type != TRANSCRIPTION:
+            return
+
+        text = event.data.get("text", "")
+        if not text.strip():
+            return
+        timestamp = event.data.get("timestamp", 0.0)
+
+        analysis_result = await self.analyzer.analyze_text(text, timestamp)
+        scorer = await self._scorer(event.session_id)
+        score_metrics = scorer.calculate_real_time_score(analysis_result, record=False)
+
+        await self.event_log.append(event.session_id, ANALYSIS_RESULT, analysis_event_data(
+            analysis_result, score_metrics,
+            source=event.data.get("source", "text"),
+            confidence=event.data.get("confidence")
+        ))
+
+    async def _ready_sessions(self) -> List[str]:
+        sessions = await super()._ready_sessions()
+        for session_id in set(self._scorers) - set(sessions):
+            del self._scorers[session_id]
+        return sessions
+
+    async def _scorer(self, session_id: str) -> InterviewScore:
+        if session_id not in self._scorers:
+            scorer = InterviewScore()
+            scorer.set_job_requirements(await self.event_log.job_requirements(session_id))
+            self._scorers[session_id] = scorer
+        return self._scorers[session_id]
+
+
+class ReportBuilderConsumer(EventConsumer):
+    """Builds the final report when a session_ended event arrives
+
+    The scoring group reads the same stream independently, so the report
+    waits until it has consumed everything up to the session_ended event;
+    otherwise late transcriptions would be missing from the report.
+    """
+
+    group = REPORT_GROUP
+    scoring_timeout = 10.0
+
+    async def handle(self, event: InterviewEvent):
+        if event.type != SESSION_ENDED:
+            return
+        if not await self.event_log.wait_for_group(event.session_id, SCORING_GROUP, event.id, self.scoring_timeout):
+            # Left pending; the report is retried once the event is claimed again
+            raise RuntimeError(f"scoring has not reached {event.id} yet")
+
+        score = await self.event_log.load_score(event.session_id) or InterviewScore()
+        report = {
+            "session_id": event.session_id,
+            "generated_at": datetime.now().isoformat(),
+            "performance_summary": score.get_performance_summary(),
+            "trend": score.get_score_trend(),
+            "score_history": [metrics.dict() for metrics in score.score_history],
+        }
+        self.event_log.client.setex(f"{REPORT_PREFIX}:{event.session_id}", COMPLETED_SESSION_TTL, json.dumps(report))
+        await self.event_log.finish_session(event.session_id)
+        logger.info(f"Report built for session {event.session_id}")
+
+
+class BroadcastConsumer(EventConsumer):
+    """Per-worker fan-out: every worker gets its own group and sees every event
+
+    Only streams with a viewer connected to this worker are read.
+    """
+
+    def __init__(self, event_log: InterviewEventLog,
+                 deliver: Callable[[InterviewEvent], Awaitable[None]],
+                 connected_sessions: Callable[[], Iterable[str]], **kwargs):
+        super().__init__(event_log, **kwargs)
+        self.group = f"fanout:{self.consumer_name}"
+        self.deliver = deliver
+        self.connected_sessions = connected_sessions
+
+    async def session_ids(self) -> Set[str]:
+        return set(self.connected_sessions())
+
+    def group_start_id(self) -> str:
+        # Late joiners get history through replay; the group only delivers new events
+        return "$"
+
+    async def attach(self, session_id: str) -> str:
+        """Start following a session and return the id up to which history must be replayed
+
+        The group is positioned at that id before returning, so nothing
+        appended between the replay and the first group read is lost.
+        """
+        last_id = await self.event_log.last_id(session_id)
+        self.event_log.ensure_group(session_id, self.group, last_id, mkstream=True)
+        self._grouped.add(session_id)
+        return last_id
+
+    async def handle(self, event: InterviewEvent):
+        await self.deliver(event)
+
+    async def _ready_sessions(self) -> List[str]:
+        previous = set(self._grouped)
+        sessions = await super()._ready_sessions()
+        for session_id in previous - set(sessions):
+            self.event_log.destroy_group(session_id, self.group)
+        return sessions
+
+    async def stop(self):
+        await super().stop()
+        for session_id in self._grouped:
+            self.event_log.destroy_group(session_id, self.group)
+        self._grouped.clear()
+
+
+def analysis_event_data(analysis_result: "AnalysisResult", score_metrics: ScoreMetrics,
+                        source: str = "text", confidence: Optional[float] = None) -> dict:
+    data = {
+        "source": source,
+        "timestamp": analysis_result.timestamp,
+        "text": analysis_result.text,
+        "analysis": analysis_result.dict(),
+        "score": score_metrics.dict(),
+    }
+    if confidence is not None:
+        data["confidence"] = confidence
+    return data
+
+
+def event_to_message(event: InterviewEvent) -> Optional[dict]:
+    """Websocket message for an event, or None if viewers don't see it"""
+    data = event.data
+    if event.type == ANALYSIS_RESULT:
+        analysis = data["analysis"]
+        score = data["score"]
+        if data.get("source") == "audio":
+            return {
+                "type": "transcription_result",
+                "data": {
+                    "timestamp": data["timestamp"],
+                    "text": data["text"],
+                    "confidence": data.get("confidence", 0.0),
+                    "sentiment_score": analysis["sentiment_score"],
+                    "emotion_scores": analysis["emotion_scores"],
+                    "overall_score": score["overall_score"],
+                    "stress_level": score["stress_level"]
+                }
+            }
+        return {
+            "type": "analysis_result",
+            "data": {
+                "timestamp": data["timestamp"],
+                "text": data["text"],
+                "sentiment_score": analysis["sentiment_score"],
+                "emotion_scores": analysis["emotion_scores"],
+                "confidence_score": analysis["confidence_score"],
+                "keywords": analysis["keywords"],
+                "technical_skills": analysis["technical_skills"],
+                "overall_score": score["overall_score"],
+                "stress_level": score["stress_level"],
+                "engagement_score": score["engagement_score"]
+            }
+        }
+    if event.type == SESSION_ENDED:
+        return {"type": "session_ended", "data": data}
+    if event.type == STREAM_CONFIG:
+        return {"type": "stream_config", "data": data}
+    return None
+
@@ -0,0 +1,264 @@
+"""
+Websocket Fan-out
+Per-connection bounded send queues with a writer task each, so one slow viewer never stalls the rest
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Union
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Close code sent to viewers dropped for falling behind ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class SlowConsumerPolicy(str, Enum):
+    DISCONNECT = "disconnect"  # close the connection once its queue is full
+    DROP_OLDEST = "drop_oldest"  # discard the oldest queued message
+    COALESCE = "coalesce"  # replace a queued snapshot with the same coalesce key, else drop the oldest
+
+
+def serialize(message: Union[str, dict]) -> str:
+    """Encode once, the same way WebSocket.send_json does"""
+    if isinstance(message, str):
+        return message
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class _Connection:
+    __slots__ = ("websocket", "topic", "policy", "max_queue", "after", "queue", "keyed",
+                 "wakeup", "task", "paused", "dropped", "stale", "sent")
+
+    def __init__(self, websocket: WebSocket, topic: str, policy: SlowConsumerPolicy, max_queue: int, after: Any):
+        self.websocket = websocket
+        self.topic = topic
+        self.policy = policy
+        self.max_queue = max_queue
+        self.after = after
+        # Slots are [coalesce_key, text, sequence] so a coalesced update can replace text in place
+        self.queue: Deque[List] = deque()
+        self.keyed: Dict[str, List] = {}
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.paused = False
+        self.dropped = 0
+        # Set when a queued message is dropped; cleared once a resync message is queued
+        self.stale = False
+        self.sent = 0
+
+    def enqueue(self, text: str, coalesce_key: Optional[str] = None, sequence: Any = None) -> bool:
+        """Queue a message; returns False if the connection must be disconnected"""
+        if len(self.queue) >= self.max_queue:
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                return False
+            slot = self.keyed.get(coalesce_key) if coalesce_key is not None else None
+            if slot is not None and self.policy == SlowConsumerPolicy.COALESCE:
+                # The queued snapshot is stale anyway; send the newer one in its place
+                slot[1] = text
+                slot[2] = sequence
+                self.dropped += 1
+                return True
+            oldest = self.queue.popleft()
+            if oldest[0] is not None and self.keyed.get(oldest[0]) is oldest:
+                del self.keyed[oldest[0]]
+            self.dropped += 1
+            self.stale = True
+
+        slot = [coalesce_key, text, sequence]
+        self.queue.append(slot)
+        if coalesce_key is not None:
+            self.keyed[coalesce_key] = slot
+        if not self.paused:
+            self.wakeup.set()
+        return True
+
+    def pop(self) -> str:
+        slot = self.queue.popleft()
+        if slot[0] is not None and self.keyed.get(slot[0]) is slot:
+            del self.keyed[slot[0]]
+        return slot[1]
+
+    def discard_through(self, sequence: Any):
+        """Drop queued messages whose sequence is at or below `sequence`"""
+        kept = deque(slot for slot in self.queue if slot[2] is None or slot[2] > sequence)
+        self.queue = kept
+        self.keyed = {slot[0]: slot for slot in kept if slot[0] is not None}
+
+
+class FanoutHub:
+    """Topic-based websocket broadcaster
+
+    ``publish`` serializes a message once and enqueues the text on every
+    connection of the topic without awaiting any socket. Each connection's
+    writer task drains its own queue; when a queue exceeds ``max_queue`` the
+    slow-consumer policy decides whether to disconnect, drop the oldest
+    message, or replace a queued message with the same ``coalesce_key``.
+    Only publish with a ``coalesce_key`` for messages that fully supersede
+    earlier ones (state snapshots); queues that are not full never coalesce.
+    Messages that build on earlier ones (deltas) should be published with a
+    ``resync`` message carrying the full state, which connections that have
+    dropped messages receive in their place.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 64,
+        policy: Union[str, SlowConsumerPolicy] = SlowConsumerPolicy.DROP_OLDEST,
+        send_timeout: float = 10.0,
+    ):
+        self.max_queue = max_queue
+        self.policy = SlowConsumerPolicy(policy)
+        self.send_timeout = send_timeout
+        self._topics: Dict[str, Set[WebSocket]] = {}
+        self._connections: Dict[WebSocket, _Connection] = {}
+        self.disconnected_slow = 0
+
+    def add(self, topic: str, websocket: WebSocket, policy: Optional[Union[str, SlowConsumerPolicy]] = None,
+            after: Any = None, paused: bool = False) -> None:
+        """Register an accepted websocket under a topic and start its writer
+
+        Published messages with a ``sequence`` at or below ``after`` are
+        skipped for this connection. A ``paused`` connection queues messages
+        without sending until ``resume`` is called.
+        """
+        connection = _Connection(
+            websocket, topic, SlowConsumerPolicy(policy) if policy else self.policy, self.max_queue, after
+        )
+        connection.paused = paused
+        self._connections[websocket] = connection
+        self._topics.setdefault(topic, set()).add(websocket)
+        connection.task = asyncio.create_task(self._writer(connection))
+
+    def resume(self, websocket: WebSocket, preface: Iterable[Union[str, dict]] = (), after: Any = None):
+        """Start sending, delivering `preface` messages ahead of anything queued meanwhile
+
+        With ``after``, messages already covered by the preface (sequence at
+        or below it) are discarded from the queue and skipped from then on.
+        """
+        connection = self._connections.get(websocket)
+        if connection is None:
+            return
+        if after is not None:
+            connection.after = after
+            connection.discard_through(after)
+        for message in reversed(list(preface)):
+            connection.queue.appendleft([None, serialize(message), None])
+        connection.paused = False
+        connection.wakeup.set()
+
+    async def remove(self, websocket: WebSocket):
+        connection = self._detach(websocket)
+        if connection is not None and connection.task is not None and connection.task is not asyncio.current_task():
+            connection.task.cancel()
+            try:
+                await connection.task
+            except asyncio.CancelledError:
+                pass
+
+    def publish(self, topic: str, message: Union[str, dict], coalesce_key: Optional[str] = None,
+                sequence: Any = None, resync: Optional[Union[str, dict]] = None,
+                resync_key: Optional[str] = None) -> int:
+        """Queue a message for every connection of a topic; returns the number of recipients
+
+        Connections that dropped a message since their last resync get
+        ``resync`` (queued under ``resync_key``) instead of ``message``.
+        """
+        websockets = self._topics.get(topic)
+        if not websockets:
+            return 0
+
+        text = serialize(message)
+        resync_text = serialize(resync) if resync is not None else None
+        recipients = 0
+        for websocket in list(websockets):
+            connection = self._connections[websocket]
+            if sequence is not None and connection.after is not None and sequence <= connection.after:
+                continue
+            if resync_text is not None and connection.stale:
+                queued = connection.enqueue(resync_text, resync_key, sequence)
+                # Anything dropped to make room is covered by the resync message
+                connection.stale = False
+            else:
+                queued = connection.enqueue(text, coalesce_key, sequence)
+            if queued:
+                recipients += 1
+            else:
+                self._drop_slow(connection)
+        return recipients
+
+    def send(self, websocket: WebSocket, message: Union[str, dict]) -> bool:
+        """Queue a message for one connection, keeping order with broadcasts"""
+        connection = self._connections.get(websocket)
+        if connection is None:
+            return False
+        if not connection.enqueue(serialize(message)):
+            self._drop_slow(connection)
+            return False
+        return True
+
+    def topics(self) -> List[str]:
+        return list(self._topics)
+
+    def connection_count(self, topic: Optional[str] = None) -> int:
+        if topic is None:
+            return len(self._connections)
+        return len(self._topics.get(topic, ()))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": len(self._connections),
+            "topics": len(self._topics),
+            "queued": sum(len(c.queue) for c in self._connections.values()),
+            "dropped": sum(c.dropped for c in self._connections.values()),
+            "disconnected_slow": self.disconnected_slow,
+        }
+
+    async def close(self):
+        for websocket in list(self._connections):
+            await self.remove(websocket)
+
+    def _detach(self, websocket: WebSocket) -> Optional[_Connection]:
+        connection = self._connections.pop(websocket, None)
+        if connection is not None:
+            websockets = self._topics.get(connection.topic)
+            if websockets is not None:
+                websockets.discard(websocket)
+                if not websockets:
+                    del self._topics[connection.topic]
+        return connection
+
+    def _drop_slow(self, connection: _Connection):
+        logger.warning(f"Disconnecting slow websocket consumer on {connection.topic} ({len(connection.queue)} queued)")
+        self.disconnected_slow += 1
+        self._detach(connection.websocket)
+        if connection.task is not None:
+            connection.task.cancel()
+        asyncio.create_task(self._close_socket(connection.websocket))
+
+    async def _close_socket(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
+
+    async def _writer(self, connection: _Connection):
+        """Drain one connection's queue; a failed or stalled send ends the connection"""
+        try:
+            while True:
+                await connection.wakeup.wait()
+                connection.wakeup.clear()
+                while connection.queue and not connection.paused:
+                    text = connection.pop()
+                    await asyncio.wait_for(connection.websocket.send_text(text), self.send_timeout)
+                    connection.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Websocket writer for {connection.topic} stopped: {e}")
+            self._detach(connection.websocket)
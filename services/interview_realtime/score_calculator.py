@@ -41,8 +41,8 @@ class InterviewScore:
         """Set job requirements for keyword matching"""
         self.job_requirements = [req.lower() for req in requirements]
     
-    def calculate_real_time_score(self, analysis_result) -> ScoreMetrics:
-        """Calculate real-time score from analysis result"""
+    def calculate_real_time_score(self, analysis_result, record: bool = True) -> ScoreMetrics:
+        """Calculate real-time score from analysis result; `record=False` leaves score_history untouched"""
         try:
             # Calculate individual component scores
             sentiment_score = self._normalize_sentiment_score(analysis_result.sentiment_score)
@@ -81,7 +81,8 @@ class InterviewScore:
             )
             
             # Add to history
-            self.score_history.append(score_metrics)
+            if record:
+                self.score_history.append(score_metrics)
             
             return score_metrics
             
@@ -0,0 +1,5 @@
+"""Service modules import each other by bare name, as when run from this directory"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -0,0 +1,241 @@
+"""In-memory stand-in for the Redis stream commands the event log uses"""
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from redis.exceptions import ResponseError
+
+from event_log import id_key
+
+
+class _InMemoryPipeline:
+    def __init__(self, backend: "InMemoryStreamBackend"):
+        self._backend = backend
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        calls, self._calls = self._calls, []
+        return [getattr(self._backend, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+
+class InMemoryStreamBackend:
+    """Implements the subset of redis.Redis used by the event log
+
+    Values are returned as ``str`` like a ``decode_responses=True`` client.
+    TTLs are accepted and ignored.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._streams: Dict[str, List[Tuple[str, Dict[str, str]]]] = {}
+        self._last_ids: Dict[str, Tuple[int, int]] = {}
+        # stream -> group -> {"last": id_key, "pending": {entry_id: (consumer, delivered_at)}}
+        self._groups: Dict[str, Dict[str, dict]] = {}
+        self._sets: Dict[str, Set[str]] = {}
+        self._lists: Dict[str, List[str]] = {}
+        self._values: Dict[str, str] = {}
+
+    def pipeline(self) -> _InMemoryPipeline:
+        return _InMemoryPipeline(self)
+
+    # Streams
+    def xadd(self, name: str, fields: Dict, id: str = "*", maxlen: Optional[int] = None, approximate: bool = True) -> str:
+        with self._cond:
+            ms = int(time.time() * 1000)
+            last_ms, last_seq = self._last_ids.get(name, (0, 0))
+            key = (ms, 0) if ms > last_ms else (last_ms, last_seq + 1)
+            self._last_ids[name] = key
+            entry_id = f"{key[0]}-{key[1]}"
+
+            entries = self._streams.setdefault(name, [])
+            entries.append((entry_id, {str(k): str(v) for k, v in fields.items()}))
+            if maxlen is not None and len(entries) > maxlen:
+                del entries[:len(entries) - maxlen]
+            self._cond.notify_all()
+            return entry_id
+
+    def xlen(self, name: str) -> int:
+        with self._cond:
+            return len(self._streams.get(name, []))
+
+    def xrange(self, name: str, min: str = "-", max: str = "+", count: Optional[int] = None):
+        with self._cond:
+            low = (0, 0) if min == "-" else id_key(min)
+            high = None if max == "+" else id_key(max)
+            matched = [
+                (entry_id, dict(fields)) for entry_id, fields in self._streams.get(name, [])
+                if id_key(entry_id) >= low and (high is None or id_key(entry_id) <= high)
+            ]
+            return matched[:count] if count else matched
+
+    def xrevrange(self, name: str, max: str = "+", min: str = "-", count: Optional[int] = None):
+        matched = self.xrange(name, min, max)[::-1]
+        return matched[:count] if count else matched
+
+    def xgroup_create(self, name: str, groupname: str, id: str = "$", mkstream: bool = False):
+        with self._cond:
+            if name not in self._streams:
+                if not mkstream:
+                    raise ResponseError("The XGROUP subcommand requires the key to exist")
+                self._streams[name] = []
+            groups = self._groups.setdefault(name, {})
+            if groupname in groups:
+                raise ResponseError("BUSYGROUP Consumer Group name already exists")
+            last = self._last_ids.get(name, (0, 0)) if id == "$" else id_key(id)
+            groups[groupname] = {"last": last, "pending": {}}
+            return True
+
+    def xgroup_destroy(self, name: str, groupname: str) -> int:
+        with self._cond:
+            return int(self._groups.get(name, {}).pop(groupname, None) is not None)
+
+    def xreadgroup(self, groupname: str, consumername: str, streams: Dict[str, str],
+                   count: Optional[int] = None, block: Optional[int] = None, noack: bool = False):
+        deadline = None if block is None else time.monotonic() + block / 1000
+        with self._cond:
+            while True:
+                result = []
+                for name, start in streams.items():
+                    group = self._groups.get(name, {}).get(groupname)
+                    if group is None:
+                        raise ResponseError(f"NOGROUP No such key '{name}' or consumer group '{groupname}'")
+                    if start == ">":
+                        entries = [e for e in self._streams.get(name, []) if id_key(e[0]) > group["last"]]
+                        entries = entries[:count] if count else entries
+                        if entries:
+                            group["last"] = id_key(entries[-1][0])
+                            if not noack:
+                                now = time.monotonic()
+                                for entry_id, _fields in entries:
+                                    group["pending"][entry_id] = (consumername, now)
+                    else:
+                        owned = {i for i, (consumer, _t) in group["pending"].items() if consumer == consumername}
+                        entries = [e for e in self._streams.get(name, [])
+                                   if e[0] in owned and id_key(e[0]) > id_key(start)]
+                        entries = entries[:count] if count else entries
+                    if entries or start != ">":
+                        result.append([name, [(entry_id, dict(fields)) for entry_id, fields in entries]])
+
+                if result or block is None:
+                    return result
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._cond.wait(remaining)
+
+    def xinfo_groups(self, name: str) -> List[dict]:
+        with self._cond:
+            if name not in self._streams:
+                raise ResponseError("ERR no such key")
+            return [
+                {"name": groupname, "pending": len(group["pending"]),
+                 "last-delivered-id": f"{group['last'][0]}-{group['last'][1]}"}
+                for groupname, group in self._groups.get(name, {}).items()
+            ]
+
+    def xpending_range(self, name: str, groupname: str, min: str, max: str, count: int,
+                       consumername: Optional[str] = None) -> List[dict]:
+        with self._cond:
+            low = (0, 0) if min == "-" else id_key(min)
+            high = None if max == "+" else id_key(max)
+            pending = self._groups.get(name, {}).get(groupname, {}).get("pending", {})
+            matched = [
+                {"message_id": entry_id, "consumer": consumer}
+                for entry_id, (consumer, _delivered_at) in sorted(pending.items(), key=lambda item: id_key(item[0]))
+                if id_key(entry_id) >= low and (high is None or id_key(entry_id) <= high)
+                and (consumername is None or consumer == consumername)
+            ]
+            return matched[:count]
+
+    def xack(self, name: str, groupname: str, *ids: str) -> int:
+        with self._cond:
+            pending = self._groups.get(name, {}).get(groupname, {}).get("pending", {})
+            return sum(pending.pop(entry_id, None) is not None for entry_id in ids)
+
+    def xautoclaim(self, name: str, groupname: str, consumername: str, min_idle_time: int,
+                   start_id: str = "0-0", count: Optional[int] = None, justid: bool = False):
+        with self._cond:
+            group = self._groups.get(name, {}).get(groupname)
+            if group is None:
+                raise ResponseError(f"NOGROUP No such key '{name}' or consumer group '{groupname}'")
+            now = time.monotonic()
+            fields_by_id = dict(self._streams.get(name, []))
+            claimed = []
+            for entry_id in sorted(group["pending"], key=id_key):
+                if id_key(entry_id) < id_key(start_id) or (count and len(claimed) >= count):
+                    continue
+                _consumer, delivered_at = group["pending"][entry_id]
+                if (now - delivered_at) * 1000 >= min_idle_time and entry_id in fields_by_id:
+                    group["pending"][entry_id] = (consumername, now)
+                    claimed.append((entry_id, dict(fields_by_id[entry_id])))
+            return ["0-0", claimed, []]
+
+    # Keys, sets, lists and strings
+    def exists(self, *names: str) -> int:
+        with self._cond:
+            return sum(any(name in store for store in (self._streams, self._sets, self._lists, self._values))
+                       for name in names)
+
+    def expire(self, name: str, time: int) -> bool:
+        return bool(self.exists(name))
+
+    def delete(self, *names: str) -> int:
+        with self._cond:
+            removed = 0
+            for name in names:
+                removed += any(store.pop(name, None) is not None for store in (self._streams, self._sets, self._lists, self._values))
+                self._groups.pop(name, None)
+            return removed
+
+    def sadd(self, name: str, *values: str) -> int:
+        with self._cond:
+            members = self._sets.setdefault(name, set())
+            added = len(set(values) - members)
+            members.update(values)
+            return added
+
+    def srem(self, name: str, *values: str) -> int:
+        with self._cond:
+            members = self._sets.get(name, set())
+            removed = len(members & set(values))
+            members.difference_update(values)
+            return removed
+
+    def smembers(self, name: str) -> Set[str]:
+        with self._cond:
+            return set(self._sets.get(name, set()))
+
+    def scard(self, name: str) -> int:
+        with self._cond:
+            return len(self._sets.get(name, set()))
+
+    def rpush(self, name: str, *values: str) -> int:
+        with self._cond:
+            items = self._lists.setdefault(name, [])
+            items.extend(str(value) for value in values)
+            return len(items)
+
+    def lrange(self, name: str, start: int, end: int) -> List[str]:
+        with self._cond:
+            items = self._lists.get(name, [])
+            return items[start:] if end == -1 else items[start:end + 1]
+
+    def get(self, name: str) -> Optional[str]:
+        with self._cond:
+            return self._values.get(name)
+
+    def set(self, name: str, value: str) -> bool:
+        with self._cond:
+            self._values[name] = str(value)
+            return True
+
+    def setex(self, name: str, time: int, value: str) -> bool:
+        with self._cond:
+            self._values[name] = str(value)
+            return True
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from coalescer import SessionCoalescer
+from fanout import FanoutHub
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.received = []
+
+    async def send_text(self, text):
+        self.received.append(json.loads(text))
+
+    async def close(self, code=1000):
+        pass
+
+
+def apply(messages):
+    """Dashboard state after applying messages the way the client does"""
+    state, version = {}, 0
+    for message in messages:
+        if message["type"] == "state_snapshot":
+            state = dict(message["data"])
+        elif message["type"] == "state_delta":
+            state.update(message["data"])
+        else:
+            continue
+        version = message["version"]
+    return state, version
+
+
+def analysis(**data):
+    return {"type": "analysis_result", "data": data}
+
+
+def test_slow_viewer_converges_to_latest_state():
+    async def scenario():
+        hub = FanoutHub(max_queue=2, policy="drop_oldest")
+        coalescer = SessionCoalescer(hub, default_rate_hz=5)
+        fast, slow = RecordingWebSocket(), RecordingWebSocket()
+        hub.add("s1", fast)
+        hub.add("s1", slow, paused=True)  # stands in for a viewer that stopped reading
+
+        async def flush():
+            coalescer._flush("s1", coalescer._sessions["s1"])
+            await asyncio.sleep(0.001)  # the fast viewer keeps up
+
+        try:
+            # Each field changes once, so the slow viewer loses its delta when it drops off the queue
+            coalescer.publish("s1", analysis(sentiment=0.1, stress=10))
+            await flush()
+            coalescer.publish("s1", analysis(engagement=70))
+            await flush()
+            coalescer.publish("s1", analysis(confidence=40))
+            await flush()
+            assert hub.stats()["dropped"] == 1
+
+            coalescer.publish("s1", analysis(stress=20))
+            await flush()
+            hub.resume(slow)
+            await asyncio.sleep(0.01)
+        finally:
+            await hub.close()
+        return coalescer.snapshot("s1"), fast.received, slow.received
+
+    snapshot, fast, slow = asyncio.run(scenario())
+    assert apply(slow) == (snapshot["data"], snapshot["version"])
+    assert apply(fast) == (snapshot["data"], snapshot["version"])
+    assert [message["type"] for message in fast] == ["state_delta"] * 4
+    assert slow[-1]["type"] == "state_snapshot"
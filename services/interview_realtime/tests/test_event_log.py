@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+
+from event_log import (
+    ANALYSIS_RESULT, SCORING_GROUP, SESSION_ENDED, SESSION_STARTED, TRANSCRIPTION, EventConsumer,
+    InterviewEventLog, ReportBuilderConsumer
+)
+from stream_backend import InMemoryStreamBackend
+
+
+class RecordingConsumer(EventConsumer):
+    group = "recording"
+
+    def __init__(self, event_log, fail_times=0, **kwargs):
+        super().__init__(event_log, consumer_name="worker-1", block_ms=10, **kwargs)
+        self.fail_times = fail_times
+        self.handled = []
+
+    async def handle(self, event):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("handler failed")
+        self.handled.append(event.id)
+
+
+class FakeScoringConsumer(RecordingConsumer):
+    """Scores every transcription with a fixed result, like ScoringConsumer without the analyzer"""
+
+    group = SCORING_GROUP
+
+    async def handle(self, event):
+        await super().handle(event)
+        if event.type == TRANSCRIPTION:
+            await self.event_log.append(event.session_id, ANALYSIS_RESULT, {"score": score(event.data["overall"])})
+
+
+def score(overall):
+    return {
+        "timestamp": 0.0, "overall_score": overall, "sentiment_score": 50.0, "emotion_stability": 50.0,
+        "confidence_score": 50.0, "keyword_match_score": 50.0, "communication_clarity": 50.0,
+        "technical_score": 50.0, "stress_level": 20.0, "engagement_score": 50.0,
+    }
+
+
+@pytest.fixture
+def event_log():
+    return InterviewEventLog(InMemoryStreamBackend())
+
+
+def pending(event_log, session_id, group):
+    return event_log.client._groups[event_log.stream_key(session_id)][group]["pending"]
+
+
+async def read_once(consumer):
+    sessions = await consumer._ready_sessions()
+    events = await consumer.event_log.read_group(
+        consumer.group, consumer.consumer_name, sessions, block_ms=consumer.block_ms
+    )
+    for event in events:
+        await consumer._dispatch(event)
+    return events
+
+
+def test_replay_returns_events_in_order_and_filters_types(event_log):
+    async def scenario():
+        await event_log.append("s1", SESSION_STARTED, {"job_requirements": ["python"]})
+        first = await event_log.append("s1", TRANSCRIPTION, {"text": "hello"})
+        await event_log.append("s1", ANALYSIS_RESULT, {"text": "hello"})
+        second = await event_log.append("s1", TRANSCRIPTION, {"text": "again"})
+
+        everything = await event_log.replay("s1")
+        transcripts = await event_log.replay("s1", types=[TRANSCRIPTION])
+        until_first = await event_log.replay("s1", end=first)
+        return everything, transcripts, until_first, first, second
+
+    everything, transcripts, until_first, first, second = asyncio.run(scenario())
+    assert [event.type for event in everything] == [SESSION_STARTED, TRANSCRIPTION, ANALYSIS_RESULT, TRANSCRIPTION]
+    assert [event.id for event in transcripts] == [first, second]
+    assert [event.data["text"] for event in transcripts] == ["hello", "again"]
+    assert until_first[-1].id == first
+
+
+def test_event_consumer_is_abstract(event_log):
+    with pytest.raises(TypeError):
+        EventConsumer(event_log)
+
+
+def test_handled_events_are_acknowledged(event_log):
+    consumer = RecordingConsumer(event_log)
+
+    async def scenario():
+        ids = [await event_log.append("s1", TRANSCRIPTION, {"text": str(i)}) for i in range(3)]
+        await read_once(consumer)
+        return ids
+
+    ids = asyncio.run(scenario())
+    assert consumer.handled == ids
+    assert not pending(event_log, "s1", consumer.group)
+
+
+def test_failed_event_stays_pending_and_is_redelivered(event_log):
+    consumer = RecordingConsumer(event_log, fail_times=1)
+
+    async def scenario():
+        entry_id = await event_log.append("s1", TRANSCRIPTION, {"text": "hello"})
+        await read_once(consumer)
+        assert entry_id in pending(event_log, "s1", consumer.group)
+        assert consumer.handled == []
+
+        # Nothing new for the group; the failed event comes back through the stale claim
+        assert await read_once(consumer) == []
+        for event in await event_log.claim_stale(consumer.group, "worker-2", ["s1"], min_idle_ms=0):
+            await consumer._dispatch(event)
+        return entry_id
+
+    entry_id = asyncio.run(scenario())
+    assert consumer.handled == [entry_id]
+    assert not pending(event_log, "s1", consumer.group)
+
+
+def test_event_is_dropped_after_max_deliveries(event_log):
+    consumer = RecordingConsumer(event_log, fail_times=RecordingConsumer.max_deliveries)
+
+    async def scenario():
+        await event_log.append("s1", TRANSCRIPTION, {"text": "poison"})
+        await read_once(consumer)
+        for _ in range(consumer.max_deliveries - 1):
+            assert pending(event_log, "s1", consumer.group)
+            for event in await event_log.claim_stale(consumer.group, consumer.consumer_name, ["s1"], min_idle_ms=0):
+                await consumer._dispatch(event)
+
+    asyncio.run(scenario())
+    assert consumer.handled == []
+    assert not pending(event_log, "s1", consumer.group)
+
+
+def test_score_and_requirements_survive_stream_trimming():
+    event_log = InterviewEventLog(InMemoryStreamBackend(), maxlen=5)
+
+    async def scenario():
+        await event_log.append("s1", SESSION_STARTED, {"job_requirements": ["python", "sql"]})
+        for i in range(20):
+            await event_log.append("s1", ANALYSIS_RESULT, {"score": score(float(i))})
+        return await event_log.load_score("s1"), await event_log.job_requirements("s1"), await event_log.replay("s1")
+
+    loaded, requirements, events = asyncio.run(scenario())
+    assert len(events) == 5
+    assert requirements == ["python", "sql"]
+    assert [metrics.overall_score for metrics in loaded.score_history] == [float(i) for i in range(20)]
+    assert loaded.job_requirements == ["python", "sql"]
+
+
+def test_unknown_session_has_no_score(event_log):
+    assert asyncio.run(event_log.load_score("missing")) is None
+
+
+def test_report_waits_for_scoring_to_reach_session_end(event_log):
+    scoring = FakeScoringConsumer(event_log)
+    reports = ReportBuilderConsumer(event_log, consumer_name="worker-1", block_ms=10)
+    reports.scoring_timeout = 0.05
+
+    async def scenario():
+        await event_log.append("s1", SESSION_STARTED, {"job_requirements": []})
+        await event_log.append("s1", TRANSCRIPTION, {"overall": 80.0})
+        await event_log.append("s1", SESSION_ENDED, {})
+
+        # Scoring has not read the stream yet: the report is not built and session_ended stays pending
+        await read_once(reports)
+        assert await event_log.get_report("s1") is None
+        assert pending(event_log, "s1", reports.group)
+
+        await read_once(scoring)
+        for event in await event_log.claim_stale(reports.group, reports.consumer_name, ["s1"], min_idle_ms=0):
+            await reports._dispatch(event)
+        return await event_log.get_report("s1")
+
+    report = asyncio.run(scenario())
+    assert [metrics["overall_score"] for metrics in report["score_history"]] == [80.0]
+    assert not pending(event_log, "s1", reports.group)
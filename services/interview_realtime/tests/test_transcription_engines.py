@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+import transcription_engines
+from transcription_engines import (
+    FakeTranscriptionEngine, LocalWhisperEngine, create_engine, get_default_engine
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_default_engine(monkeypatch):
+    monkeypatch.setattr(transcription_engines, "_default_engine", None)
+    monkeypatch.setattr(transcription_engines, "_default_engine_failed_at", None)
+
+
+def test_create_engine_by_name():
+    assert isinstance(create_engine("fake"), FakeTranscriptionEngine)
+    with pytest.raises(ValueError):
+        create_engine("nope")
+
+
+def test_default_engine_from_environment(monkeypatch):
+    monkeypatch.setenv("TRANSCRIPTION_ENGINE", "fake")
+    engine = get_default_engine()
+    assert isinstance(engine, FakeTranscriptionEngine)
+    assert get_default_engine() is engine
+
+
+def test_failed_engine_is_cached_until_retry(monkeypatch):
+    calls = []
+
+    def failing(name, **options):
+        calls.append(name)
+        raise RuntimeError("faster-whisper is not installed")
+
+    clock = [1000.0]
+    monkeypatch.setenv("TRANSCRIPTION_ENGINE", LocalWhisperEngine.name)
+    monkeypatch.setattr(transcription_engines, "create_engine", failing)
+    monkeypatch.setattr(transcription_engines.time, "monotonic", lambda: clock[0])
+
+    assert get_default_engine() is None
+    assert get_default_engine() is None
+    assert len(calls) == 1
+
+    clock[0] += transcription_engines.ENGINE_RETRY_SECONDS
+    monkeypatch.setattr(transcription_engines, "create_engine", lambda name, **options: FakeTranscriptionEngine())
+    assert isinstance(get_default_engine(), FakeTranscriptionEngine)
+
+
+def test_fake_engine_is_deterministic():
+    engine = FakeTranscriptionEngine()
+    pcm = bytes(range(1, 200))
+    first, second = asyncio.run(engine.transcribe_batch([pcm, pcm]))
+    assert first == second and first.text
+    assert asyncio.run(engine.transcribe(bytes(64))).text == ""
+
+
+def test_transcriber_falls_back_to_empty_result_without_engine(monkeypatch):
+    import transcriber
+
+    monkeypatch.setattr(transcriber, "get_default_engine", lambda: None)
+    audio = transcriber.AudioTranscriber()
+    audio.whisper_api_key = None
+    result = asyncio.run(audio._transcribe_with_local_engine(bytes(320), 16000))
+    assert result.text == "" and result.confidence == 0.0
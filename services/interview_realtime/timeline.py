@@ -0,0 +1,284 @@
+"""
+Compacting Sample Timeline
+Keeps recent emotion/sentiment samples at full resolution and folds older ones into coarser time buckets
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (bucket width, how long a bucket stays at that width) per tier, seconds, finest first;
+# the last tier keeps everything, halving its resolution whenever it exceeds max_buckets
+DEFAULT_RAW_SECONDS = 120.0
+DEFAULT_TIERS: Tuple[Tuple[float, Optional[float]], ...] = ((5.0, 1800.0), (60.0, None))
+DEFAULT_MAX_BUCKETS = 512
+
+Sample = Tuple[float, Dict[str, float], Optional[str]]  # (timestamp, values, label)
+
+
+class Bucket:
+    """Mergeable aggregate of the samples in [start, end]: count, sum/min/max per value, label counts"""
+
+    __slots__ = ("start", "end", "count", "sums", "mins", "maxs", "labels")
+
+    def __init__(self, start: float, end: float, count: int = 0, sums: Optional[Dict[str, float]] = None,
+                 mins: Optional[Dict[str, float]] = None, maxs: Optional[Dict[str, float]] = None,
+                 labels: Optional[Dict[str, int]] = None):
+        self.start = start
+        self.end = end
+        self.count = count
+        self.sums = sums or {}
+        self.mins = mins or {}
+        self.maxs = maxs or {}
+        self.labels = labels or {}
+
+    @classmethod
+    def of_sample(cls, timestamp: float, values: Dict[str, float], label: Optional[str] = None) -> "Bucket":
+        return cls(timestamp, timestamp, 1, dict(values), dict(values), dict(values), {label: 1} if label else {})
+
+    def add(self, timestamp: float, values: Dict[str, float], label: Optional[str] = None):
+        self.start = min(self.start, timestamp)
+        self.end = max(self.end, timestamp)
+        self.count += 1
+        for name, value in values.items():
+            self.sums[name] = self.sums.get(name, 0.0) + value
+            self.mins[name] = min(self.mins.get(name, value), value)
+            self.maxs[name] = max(self.maxs.get(name, value), value)
+        if label:
+            self.labels[label] = self.labels.get(label, 0) + 1
+
+    def merge(self, other: "Bucket") -> "Bucket":
+        self.start = min(self.start, other.start)
+        self.end = max(self.end, other.end)
+        self.count += other.count
+        for name, total in other.sums.items():
+            self.sums[name] = self.sums.get(name, 0.0) + total
+        for name, low in other.mins.items():
+            self.mins[name] = min(self.mins.get(name, low), low)
+        for name, high in other.maxs.items():
+            self.maxs[name] = max(self.maxs.get(name, high), high)
+        for label, count in other.labels.items():
+            self.labels[label] = self.labels.get(label, 0) + count
+        return self
+
+    def copy(self) -> "Bucket":
+        return Bucket(self.start, self.end, self.count, dict(self.sums), dict(self.mins), dict(self.maxs),
+                      dict(self.labels))
+
+    @property
+    def dominant(self) -> Optional[str]:
+        return max(self.labels.items(), key=lambda item: item[1])[0] if self.labels else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Mean, min and max of every value plus the most frequent label"""
+        return {
+            "start": self.start,
+            "end": self.end,
+            "count": self.count,
+            "mean": {name: total / self.count for name, total in self.sums.items()} if self.count else {},
+            "min": dict(self.mins),
+            "max": dict(self.maxs),
+            "dominant": self.dominant,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"start": self.start, "end": self.end, "count": self.count, "sums": self.sums,
+                "mins": self.mins, "maxs": self.maxs, "labels": self.labels}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Bucket":
+        return cls(data["start"], data["end"], data["count"], data.get("sums"), data.get("mins"),
+                   data.get("maxs"), data.get("labels"))
+
+
+class CompactingTimeline:
+    """Tiered timeline of numeric samples with bounded memory
+
+    Samples newer than ``raw_seconds`` (relative to the newest sample) are
+    kept verbatim. Older ones are folded into buckets of the first tier's
+    width, buckets older than that tier's horizon are merged into the next,
+    coarser tier, and the last tier doubles its bucket width whenever it holds
+    more than ``max_buckets``. Memory therefore stays bounded however long
+    the session runs; only resolution of the distant past is given up.
+    """
+
+    def __init__(self, raw_seconds: float = DEFAULT_RAW_SECONDS,
+                 tiers: Sequence[Tuple[float, Optional[float]]] = DEFAULT_TIERS,
+                 max_buckets: int = DEFAULT_MAX_BUCKETS):
+        if not tiers:
+            raise ValueError("at least one tier is required")
+        self.raw_seconds = raw_seconds
+        self.widths = [float(width) for width, _horizon in tiers]
+        self.horizons = [horizon for _width, horizon in tiers]
+        self.max_buckets = max_buckets
+        self.raw: Deque[Sample] = deque()
+        # tier -> {aligned bucket start: bucket}
+        self.tiers: List[Dict[float, Bucket]] = [{} for _ in tiers]
+        self.latest: Optional[float] = None
+
+    def __len__(self) -> int:
+        """Stored entries (raw samples plus buckets), the quantity that stays bounded"""
+        return len(self.raw) + sum(len(tier) for tier in self.tiers)
+
+    # Writing
+    def add(self, timestamp: float, values: Dict[str, float], label: Optional[str] = None):
+        """Record one sample at full resolution, compacting whatever has aged out"""
+        if self.latest is not None and timestamp < self.latest - self.raw_seconds:
+            self.fold(timestamp, values, label)  # late arrival, already outside the raw window
+            return
+        self.raw.append((timestamp, values, label))
+        self.compact(timestamp)
+
+    def fold(self, timestamp: float, values: Dict[str, float], label: Optional[str] = None):
+        """Aggregate a sample straight into the first tier, skipping the raw window"""
+        self._put(0, Bucket.of_sample(timestamp, values, label))
+        self.latest = timestamp if self.latest is None else max(self.latest, timestamp)
+
+    def compact(self, now: Optional[float] = None):
+        """Move samples and buckets that aged past their tier into the next one"""
+        if now is not None:
+            self.latest = now if self.latest is None else max(self.latest, now)
+        if self.latest is None:
+            return
+
+        raw_cutoff = self.latest - self.raw_seconds
+        while self.raw and self.raw[0][0] < raw_cutoff:
+            self._put(0, Bucket.of_sample(*self.raw.popleft()))
+
+        for tier, horizon in enumerate(self.horizons[:-1]):
+            if horizon is None:
+                continue
+            cutoff = self.latest - horizon
+            for start in [start for start, bucket in self.tiers[tier].items() if bucket.end < cutoff]:
+                self._put(tier + 1, self.tiers[tier].pop(start))
+
+        last = len(self.tiers) - 1
+        while len(self.tiers[last]) > self.max_buckets:
+            self.widths[last] *= 2
+            buckets = list(self.tiers[last].values())
+            self.tiers[last] = {}
+            for bucket in buckets:
+                self._put(last, bucket)
+
+    def _put(self, tier: int, bucket: Bucket):
+        width = self.widths[tier]
+        start = (bucket.start // width) * width
+        existing = self.tiers[tier].get(start)
+        if existing is None:
+            self.tiers[tier][start] = bucket
+        else:
+            existing.merge(bucket)
+
+    # Reading
+    def _units(self, start: Optional[float], end: Optional[float]) -> List[Bucket]:
+        units = [bucket for tier in self.tiers for bucket in tier.values()]
+        units.extend(Bucket.of_sample(*sample) for sample in self.raw)
+        return sorted(
+            (unit for unit in units
+             if (start is None or unit.end >= start) and (end is None or unit.start < end)),
+            key=lambda unit: unit.start,
+        )
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None,
+              resolution: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Bucket summaries overlapping [start, end)
+
+        With ``resolution`` the stored data is re-bucketed into bins of that
+        width; where the data is already coarser, its own buckets are returned.
+        Without it, every stored unit is returned at its native resolution.
+        """
+        units = self._units(start, end)
+        if not resolution:
+            return [unit.summary() for unit in units]
+
+        bins: Dict[float, Bucket] = {}
+        for unit in units:
+            key = (unit.start // resolution) * resolution
+            if key in bins:
+                bins[key].merge(unit)
+            else:
+                bins[key] = unit.copy()
+        return [bins[key].summary() for key in sorted(bins)]
+
+    def summarize(self, start: Optional[float] = None, end: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """One summary over the whole range"""
+        units = self._units(start, end)
+        if not units:
+            return None
+        total = units[0].copy()
+        for unit in units[1:]:
+            total.merge(unit)
+        return total.summary()
+
+    # Persistence
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "raw_seconds": self.raw_seconds,
+            "widths": self.widths,
+            "horizons": self.horizons,
+            "max_buckets": self.max_buckets,
+            "latest": self.latest,
+            "raw": [list(sample) for sample in self.raw],
+            "tiers": [[bucket.to_dict() for bucket in tier.values()] for tier in self.tiers],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompactingTimeline":
+        timeline = cls(data["raw_seconds"], list(zip(data["widths"], data["horizons"])), data["max_buckets"])
+        timeline.latest = data.get("latest")
+        timeline.raw.extend((t, values, label) for t, values, label in data.get("raw", []))
+        for tier, buckets in enumerate(data.get("tiers", [])):
+            for bucket in buckets:
+                timeline._put(tier, Bucket.from_dict(bucket))
+        return timeline
+
+
+# ----------------------
+# Stored session samples
+# ----------------------
+def sample_from_item(item: Any, fallback_time: float = 0.0) -> Sample:
+    """Read a stored emotion/sentiment item as (timestamp, numeric values, label)
+
+    Numeric fields become values, as do the entries of nested score maps
+    (e.g. ``emotion_scores``); the label is the item's ``emotion``/``sentiment``
+    field, else the top entry of its score map.
+    """
+    if isinstance(item, (int, float)):
+        return fallback_time, {"value": float(item)}, None
+
+    timestamp = _timestamp(item.get("timestamp"), fallback_time)
+    values: Dict[str, float] = {}
+    label = item.get("emotion") or item.get("sentiment") or item.get("label")
+    for name, value in item.items():
+        if name == "timestamp" or isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            values[name] = float(value)
+        elif isinstance(value, dict):
+            scores = {k: float(v) for k, v in value.items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+            values.update(scores)
+            if label is None and scores:
+                label = max(scores.items(), key=lambda entry: entry[1])[0]
+    return timestamp, values, label if isinstance(label, str) else None
+
+
+def _timestamp(value: Any, fallback: float) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return fallback
+
+
+def samples_from_items(items: Iterable[Any]) -> List[Sample]:
+    """Convert stored items in order; items without a usable time take the previous item's"""
+    samples = []
+    previous = 0.0
+    for item in items:
+        sample = sample_from_item(item, previous)
+        previous = sample[0]
+        samples.append(sample)
+    return samples
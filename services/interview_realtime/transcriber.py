@@ -1,18 +1,23 @@
 """
 Real-time Audio Transcription Service
-Converts audio streams to text using Whisper API
+Converts audio streams to text using the Whisper API or an on-box engine
 """
 
 import asyncio
 import io
 import logging
-import tempfile
 import wave
-from typing import AsyncGenerator, Optional, List
+from typing import AsyncGenerator, Dict, Optional, List
 import aiohttp
 import numpy as np
 from pydantic import BaseModel
 
+from audio_buffer import AudioRingBuffer
+from audio_preprocessing import StreamingPreprocessor
+from audio_segmenter import AudioSegment, VoiceActivitySegmenter
+from transcription_engines import TranscriptionEngine, get_default_engine
+from wav_reader import memmap_pcm, read_wav_info
+
 logger = logging.getLogger(__name__)
 
 class TranscriptionResult(BaseModel):
@@ -20,10 +25,14 @@ class TranscriptionResult(BaseModel):
     confidence: float
     timestamp: float
     speaker: Optional[str] = None
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    is_final: bool = True
 
 class AudioTranscriber:
-    def __init__(self, whisper_api_key: str = None):
+    def __init__(self, whisper_api_key: str = None, engine: Optional[TranscriptionEngine] = None):
         self.whisper_api_key = whisper_api_key
+        self.engine = engine
         self.session = None
         
     async def __aenter__(self):
@@ -40,7 +49,7 @@ class AudioTranscriber:
             if self.whisper_api_key:
                 return await self._transcribe_with_whisper_api(audio_data)
             else:
-                return await self._transcribe_with_local_whisper(audio_data, sample_rate)
+                return await self._transcribe_with_local_engine(audio_data, sample_rate)
         except Exception as e:
             logger.error(f"Transcription error: {e}")
             return TranscriptionResult(text="", confidence=0.0, timestamp=0.0)
@@ -74,129 +83,270 @@ class AudioTranscriber:
             logger.error(f"Whisper API transcription error: {e}")
             return TranscriptionResult(text="", confidence=0.0, timestamp=0.0)
     
-    async def _transcribe_with_local_whisper(self, audio_data: bytes, sample_rate: int) -> TranscriptionResult:
-        """Transcribe using local Whisper model (fallback)"""
+    def _get_engine(self) -> Optional[TranscriptionEngine]:
+        if self.engine is None:
+            self.engine = get_default_engine()
+        return self.engine
+    
+    async def _transcribe_with_local_engine(self, audio_data: bytes, sample_rate: int, partial: bool = False) -> TranscriptionResult:
+        """Transcribe on-box so candidate audio never leaves the node"""
         try:
-            # This would require installing whisper locally
-            # For now, return a mock result
-            logger.warning("Local Whisper not implemented, using mock transcription")
+            engine = self._get_engine()
+            if engine is None:
+                return TranscriptionResult(text="", confidence=0.0, timestamp=0.0)
+            
+            if partial:
+                transcript = await engine.transcribe_partial(audio_data, sample_rate)
+            else:
+                transcript = await engine.transcribe(audio_data, sample_rate)
+            
             return TranscriptionResult(
-                text="Mock transcription - install whisper locally for real transcription",
-                confidence=0.8,
-                timestamp=0.0
+                text=transcript.text,
+                confidence=transcript.confidence,
+                timestamp=0.0,
+                is_final=not partial
             )
         except Exception as e:
-            logger.error(f"Local Whisper transcription error: {e}")
+            logger.error(f"Local transcription error: {e}")
             return TranscriptionResult(text="", confidence=0.0, timestamp=0.0)
     
-    async def transcribe_stream(self, audio_stream: AsyncGenerator[bytes, None]) -> AsyncGenerator[TranscriptionResult, None]:
-        """Transcribe a continuous audio stream"""
-        buffer = b""
-        chunk_size = 1024 * 4  # 4KB chunks
+    async def transcribe_pcm(self, pcm, sample_rate: int, start_time: float, end_time: float) -> TranscriptionResult:
+        """Transcribe raw int16 PCM (bytes or memoryview) recorded between start_time and end_time"""
+        audio_data = self._pcm_to_wav(pcm, sample_rate) if self.whisper_api_key else pcm
+        result = await self.transcribe_audio_chunk(audio_data, sample_rate)
+        result.timestamp = start_time
+        result.start_time = start_time
+        result.end_time = end_time
+        return result
+    
+    async def transcribe_segment(self, segment: AudioSegment) -> TranscriptionResult:
+        """Transcribe a voiced segment and stamp it with its position in the recording"""
+        return await self.transcribe_pcm(segment.pcm, segment.sample_rate, segment.start_time, segment.end_time)
+    
+    async def transcribe_segments(self, segments: List[AudioSegment]) -> List[TranscriptionResult]:
+        """Transcribe several segments, batching them through the local engine when possible"""
+        engine = None if self.whisper_api_key else self._get_engine()
+        if engine is None or not segments:
+            return list(await asyncio.gather(*(self.transcribe_segment(segment) for segment in segments)))
+        
+        try:
+            transcripts = await engine.transcribe_batch([segment.pcm for segment in segments], segments[0].sample_rate)
+        except Exception as e:
+            logger.error(f"Batch transcription error: {e}")
+            return [TranscriptionResult(text="", confidence=0.0, timestamp=segment.start_time) for segment in segments]
+        
+        return [
+            TranscriptionResult(
+                text=transcript.text,
+                confidence=transcript.confidence,
+                timestamp=segment.start_time,
+                start_time=segment.start_time,
+                end_time=segment.end_time
+            )
+            for segment, transcript in zip(segments, transcripts)
+        ]
+    
+    async def transcribe_stream(self, audio_stream: AsyncGenerator[bytes, None], sample_rate: int = 16000,
+                                segmenter: Optional[VoiceActivitySegmenter] = None,
+                                partial_interval: Optional[float] = None,
+                                preprocessor: Optional[StreamingPreprocessor] = None) -> AsyncGenerator[TranscriptionResult, None]:
+        """Transcribe a continuous int16 PCM stream one utterance at a time
+        
+        With ``partial_interval`` set, the open utterance is also transcribed every
+        ``partial_interval`` seconds of new audio and yielded with ``is_final=False``.
+        A ``preprocessor`` converts the stream to normalized mono first.
+        """
+        if preprocessor:
+            sample_rate = preprocessor.target_rate
+        segmenter = segmenter or VoiceActivitySegmenter(sample_rate=sample_rate)
+        last_partial_duration = 0.0
         
         async for audio_chunk in audio_stream:
-            buffer += audio_chunk
-            
-            # Process when buffer reaches chunk size
-            if len(buffer) >= chunk_size:
-                result = await self.transcribe_audio_chunk(buffer)
+            if preprocessor:
+                segments = segmenter.feed_samples(preprocessor.process(audio_chunk))
+            else:
+                segments = segmenter.feed(audio_chunk)
+            for segment in segments:
+                last_partial_duration = 0.0
+                result = await self.transcribe_segment(segment)
                 if result.text.strip():
                     yield result
-                buffer = b""
+            
+            if partial_interval and not self.whisper_api_key:
+                pending = segmenter.pending_segment()
+                if pending and pending.duration - last_partial_duration >= partial_interval:
+                    last_partial_duration = pending.duration
+                    result = await self._transcribe_with_local_engine(pending.pcm, pending.sample_rate, partial=True)
+                    result.timestamp = result.start_time = pending.start_time
+                    result.end_time = pending.end_time
+                    if result.text.strip():
+                        yield result
         
-        # Process remaining buffer
-        if buffer:
-            result = await self.transcribe_audio_chunk(buffer)
+        # Close the utterance still open at end of stream
+        for segment in segmenter.flush():
+            result = await self.transcribe_segment(segment)
             if result.text.strip():
                 yield result
     
-    def preprocess_audio(self, audio_data: bytes, target_sample_rate: int = 16000) -> bytes:
-        """Preprocess audio data for transcription"""
+    @staticmethod
+    def _pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+        """Wrap mono int16 PCM in a WAV container"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm)
+        return buffer.getvalue()
+    
+    def preprocess_audio(self, audio_data: bytes, target_sample_rate: int = 16000,
+                         source_sample_rate: int = 16000, channels: int = 1) -> bytes:
+        """Downmix, remove DC, resample and normalize int16 PCM for transcription"""
         try:
-            # Convert to numpy array
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            
-            # Normalize audio
-            audio_array = audio_array.astype(np.float32) / 32768.0
-            
-            # Resample if needed (simplified - would need librosa for proper resampling)
-            if len(audio_array) > 0:
-                # Simple normalization
-                audio_array = audio_array / np.max(np.abs(audio_array))
+            preprocessor = StreamingPreprocessor(source_sample_rate, channels, target_sample_rate)
+            samples = np.frombuffer(audio_data, dtype=np.int16)
+            output = np.empty(preprocessor.output_length(samples.size // channels), dtype=np.int16)
             
-            # Convert back to bytes
-            processed_audio = (audio_array * 32767).astype(np.int16).tobytes()
+            # One second of input at a time keeps temporaries bounded for long uploads
+            block = source_sample_rate * channels
+            written = 0
+            for start in range(0, samples.size, block):
+                processed = preprocessor.process(samples[start:start + block])
+                output[written:written + processed.size] = processed
+                written += processed.size
             
-            return processed_audio
+            return output[:written].tobytes()
             
         except Exception as e:
             logger.error(f"Audio preprocessing error: {e}")
             return audio_data
     
+    async def transcribe_wav_stream(self, file_path: str, max_concurrency: int = 4, batch_size: int = 4,
+                                    block_seconds: float = 10.0) -> AsyncGenerator[TranscriptionResult, None]:
+        """Transcribe a memory-mapped WAV file, yielding results in recording order
+        
+        Voiced segments are transcribed in batches with at most ``max_concurrency``
+        batches in flight or waiting on an earlier batch; segmentation pauses
+        while the pool is full so memory stays bounded regardless of recording
+        length. Batches that finish early are held back until every earlier
+        batch has been yielded.
+        """
+        info = read_wav_info(file_path)
+        pcm = memmap_pcm(file_path, info)
+        preprocessor = StreamingPreprocessor(info.sample_rate, info.channels)
+        segmenter = VoiceActivitySegmenter(sample_rate=preprocessor.target_rate)
+        
+        in_flight: Dict[asyncio.Future, int] = {}  # task -> batch number
+        finished: Dict[int, List[TranscriptionResult]] = {}  # done, waiting on an earlier batch
+        order = {"submitted": 0, "next": 0}
+        pending: List[AudioSegment] = []
+        block = int(block_seconds * info.sample_rate) * info.channels
+        
+        def submit(segments: List[AudioSegment]):
+            in_flight[asyncio.ensure_future(self.transcribe_segments(list(segments)))] = order["submitted"]
+            order["submitted"] += 1
+            segments.clear()
+        
+        def busy() -> bool:
+            return len(in_flight) + len(finished) >= max_concurrency
+        
+        async def completed():
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                finished[in_flight.pop(task)] = task.result()
+            ready = []
+            while order["next"] in finished:
+                ready.extend(result for result in finished.pop(order["next"]) if result.text.strip())
+                order["next"] += 1
+            return ready
+        
+        try:
+            for start in range(0, pcm.size, block):
+                pending.extend(segmenter.feed_samples(preprocessor.process(pcm[start:start + block])))
+                
+                while len(pending) >= batch_size:
+                    batch = pending[:batch_size]
+                    del pending[:batch_size]
+                    submit(batch)
+                    while busy():
+                        for result in await completed():
+                            yield result
+            
+            pending.extend(segmenter.flush())
+            if pending:
+                submit(pending)
+            while in_flight:
+                for result in await completed():
+                    yield result
+        finally:
+            for task in in_flight:
+                task.cancel()
+            del pcm
+    
     async def transcribe_file(self, file_path: str) -> List[TranscriptionResult]:
-        """Transcribe an audio file"""
+        """Transcribe a WAV file utterance by utterance"""
         results = []
         
         try:
-            with open(file_path, 'rb') as f:
-                audio_data = f.read()
-            
-            # Process in chunks for large files
-            chunk_size = 1024 * 1024  # 1MB chunks
-            for i in range(0, len(audio_data), chunk_size):
-                chunk = audio_data[i:i + chunk_size]
-                result = await self.transcribe_audio_chunk(chunk)
-                if result.text.strip():
-                    results.append(result)
-            
-            return results
-            
+            async for result in self.transcribe_wav_stream(file_path):
+                results.append(result)
         except Exception as e:
             logger.error(f"File transcription error: {e}")
-            return results
+        
+        return sorted(results, key=lambda result: result.timestamp)
 
 class RealTimeTranscriber:
     """Real-time transcription with buffering and streaming"""
     
-    def __init__(self, transcriber: AudioTranscriber):
+    def __init__(self, transcriber: AudioTranscriber, buffer_duration: float = 2.0,
+                 sample_rate: int = 16000, overlap_duration: float = 0.25):
         self.transcriber = transcriber
-        self.audio_buffer = []
-        self.buffer_duration = 2.0  # seconds
-        self.sample_rate = 16000
-        
-    async def add_audio_chunk(self, audio_chunk: bytes, timestamp: float):
-        """Add audio chunk to buffer"""
-        self.audio_buffer.append({
-            "data": audio_chunk,
-            "timestamp": timestamp
-        })
-        
-        # Process buffer if it's long enough
-        if len(self.audio_buffer) >= self.buffer_duration * self.sample_rate // 1024:
-            await self._process_buffer()
-    
-    async def _process_buffer(self):
-        """Process accumulated audio buffer"""
-        if not self.audio_buffer:
-            return
+        self.buffer_duration = buffer_duration  # seconds
+        self.sample_rate = sample_rate
+        self.flush_samples = int(buffer_duration * sample_rate)
+        self.overlap_samples = min(int(overlap_duration * sample_rate), self.flush_samples // 2)
+        self.audio_buffer = AudioRingBuffer(2 * (self.flush_samples + self.overlap_samples), sample_rate)
+        # Absolute index of the first sample not yet covered by a transcription
+        self._unprocessed_index = 0
         
-        # Combine audio chunks
-        combined_audio = b"".join([chunk["data"] for chunk in self.audio_buffer])
+    async def add_audio_chunk(self, audio_chunk: bytes, timestamp: float) -> List[TranscriptionResult]:
+        """Add int16 PCM recorded at `timestamp`, transcribing every full buffer"""
+        samples = np.frombuffer(audio_chunk, dtype=np.int16)
+        results = []
+        offset = 0
         
-        # Transcribe
-        result = await self.transcriber.transcribe_audio_chunk(combined_audio)
+        while offset < samples.size:
+            count = min(self.audio_buffer.free, samples.size - offset)
+            self.audio_buffer.write(samples[offset:offset + count], timestamp + offset / self.sample_rate)
+            offset += count
+            
+            # Process buffer once it holds a full segment of real samples
+            while self.audio_buffer.available >= self.flush_samples:
+                results.append(await self._process_buffer(self.flush_samples))
         
-        # Update timestamp
-        if self.audio_buffer:
-            result.timestamp = self.audio_buffer[0]["timestamp"]
+        return results
+    
+    async def _process_buffer(self, sample_count: int) -> TranscriptionResult:
+        """Transcribe the oldest `sample_count` samples, keeping the overlap for the next segment"""
+        start = self.audio_buffer.read_index
+        end = start + sample_count
         
-        # Clear buffer
-        self.audio_buffer = []
+        result = await self.transcriber.transcribe_pcm(
+            self.audio_buffer.view(start, end),
+            self.sample_rate,
+            start_time=self.audio_buffer.timestamp_at(start),
+            end_time=self.audio_buffer.timestamp_at(end - 1) + 1 / self.sample_rate
+        )
+        
+        self._unprocessed_index = end
+        self.audio_buffer.consume(max(sample_count - self.overlap_samples, 1))
         
         return result
     
     async def flush_buffer(self) -> Optional[TranscriptionResult]:
         """Process remaining audio in buffer"""
-        if self.audio_buffer:
-            return await self._process_buffer()
-        return None
+        result = None
+        if self.audio_buffer.write_index > self._unprocessed_index and self.audio_buffer.available:
+            result = await self._process_buffer(self.audio_buffer.available)
+        self.audio_buffer.clear()
+        return result
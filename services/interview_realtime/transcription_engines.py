@@ -0,0 +1,230 @@
+"""
+Transcription Engines
+Pluggable on-box speech-to-text backends used when no Whisper API key is configured
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+import time
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class EngineTranscript(BaseModel):
+    text: str
+    confidence: float
+
+
+class TranscriptionEngine(ABC):
+    """Interface every speech-to-text engine implements"""
+
+    name = "base"
+    sample_rate = 16000
+
+    @abstractmethod
+    async def transcribe(self, pcm: bytes, sample_rate: int = 16000) -> EngineTranscript:
+        """Transcribe one utterance of mono int16 PCM"""
+
+    async def transcribe_batch(self, pcm_segments: Sequence[bytes], sample_rate: int = 16000) -> List[EngineTranscript]:
+        """Transcribe several utterances, in order"""
+        return list(await asyncio.gather(*(self.transcribe(pcm, sample_rate) for pcm in pcm_segments)))
+
+    async def transcribe_partial(self, pcm: bytes, sample_rate: int = 16000) -> EngineTranscript:
+        """Best-effort transcript of an utterance that is still in progress"""
+        return await self.transcribe(pcm, sample_rate)
+
+    async def close(self):
+        """Release engine resources"""
+
+    def _check_sample_rate(self, sample_rate: int):
+        if sample_rate != self.sample_rate:
+            raise ValueError(f"{self.name} engine expects {self.sample_rate} Hz audio, got {sample_rate} Hz")
+
+
+# ----------------------
+# Local Whisper (CPU, int8-quantized) engine
+# ----------------------
+_worker_model = None
+
+
+def _init_whisper_worker(model_size: str, compute_type: str, cpu_threads: int):
+    """Load the Whisper model once per worker process"""
+    global _worker_model
+    from faster_whisper import WhisperModel
+
+    _worker_model = WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _whisper_transcribe_batch(pcm_segments: List[bytes], language: Optional[str], beam_size: int) -> List[Tuple[str, float]]:
+    """Transcribe a batch of segments inside a worker process"""
+    results = []
+    for pcm in pcm_segments:
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        segments, _info = _worker_model.transcribe(audio, language=language, beam_size=beam_size)
+
+        texts = []
+        log_probs = []
+        for segment in segments:
+            texts.append(segment.text.strip())
+            log_probs.append(segment.avg_logprob)
+
+        confidence = float(np.exp(np.mean(log_probs))) if log_probs else 0.0
+        results.append((" ".join(text for text in texts if text), confidence))
+    return results
+
+
+class LocalWhisperEngine(TranscriptionEngine):
+    """Quantized Whisper (faster-whisper / CTranslate2) running in worker processes"""
+
+    name = "whisper"
+
+    def __init__(
+        self,
+        model_size: str = "base",
+        compute_type: str = "int8",
+        workers: int = 1,
+        cpu_threads: int = 4,
+        batch_size: int = 8,
+        language: Optional[str] = "en",
+        beam_size: int = 1,
+    ):
+        if importlib.util.find_spec("faster_whisper") is None:
+            raise RuntimeError("faster-whisper is not installed")
+
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.workers = workers
+        self.cpu_threads = cpu_threads
+        self.batch_size = batch_size
+        self.language = language
+        self.beam_size = beam_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_whisper_worker,
+                initargs=(self.model_size, self.compute_type, self.cpu_threads),
+            )
+        return self._pool
+
+    async def transcribe(self, pcm: bytes, sample_rate: int = 16000) -> EngineTranscript:
+        return (await self.transcribe_batch([pcm], sample_rate))[0]
+
+    async def transcribe_batch(self, pcm_segments: Sequence[bytes], sample_rate: int = 16000) -> List[EngineTranscript]:
+        self._check_sample_rate(sample_rate)
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+
+        batches = [list(pcm_segments[i:i + self.batch_size]) for i in range(0, len(pcm_segments), self.batch_size)]
+        batch_results = await asyncio.gather(*(
+            loop.run_in_executor(pool, _whisper_transcribe_batch, [bytes(pcm) for pcm in batch], self.language, self.beam_size)
+            for batch in batches
+        ))
+
+        return [
+            EngineTranscript(text=text, confidence=confidence)
+            for results in batch_results
+            for text, confidence in results
+        ]
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# ----------------------
+# Deterministic engine for tests
+# ----------------------
+class FakeTranscriptionEngine(TranscriptionEngine):
+    """Deterministic engine: the same audio always yields the same phrase"""
+
+    name = "fake"
+
+    DEFAULT_PHRASES = [
+        "I have five years of experience with python and react",
+        "I would start by profiling the slow query and checking the indexes",
+        "Our team used docker and kubernetes to deploy the microservices",
+        "I enjoy mentoring junior developers and reviewing code",
+    ]
+
+    def __init__(self, phrases: Optional[List[str]] = None, confidence: float = 0.9, latency: float = 0.0):
+        self.phrases = phrases or self.DEFAULT_PHRASES
+        self.confidence = confidence
+        self.latency = latency
+        self.calls: List[int] = []
+
+    async def transcribe(self, pcm: bytes, sample_rate: int = 16000) -> EngineTranscript:
+        self.calls.append(len(pcm))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if not any(pcm):
+            return EngineTranscript(text="", confidence=0.0)
+
+        phrase = self.phrases[zlib.crc32(pcm) % len(self.phrases)]
+        return EngineTranscript(text=phrase, confidence=self.confidence)
+
+    async def transcribe_partial(self, pcm: bytes, sample_rate: int = 16000) -> EngineTranscript:
+        transcript = await self.transcribe(pcm, sample_rate)
+        words = transcript.text.split()
+        return EngineTranscript(text=" ".join(words[:max(1, len(words) // 2)]) if words else "",
+                                confidence=transcript.confidence / 2)
+
+
+ENGINE_REGISTRY: Dict[str, Type[TranscriptionEngine]] = {
+    LocalWhisperEngine.name: LocalWhisperEngine,
+    FakeTranscriptionEngine.name: FakeTranscriptionEngine,
+}
+
+_default_engine: Optional[TranscriptionEngine] = None
+# A failed creation is remembered, so callers don't rebuild (and re-log) it on every request
+ENGINE_RETRY_SECONDS = 60.0
+_default_engine_failed_at: Optional[float] = None
+
+
+def create_engine(name: str, **options) -> TranscriptionEngine:
+    """Instantiate a registered engine by name"""
+    if name not in ENGINE_REGISTRY:
+        raise ValueError(f"Unknown transcription engine: {name}")
+    return ENGINE_REGISTRY[name](**options)
+
+
+def get_default_engine() -> Optional[TranscriptionEngine]:
+    """Process-wide engine selected by TRANSCRIPTION_ENGINE / WHISPER_MODEL
+
+    After a failed creation, None is returned without retrying until
+    ENGINE_RETRY_SECONDS have passed.
+    """
+    global _default_engine, _default_engine_failed_at
+    if _default_engine is None:
+        if _default_engine_failed_at is not None and \
+                time.monotonic() - _default_engine_failed_at < ENGINE_RETRY_SECONDS:
+            return None
+        name = os.environ.get("TRANSCRIPTION_ENGINE", LocalWhisperEngine.name)
+        options = {}
+        if name == LocalWhisperEngine.name:
+            options = {
+                "model_size": os.environ.get("WHISPER_MODEL", "base"),
+                "workers": int(os.environ.get("WHISPER_WORKERS", "1")),
+            }
+        try:
+            _default_engine = create_engine(name, **options)
+            _default_engine_failed_at = None
+            logger.info(f"Transcription engine '{name}' ready")
+        except Exception as e:
+            _default_engine_failed_at = time.monotonic()
+            logger.error(f"Transcription engine '{name}' unavailable (retrying in {ENGINE_RETRY_SECONDS:.0f}s): {e}")
+            return None
+    return _default_engine
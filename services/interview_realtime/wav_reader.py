@@ -0,0 +1,93 @@
+"""
+WAV Reader
+Parses RIFF/WAVE headers and memory-maps the PCM payload without loading it
+"""
+
+import logging
+import os
+import struct
+
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavInfo(BaseModel):
+    sample_rate: int
+    channels: int
+    bits_per_sample: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // (self.channels * self.bits_per_sample // 8)
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+
+def read_wav_info(file_path: str) -> WavInfo:
+    """Walk the RIFF chunks and locate the fmt and data chunks"""
+    file_size = os.path.getsize(file_path)
+
+    with open(file_path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12:
+            raise ValueError("Not a RIFF/WAVE file")
+        riff, _size, wave_id = struct.unpack("<4sI4s", header)
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError("Not a RIFF/WAVE file")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("WAV file has no data chunk")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+
+            if chunk_id == b"fmt ":
+                body = f.read(chunk_size)
+                if len(body) < 16:
+                    raise ValueError("WAV fmt chunk is truncated")
+                format_tag, channels, sample_rate, _byte_rate, _block_align, bits = struct.unpack("<HHIIHH", body[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    format_tag = struct.unpack("<H", body[24:26])[0]
+                fmt = (format_tag, channels, sample_rate, bits)
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("WAV data chunk precedes fmt chunk")
+                data_offset = f.tell()
+                # Streamed recorders leave the size as 0 or 0xFFFFFFFF; trust the file length then
+                if chunk_size in (0, 0xFFFFFFFF) or data_offset + chunk_size > file_size:
+                    chunk_size = file_size - data_offset
+                break
+            else:
+                f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+    format_tag, channels, sample_rate, bits = fmt
+    if format_tag != WAVE_FORMAT_PCM or bits != 16:
+        raise ValueError(f"Unsupported WAV encoding (format {format_tag:#x}, {bits} bits); 16-bit PCM required")
+
+    block_align = channels * bits // 8
+    return WavInfo(
+        sample_rate=sample_rate,
+        channels=channels,
+        bits_per_sample=bits,
+        data_offset=data_offset,
+        data_size=chunk_size - (chunk_size % block_align),
+    )
+
+
+def memmap_pcm(file_path: str, info: WavInfo) -> np.ndarray:
+    """Read-only int16 view of the interleaved samples, paged in on demand"""
+    if info.data_size == 0:
+        return np.empty(0, dtype=np.int16)
+    return np.memmap(file_path, dtype="<i2", mode="r", offset=info.data_offset, shape=(info.data_size // 2,))
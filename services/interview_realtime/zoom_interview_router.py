@@ -6,18 +6,29 @@ Handles webhook events and WebSocket connections for real-time analysis
 import asyncio
 import json
 import logging
+import os
+import tempfile
 from typing import Dict, List, Optional
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends, Form, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends, Form, UploadFile, File, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 import redis
 import uuid
 from datetime import datetime
 
-from zoom_listener import ZoomListener
+from zoom_listener import COMPLETED_SESSION_TTL, TIMELINE_FIELDS, ZoomListener
 from transcriber import AudioTranscriber, RealTimeTranscriber
 from analyzer import RealTimeAnalyzer
 from score_calculator import InterviewScore
+from wav_reader import read_wav_info
+from fanout import FanoutHub
+from coalescer import SessionCoalescer
+from event_log import (
+    ANALYSIS_RESULT, SCORING_GROUP, SESSION_ENDED, SESSION_STARTED, STREAM_CONFIG, TRANSCRIPTION,
+    BroadcastConsumer, InterviewEvent, InterviewEventLog,
+    ReportBuilderConsumer, ScoringConsumer, analysis_event_data, event_to_message, id_key
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,11 +38,51 @@ redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=T
 # Initialize services
 zoom_listener = ZoomListener(redis_client)
 realtime_analyzer = RealTimeAnalyzer()
-interview_scores: Dict[str, InterviewScore] = {}
-active_connections: Dict[str, List[WebSocket]] = {}
+# Viewers per session; FANOUT_POLICY is disconnect, drop_oldest or coalesce
+FANOUT_QUEUE_SIZE = int(os.environ.get("ZOOM_FANOUT_QUEUE_SIZE", "64"))
+FANOUT_POLICY = os.environ.get("ZOOM_FANOUT_POLICY", "drop_oldest")
+fanout_hub = FanoutHub(max_queue=FANOUT_QUEUE_SIZE, policy=FANOUT_POLICY)
+# Dashboard update rate per session; 0 sends every analysis result as it arrives
+COALESCE_HZ = float(os.environ.get("ZOOM_COALESCE_HZ", "0"))
+dashboard_coalescer = SessionCoalescer(fanout_hub, default_rate_hz=COALESCE_HZ)
+
+event_log = InterviewEventLog(redis_client)
 
 router = APIRouter(prefix="/api/zoom", tags=["Zoom Interview Analysis"])
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB spool writes
+UPLOAD_MAX_CONCURRENCY = 4  # segment batches transcribed at once
+SCORING_DRAIN_SECONDS = 10.0  # how long ending a session waits for pending transcriptions to be scored
+
+async def deliver_event(event: InterviewEvent):
+    """Forward an event from this worker's fan-out group to its local viewers"""
+    if event.type == STREAM_CONFIG:
+        dashboard_coalescer.configure(event.session_id, event.data.get("coalesce_hz"))
+    
+    message = event_to_message(event)
+    if message is not None:
+        await broadcast_to_session(event.session_id, message, event_id=event.id)
+    
+    if event.type == SESSION_ENDED:
+        dashboard_coalescer.discard(event.session_id)
+
+scoring_consumer = ScoringConsumer(event_log, realtime_analyzer)
+report_consumer = ReportBuilderConsumer(event_log)
+broadcast_consumer = BroadcastConsumer(event_log, deliver_event, fanout_hub.topics)
+
+@router.on_event("startup")
+async def start_event_consumers():
+    for consumer in (scoring_consumer, report_consumer, broadcast_consumer):
+        consumer.start()
+    dashboard_coalescer.start()
+
+@router.on_event("shutdown")
+async def stop_event_consumers():
+    for consumer in (scoring_consumer, report_consumer, broadcast_consumer):
+        await consumer.stop()
+    await dashboard_coalescer.stop()
+    await fanout_hub.close()
+
 class WebhookEvent(BaseModel):
     event: str
     payload: dict
@@ -43,6 +94,9 @@ class InterviewSessionRequest(BaseModel):
     job_requirements: List[str] = []
     candidate_id: Optional[str] = None
 
+class StreamConfigRequest(BaseModel):
+    coalesce_hz: Optional[float] = None  # 0 disables coalescing, None restores the server default
+
 class TranscriptionRequest(BaseModel):
     session_id: str
     audio_data: str  # Base64 encoded audio
@@ -57,14 +111,11 @@ async def handle_zoom_webhook(event: WebhookEvent):
         # Process webhook event
         result = await zoom_listener.handle_webhook(event.dict())
         
-        # If it's a meeting start event, initialize scoring
+        # If it's a meeting start event, open the session's event stream
         if event.event == "meeting.started" and "session_id" in result:
-            session_id = result["session_id"]
-            interview_scores[session_id] = InterviewScore()
-            
-            # Set job requirements if available
-            if "job_requirements" in result:
-                interview_scores[session_id].set_job_requirements(result["job_requirements"])
+            await event_log.append(result["session_id"], SESSION_STARTED, {
+                "job_requirements": result.get("job_requirements", [])
+            })
         
         return JSONResponse(content=result)
         
@@ -90,18 +141,14 @@ async def start_interview_session(request: InterviewSessionRequest):
         }
         
         # Store in Redis
-        redis_client.setex(
-            f"zoom_session:{session_id}", 
-            3600,
-            json.dumps(session_data)
-        )
-        
-        # Initialize scoring
-        interview_scores[session_id] = InterviewScore()
-        interview_scores[session_id].set_job_requirements(request.job_requirements)
+        await zoom_listener.create_session(session_data)
         
-        # Initialize active connections
-        active_connections[session_id] = []
+        # Open the event stream; scoring consumers read the requirements from it
+        await event_log.append(session_id, SESSION_STARTED, {
+            "job_role": request.job_role,
+            "job_requirements": request.job_requirements,
+            "candidate_id": request.candidate_id
+        })
         
         logger.info(f"Started interview session {session_id} for meeting {request.meeting_id}")
         
@@ -121,21 +168,34 @@ async def websocket_live_feed(websocket: WebSocket, session_id: str):
     await websocket.accept()
     
     try:
-        # Add connection to active connections
-        if session_id not in active_connections:
-            active_connections[session_id] = []
-        active_connections[session_id].append(websocket)
+        # Register the viewer; live events queue up while the history is assembled
+        fanout_hub.add(session_id, websocket, paused=True)
         
         logger.info(f"WebSocket connected for session {session_id}")
         
         # Send initial session data
+        preface = []
         session_data = await zoom_listener.get_session(session_id)
         if session_data:
-            await websocket.send_json({
+            preface.append({
                 "type": "session_data",
                 "data": session_data
             })
         
+        # Replay what happened before this viewer joined
+        replay_until = await broadcast_consumer.attach(session_id)
+        events = await event_log.replay(session_id, end=replay_until)
+        for event in events:
+            if event.type == STREAM_CONFIG:
+                dashboard_coalescer.configure(session_id, event.data.get("coalesce_hz"))
+        history = [message for message in map(event_to_message, events) if message is not None]
+        if history:
+            preface.append({"type": "history", "data": history})
+        snapshot = dashboard_coalescer.snapshot(session_id)
+        if snapshot:
+            preface.append(snapshot)
+        fanout_hub.resume(websocket, preface, after=id_key(replay_until))
+        
         # Keep connection alive and handle incoming messages
         while True:
             try:
@@ -149,13 +209,13 @@ async def websocket_live_feed(websocket: WebSocket, session_id: str):
                 elif message.get("type") == "audio_chunk":
                     await handle_audio_chunk(session_id, message)
                 elif message.get("type") == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    fanout_hub.send(websocket, {"type": "pong"})
                 
             except WebSocketDisconnect:
                 break
             except Exception as e:
                 logger.error(f"Error handling WebSocket message: {e}")
-                await websocket.send_json({
+                fanout_hub.send(websocket, {
                     "type": "error",
                     "message": str(e)
                 })
@@ -165,15 +225,11 @@ async def websocket_live_feed(websocket: WebSocket, session_id: str):
     except Exception as e:
         logger.error(f"WebSocket error for session {session_id}: {e}")
     finally:
-        # Remove connection from active connections
-        if session_id in active_connections:
-            if websocket in active_connections[session_id]:
-                active_connections[session_id].remove(websocket)
-            if not active_connections[session_id]:
-                del active_connections[session_id]
+        # Stop the connection's writer and forget it
+        await fanout_hub.remove(websocket)
 
 async def handle_transcription_message(session_id: str, message: dict):
-    """Handle transcription message from client"""
+    """Append a client transcription to the session's event stream for scoring"""
     try:
         text = message.get("text", "")
         timestamp = message.get("timestamp", 0.0)
@@ -181,29 +237,11 @@ async def handle_transcription_message(session_id: str, message: dict):
         if not text.strip():
             return
         
-        # Analyze the text
-        analysis_result = await realtime_analyzer.analyze_text(text, timestamp)
-        
-        # Calculate score
-        if session_id in interview_scores:
-            score_metrics = interview_scores[session_id].calculate_real_time_score(analysis_result)
-            
-            # Broadcast to all connected clients
-            await broadcast_to_session(session_id, {
-                "type": "analysis_result",
-                "data": {
-                    "timestamp": timestamp,
-                    "text": text,
-                    "sentiment_score": analysis_result.sentiment_score,
-                    "emotion_scores": analysis_result.emotion_scores,
-                    "confidence_score": analysis_result.confidence_score,
-                    "keywords": analysis_result.keywords,
-                    "technical_skills": analysis_result.technical_skills,
-                    "overall_score": score_metrics.overall_score,
-                    "stress_level": score_metrics.stress_level,
-                    "engagement_score": score_metrics.engagement_score
-                }
-            })
+        await event_log.append(session_id, TRANSCRIPTION, {
+            "source": "text",
+            "text": text,
+            "timestamp": timestamp
+        })
         
     except Exception as e:
         logger.error(f"Error handling transcription message: {e}")
@@ -226,43 +264,20 @@ async def handle_audio_chunk(session_id: str, message: dict):
             result = await transcriber.transcribe_audio_chunk(audio_bytes)
             
             if result.text.strip():
-                # Analyze transcribed text
-                analysis_result = await realtime_analyzer.analyze_text(result.text, timestamp)
-                
-                # Calculate score
-                if session_id in interview_scores:
-                    score_metrics = interview_scores[session_id].calculate_real_time_score(analysis_result)
-                    
-                    # Broadcast results
-                    await broadcast_to_session(session_id, {
-                        "type": "transcription_result",
-                        "data": {
-                            "timestamp": timestamp,
-                            "text": result.text,
-                            "confidence": result.confidence,
-                            "sentiment_score": analysis_result.sentiment_score,
-                            "emotion_scores": analysis_result.emotion_scores,
-                            "overall_score": score_metrics.overall_score,
-                            "stress_level": score_metrics.stress_level
-                        }
-                    })
+                # Scoring and broadcast happen in the event consumers
+                await event_log.append(session_id, TRANSCRIPTION, {
+                    "source": "audio",
+                    "text": result.text,
+                    "timestamp": timestamp,
+                    "confidence": result.confidence
+                })
         
     except Exception as e:
         logger.error(f"Error handling audio chunk: {e}")
 
-async def broadcast_to_session(session_id: str, message: dict):
-    """Broadcast message to all connected clients in a session"""
-    if session_id in active_connections:
-        disconnected = []
-        for websocket in active_connections[session_id]:
-            try:
-                await websocket.send_json(message)
-            except:
-                disconnected.append(websocket)
-        
-        # Remove disconnected websockets
-        for websocket in disconnected:
-            active_connections[session_id].remove(websocket)
+async def broadcast_to_session(session_id: str, message: dict, event_id: Optional[str] = None):
+    """Queue a message for every viewer of a session without waiting on any socket"""
+    dashboard_coalescer.publish(session_id, message, sequence=id_key(event_id) if event_id else None)
 
 @router.get("/session/{session_id}")
 async def get_session_data(session_id: str):
@@ -274,9 +289,8 @@ async def get_session_data(session_id: str):
             raise HTTPException(status_code=404, detail="Session not found")
         
         # Get current scores
-        scores = None
-        if session_id in interview_scores:
-            scores = interview_scores[session_id].get_performance_summary()
+        score_data = await event_log.load_score(session_id)
+        scores = score_data.get_performance_summary() if score_data else None
         
         return JSONResponse(content={
             "success": True,
@@ -291,20 +305,19 @@ async def get_session_data(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/session/{session_id}/scores")
-async def get_session_scores(session_id: str):
-    """Get detailed scoring data for a session"""
+async def get_session_scores(session_id: str, limit: int = Query(50, ge=0)):
+    """Get detailed scoring data for a session; `limit=0` returns the full score history"""
     try:
-        if session_id not in interview_scores:
+        score_data = await event_log.load_score(session_id)
+        if score_data is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        score_data = interview_scores[session_id]
-        
         return JSONResponse(content={
             "success": True,
             "current_score": score_data.get_average_score(),
             "trend": score_data.get_score_trend(),
             "performance_summary": score_data.get_performance_summary(),
-            "score_history": [score.dict() for score in score_data.score_history[-50:]]  # Last 50 scores
+            "score_history": [score.dict() for score in score_data.score_history[-limit:]]
         })
         
     except HTTPException:
@@ -313,31 +326,65 @@ async def get_session_scores(session_id: str):
         logger.error(f"Error getting session scores: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/session/{session_id}/timeline/{field}")
+async def get_session_timeline(
+    session_id: str,
+    field: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    resolution: Optional[float] = Query(None, gt=0)
+):
+    """Emotion/sentiment samples over a time range, bucketed to `resolution` seconds"""
+    if field not in TIMELINE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"No timeline for {field}")
+    try:
+        buckets = await zoom_listener.get_session_timeline(session_id, field, start, end, resolution)
+        return JSONResponse(content={"success": True, "field": field, "buckets": buckets})
+
+    except Exception as e:
+        logger.error(f"Error getting session timeline: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/session/{session_id}/stream-config")
+async def set_stream_config(session_id: str, request: StreamConfigRequest):
+    """Set how often dashboard updates are flushed to this session's viewers"""
+    try:
+        config = {"coalesce_hz": request.coalesce_hz}
+        
+        # Logged as an event so every worker serving the session applies it
+        await event_log.append(session_id, STREAM_CONFIG, config)
+        
+        return JSONResponse(content={"success": True, "session_id": session_id, "config": config})
+        
+    except Exception as e:
+        logger.error(f"Error setting stream config: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/session/{session_id}/end")
 async def end_interview_session(session_id: str):
     """End an interview session and generate final report"""
     try:
         # Update session status
-        session_data = await zoom_listener.get_session(session_id)
-        if session_data:
-            session_data["status"] = "completed"
-            session_data["end_time"] = datetime.now().isoformat()
-            
-            await zoom_listener.update_session_data(session_id, session_data)
-        
-        # Get final performance summary
-        final_summary = None
-        if session_id in interview_scores:
-            final_summary = interview_scores[session_id].get_performance_summary()
-        
-        # Broadcast session end to all connected clients
-        await broadcast_to_session(session_id, {
-            "type": "session_ended",
-            "data": {
-                "session_id": session_id,
-                "final_summary": final_summary
-            }
-        })
+        await zoom_listener.update_session_data(
+            session_id,
+            {"status": "completed", "end_time": datetime.now().isoformat()},
+            ttl=COMPLETED_SESSION_TTL
+        )
+        
+        # Get final performance summary once everything said so far has been scored
+        scored = await event_log.wait_for_group(
+            session_id, SCORING_GROUP, await event_log.last_id(session_id), timeout=SCORING_DRAIN_SECONDS
+        )
+        if not scored:
+            logger.warning(f"Session {session_id} ended before scoring caught up; final summary may be partial")
+        score_data = await event_log.load_score(session_id)
+        final_summary = score_data.get_performance_summary() if score_data else None
+        
+        # Fan-out consumers broadcast the end; the report builder stores the final report
+        await event_log.append(session_id, SESSION_ENDED, {
+            "session_id": session_id,
+            "final_summary": final_summary
+        }, ttl=COMPLETED_SESSION_TTL)
         
         logger.info(f"Interview session {session_id} ended")
         
@@ -351,60 +398,100 @@ async def end_interview_session(session_id: str):
         logger.error(f"Error ending session: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/session/{session_id}/report")
+async def get_session_report(session_id: str):
+    """Get the report built when the session ended"""
+    report = await event_log.get_report(session_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not available")
+    
+    return JSONResponse(content={"success": True, "report": report})
+
 @router.post("/upload-audio")
 async def upload_audio_file(
     session_id: str = Form(...),
     file: UploadFile = File(...)
 ):
-    """Upload audio file for analysis"""
+    """Upload a WAV recording and stream per-segment analysis back as NDJSON"""
+    temp_file_path = None
     try:
-        # Save uploaded file temporarily
-        import tempfile
-        import os
-        
+        # Spool the upload to disk in bounded chunks instead of reading it whole
         with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
             temp_file_path = temp_file.name
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                temp_file.write(chunk)
+        
+        try:
+            read_wav_info(temp_file_path)
+        except ValueError as e:
+            _remove_upload(temp_file_path)
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Removed after the response, even when the client disconnects before the body is read
+        return StreamingResponse(
+            stream_audio_analysis(session_id, temp_file_path),
+            media_type="application/x-ndjson",
+            background=BackgroundTask(_remove_upload, temp_file_path)
+        )
         
-        # Transcribe the audio file
-        async with AudioTranscriber() as transcriber:
-            results = await transcriber.transcribe_file(temp_file_path)
-        
-        # Clean up temp file
-        os.unlink(temp_file_path)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing audio file: {e}")
+        if temp_file_path:
+            _remove_upload(temp_file_path)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _remove_upload(file_path: str):
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+
+async def stream_audio_analysis(session_id: str, file_path: str):
+    """Yield one NDJSON line per analyzed segment, then a summary line"""
+    total_segments = 0
+    try:
+        scorer = InterviewScore()
+        scorer.set_job_requirements(await event_log.job_requirements(session_id))
         
-        # Process each transcription result
-        analysis_results = []
-        for result in results:
-            analysis_result = await realtime_analyzer.analyze_text(result.text, result.timestamp)
-            
-            if session_id in interview_scores:
-                score_metrics = interview_scores[session_id].calculate_real_time_score(analysis_result)
-                analysis_results.append({
+        async with AudioTranscriber() as transcriber:
+            async for result in transcriber.transcribe_wav_stream(file_path, max_concurrency=UPLOAD_MAX_CONCURRENCY):
+                total_segments += 1
+                analysis_result = await realtime_analyzer.analyze_text(result.text, result.timestamp)
+                
+                score_metrics = scorer.calculate_real_time_score(analysis_result, record=False)
+                await event_log.append(session_id, ANALYSIS_RESULT, analysis_event_data(
+                    analysis_result, score_metrics, source="upload", confidence=result.confidence
+                ))
+                
+                yield json.dumps({
+                    "type": "segment",
                     "text": result.text,
                     "timestamp": result.timestamp,
+                    "start_time": result.start_time,
+                    "end_time": result.end_time,
                     "confidence": result.confidence,
                     "analysis": analysis_result.dict(),
                     "score": score_metrics.dict()
-                })
-        
-        return JSONResponse(content={
-            "success": True,
-            "results": analysis_results,
-            "total_segments": len(results)
-        })
+                }) + "\n"
         
+        yield json.dumps({"type": "summary", "success": True, "total_segments": total_segments}) + "\n"
+    
     except Exception as e:
-        logger.error(f"Error processing audio file: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error streaming audio analysis: {e}")
+        yield json.dumps({"type": "error", "success": False, "message": str(e), "total_segments": total_segments}) + "\n"
 
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
     return JSONResponse(content={
         "status": "healthy",
-        "active_sessions": len(active_connections),
-        "total_scores_tracked": len(interview_scores),
+        "active_sessions": len(fanout_hub.topics()),
+        "fanout": fanout_hub.stats(),
+        "total_scores_tracked": len(await event_log.session_ids()),
         "timestamp": datetime.now().isoformat()
     })
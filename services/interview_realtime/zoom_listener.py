@@ -7,17 +7,34 @@ import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 import aiohttp
 from fastapi import HTTPException
 import redis
 import uuid
 
+from timeline import DEFAULT_RAW_SECONDS, CompactingTimeline, samples_from_items
+
 logger = logging.getLogger(__name__)
 
+ACTIVE_SESSION_TTL = 3600  # 1 hour
+COMPLETED_SESSION_TTL = 86400  # 24 hours
+
+# Append-only session fields stored as Redis lists; everything else lives in the metadata hash
+LIST_FIELDS = ("transcript", "emotion_data", "sentiment_scores", "confidence_scores")
+
+# Sample lists whose older items are folded into a compacting timeline, so a session's
+# storage stays bounded however long the interview runs
+TIMELINE_FIELDS = ("emotion_data", "sentiment_scores", "confidence_scores")
+COMPACT_AFTER_ITEMS = 600  # list length before compaction is considered
+COMPACT_EVERY_ITEMS = 100  # after that, retried once per this many appended items
+MAX_RAW_ITEMS = 1200  # hard cap for lists whose items carry no usable timestamp
+COMPACT_LOCK_SECONDS = 30
+
 class ZoomListener:
     def __init__(self, redis_client: redis.Redis):
         self.redis_client = redis_client
+        # meeting_id -> session metadata (no transcript or sample lists)
         self.active_sessions: Dict[str, Dict] = {}
         self.webhook_secret = "your_zoom_webhook_secret"  # Configure in production
         
@@ -44,6 +61,153 @@ class ZoomListener:
             logger.error(f"Error handling webhook: {e}")
             raise HTTPException(status_code=500, detail=str(e))
     
+    # ----------------------
+    # Redis layout
+    # ----------------------
+    @staticmethod
+    def _key(session_id: str, part: Optional[str] = None) -> str:
+        return f"zoom_session:{session_id}" if part is None else f"zoom_session:{session_id}:{part}"
+    
+    def _expire_all(self, pipe, session_id: str, ttl: int):
+        """Keep every structure of a session on the same TTL"""
+        pipe.expire(self._key(session_id), ttl)
+        pipe.expire(self._key(session_id, "participants"), ttl)
+        for field in LIST_FIELDS:
+            pipe.expire(self._key(session_id, field), ttl)
+        for field in TIMELINE_FIELDS:
+            pipe.expire(self._timeline_key(session_id, field), ttl)
+            pipe.expire(self._offset_key(session_id, field), ttl)
+    
+    @staticmethod
+    def _load_visits(stored: Optional[str]) -> List[dict]:
+        """A participant's join/leave records, oldest first (one record per visit)"""
+        if not stored:
+            return []
+        visits = json.loads(stored)
+        return visits if isinstance(visits, list) else [visits]
+    
+    @staticmethod
+    def _visits_by_user(participants: Iterable[dict]) -> Dict[str, List[dict]]:
+        visits: Dict[str, List[dict]] = {}
+        for participant in participants:
+            visits.setdefault(participant["user_id"], []).append(participant)
+        return visits
+    
+    def _timeline_key(self, session_id: str, field: str) -> str:
+        return self._key(session_id, f"{field}_timeline")
+    
+    def _offset_key(self, session_id: str, field: str) -> str:
+        """Number of items compacted off the head of a sample list"""
+        return self._key(session_id, f"{field}_offset")
+    
+    async def create_session(self, session_data: dict, ttl: int = ACTIVE_SESSION_TTL) -> dict:
+        """Store a new session, splitting metadata from list fields"""
+        session_id = session_data["session_id"]
+        metadata = {k: v for k, v in session_data.items() if k not in LIST_FIELDS and k != "participants"}
+        
+        pipe = self.redis_client.pipeline()
+        pipe.delete(self._key(session_id), self._key(session_id, "participants"),
+                    *(self._key(session_id, field) for field in LIST_FIELDS),
+                    *(self._timeline_key(session_id, field) for field in TIMELINE_FIELDS),
+                    *(self._offset_key(session_id, field) for field in TIMELINE_FIELDS))
+        pipe.hset(self._key(session_id), mapping={k: json.dumps(v) for k, v in metadata.items()})
+        for user_id, visits in self._visits_by_user(session_data.get("participants", [])).items():
+            pipe.hset(self._key(session_id, "participants"), user_id, json.dumps(visits))
+        for field in LIST_FIELDS:
+            if session_data.get(field):
+                pipe.rpush(self._key(session_id, field), *(json.dumps(item) for item in session_data[field]))
+        self._expire_all(pipe, session_id, ttl)
+        pipe.execute()
+        
+        return metadata
+    
+    async def append_session_items(self, session_id: str, field: str, items: List, ttl: int = ACTIVE_SESSION_TTL) -> bool:
+        """Append to one of the session's list fields without touching the rest"""
+        if field not in LIST_FIELDS:
+            raise ValueError(f"{field} is not a list field")
+        if not items:
+            return True
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.rpush(self._key(session_id, field), *(json.dumps(item) for item in items))
+            self._expire_all(pipe, session_id, ttl)
+            length = pipe.execute()[0]
+            
+            if field in TIMELINE_FIELDS and length > COMPACT_AFTER_ITEMS and \
+                    (length - len(items)) // COMPACT_EVERY_ITEMS != length // COMPACT_EVERY_ITEMS:
+                self._compact(session_id, field, ttl)
+            return True
+        except Exception as e:
+            logger.error(f"Error appending {field} to session {session_id}: {e}")
+            return False
+    
+    # ----------------------
+    # Sample compaction
+    # ----------------------
+    def _compact(self, session_id: str, field: str, ttl: int):
+        """Fold list items older than the raw window into the field's timeline and trim them off the list
+        
+        Only the head of the list is trimmed, so items appended meanwhile are
+        kept; a short lock keeps two workers from folding the same items. The
+        field's offset counts the trimmed items, so item indices stay stable.
+        """
+        lock_key = self._key(session_id, f"{field}_compacting")
+        if not self.redis_client.set(lock_key, "1", nx=True, ex=COMPACT_LOCK_SECONDS):
+            return
+        try:
+            list_key = self._key(session_id, field)
+            samples = samples_from_items(json.loads(item) for item in self.redis_client.lrange(list_key, 0, -1))
+            if not samples:
+                return
+            
+            newest = max(sample[0] for sample in samples)
+            cutoff = newest - DEFAULT_RAW_SECONDS
+            count = 0
+            while count < len(samples) and samples[count][0] < cutoff:
+                count += 1
+            count = max(count, len(samples) - MAX_RAW_ITEMS)
+            if not count:
+                return
+            
+            timeline = self._load_timeline(session_id, field) or CompactingTimeline()
+            for sample in samples[:count]:
+                timeline.fold(*sample)
+            timeline.compact(newest)
+            
+            pipe = self.redis_client.pipeline()
+            pipe.set(self._timeline_key(session_id, field), json.dumps(timeline.to_dict()))
+            pipe.ltrim(list_key, count, -1)
+            pipe.incrby(self._offset_key(session_id, field), count)
+            self._expire_all(pipe, session_id, ttl)
+            pipe.execute()
+            logger.debug(f"Compacted {count} {field} items for session {session_id}")
+        except Exception as e:
+            logger.error(f"Error compacting {field} for session {session_id}: {e}")
+        finally:
+            self.redis_client.delete(lock_key)
+    
+    def _load_timeline(self, session_id: str, field: str) -> Optional[CompactingTimeline]:
+        stored = self.redis_client.get(self._timeline_key(session_id, field))
+        return CompactingTimeline.from_dict(json.loads(stored)) if stored else None
+    
+    async def get_session_timeline(self, session_id: str, field: str, start: Optional[float] = None,
+                                   end: Optional[float] = None, resolution: Optional[float] = None) -> List[dict]:
+        """Bucket summaries (mean/min/max/dominant) of one sample field over [start, end)
+        
+        Compacted history and the recent raw items are queried together;
+        ``resolution`` re-buckets the result into bins of that many seconds.
+        """
+        if field not in TIMELINE_FIELDS:
+            raise ValueError(f"{field} has no timeline")
+        try:
+            timeline = self._load_timeline(session_id, field) or CompactingTimeline()
+            items = self.redis_client.lrange(self._key(session_id, field), 0, -1)
+            timeline.raw.extend(samples_from_items(json.loads(item) for item in items))
+            return timeline.query(start, end, resolution)
+        except Exception as e:
+            logger.error(f"Error querying {field} timeline for session {session_id}: {e}")
+            return []
+    
     async def _handle_meeting_started(self, event_data: dict) -> dict:
         """Initialize interview session when meeting starts"""
         meeting_id = event_data["payload"]["object"]["id"]
@@ -53,22 +217,11 @@ class ZoomListener:
             "session_id": session_id,
             "meeting_id": meeting_id,
             "start_time": datetime.now().isoformat(),
-            "participants": [],
-            "transcript": [],
-            "emotion_data": [],
-            "sentiment_scores": [],
-            "confidence_scores": [],
             "status": "active"
         }
         
         # Store in Redis
-        self.redis_client.setex(
-            f"zoom_session:{session_id}", 
-            3600,  # 1 hour TTL
-            json.dumps(session_data)
-        )
-        
-        self.active_sessions[meeting_id] = session_data
+        self.active_sessions[meeting_id] = await self.create_session(session_data)
         
         logger.info(f"Meeting {meeting_id} started, session {session_id} created")
         
@@ -84,20 +237,24 @@ class ZoomListener:
         participant = event_data["payload"]["object"]["participant"]
         
         if meeting_id in self.active_sessions:
-            session = self.active_sessions[meeting_id]
-            session["participants"].append({
+            session_id = self.active_sessions[meeting_id]["session_id"]
+            record = {
                 "user_id": participant["user_id"],
                 "user_name": participant["user_name"],
                 "join_time": datetime.now().isoformat(),
                 "role": participant.get("role", "participant")
-            })
+            }
+            
+            # A rejoin starts a new visit; earlier join/leave records are kept
+            participants_key = self._key(session_id, "participants")
+            visits = self._load_visits(self.redis_client.hget(participants_key, participant["user_id"]))
+            visits.append(record)
             
             # Update Redis
-            self.redis_client.setex(
-                f"zoom_session:{session['session_id']}", 
-                3600,
-                json.dumps(session)
-            )
+            pipe = self.redis_client.pipeline()
+            pipe.hset(participants_key, participant["user_id"], json.dumps(visits))
+            self._expire_all(pipe, session_id, ACTIVE_SESSION_TTL)
+            pipe.execute()
             
             logger.info(f"Participant {participant['user_name']} joined meeting {meeting_id}")
         
@@ -109,19 +266,20 @@ class ZoomListener:
         participant = event_data["payload"]["object"]["participant"]
         
         if meeting_id in self.active_sessions:
-            session = self.active_sessions[meeting_id]
-            # Update participant status
-            for p in session["participants"]:
-                if p["user_id"] == participant["user_id"]:
-                    p["leave_time"] = datetime.now().isoformat()
-                    break
+            session_id = self.active_sessions[meeting_id]["session_id"]
+            participants_key = self._key(session_id, "participants")
             
-            # Update Redis
-            self.redis_client.setex(
-                f"zoom_session:{session['session_id']}", 
-                3600,
-                json.dumps(session)
-            )
+            # Close the participant's most recent open visit
+            visits = self._load_visits(self.redis_client.hget(participants_key, participant["user_id"]))
+            open_visits = [visit for visit in visits if "leave_time" not in visit]
+            if open_visits:
+                open_visits[-1]["leave_time"] = datetime.now().isoformat()
+                
+                # Update Redis
+                pipe = self.redis_client.pipeline()
+                pipe.hset(participants_key, participant["user_id"], json.dumps(visits))
+                self._expire_all(pipe, session_id, ACTIVE_SESSION_TTL)
+                pipe.execute()
             
             logger.info(f"Participant {participant['user_name']} left meeting {meeting_id}")
         
@@ -137,10 +295,10 @@ class ZoomListener:
             session["status"] = "completed"
             
             # Store final session data
-            self.redis_client.setex(
-                f"zoom_session:{session['session_id']}", 
-                86400,  # 24 hours TTL for completed sessions
-                json.dumps(session)
+            await self.update_session_data(
+                session["session_id"],
+                {"end_time": session["end_time"], "status": "completed"},
+                ttl=COMPLETED_SESSION_TTL
             )
             
             # Remove from active sessions
@@ -162,15 +320,8 @@ class ZoomListener:
         transcript_data = event_data["payload"]["object"]["transcript"]
         
         if meeting_id in self.active_sessions:
-            session = self.active_sessions[meeting_id]
-            session["transcript"].extend(transcript_data)
-            
-            # Update Redis
-            self.redis_client.setex(
-                f"zoom_session:{session['session_id']}", 
-                3600,
-                json.dumps(session)
-            )
+            session_id = self.active_sessions[meeting_id]["session_id"]
+            await self.append_session_items(session_id, "transcript", transcript_data)
             
             logger.info(f"Transcript updated for meeting {meeting_id}")
         
@@ -182,34 +333,112 @@ class ZoomListener:
         end = datetime.fromisoformat(end_time)
         return int((end - start).total_seconds() / 60)
     
-    async def get_session(self, session_id: str) -> Optional[dict]:
-        """Retrieve session data from Redis"""
+    async def get_session(self, session_id: str, include: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """Assemble session data from Redis
+        
+        Only the list fields named in ``include`` are fetched (all of them by
+        default); pass ``include=()`` for metadata and participants only.
+        Sample fields hold only their recent items; their compacted history is
+        returned under ``<field>_history`` as bucket summaries, and
+        ``<field>_offset`` is the number of items compacted away, i.e. the
+        session-wide index of the first item still listed.
+        """
         try:
-            session_data = self.redis_client.get(f"zoom_session:{session_id}")
-            if session_data:
-                return json.loads(session_data)
-            return None
+            fields = LIST_FIELDS if include is None else tuple(f for f in include if f in LIST_FIELDS)
+            
+            pipe = self.redis_client.pipeline()
+            pipe.hgetall(self._key(session_id))
+            pipe.hvals(self._key(session_id, "participants"))
+            for field in fields:
+                pipe.lrange(self._key(session_id, field), 0, -1)
+            timeline_fields = [field for field in fields if field in TIMELINE_FIELDS]
+            for field in timeline_fields:
+                pipe.get(self._timeline_key(session_id, field))
+                pipe.get(self._offset_key(session_id, field))
+            metadata, participants, *results = pipe.execute()
+            lists, timelines, offsets = results[:len(fields)], results[len(fields)::2], results[len(fields) + 1::2]
+            
+            if not metadata:
+                return None
+            
+            session_data = {k: json.loads(v) for k, v in metadata.items()}
+            session_data["participants"] = sorted(
+                (visit for stored in participants for visit in self._load_visits(stored)),
+                key=lambda p: p.get("join_time", "")
+            )
+            for field, items in zip(fields, lists):
+                session_data[field] = [json.loads(item) for item in items]
+            for field, stored, offset in zip(timeline_fields, timelines, offsets):
+                session_data[f"{field}_offset"] = int(offset or 0)
+                if stored:
+                    session_data[f"{field}_history"] = CompactingTimeline.from_dict(json.loads(stored)).query()
+            return session_data
         except Exception as e:
             logger.error(f"Error retrieving session {session_id}: {e}")
             return None
     
+    async def get_session_items(self, session_id: str, field: str, start: int = 0, end: int = -1) -> List:
+        """Read a slice of one list field, LRANGE-style (inclusive end, negative from the end)
+        
+        Non-negative indices count every item appended since the session
+        started, so they keep pointing at the same items after compaction;
+        items that were already compacted are not returned (see
+        ``get_session_timeline``).
+        """
+        if field not in LIST_FIELDS:
+            raise ValueError(f"{field} is not a list field")
+        try:
+            list_key = self._key(session_id, field)
+            if field not in TIMELINE_FIELDS:
+                return [json.loads(item) for item in self.redis_client.lrange(list_key, start, end)]
+            
+            offset_key = self._offset_key(session_id, field)
+            
+            def read(pipe):
+                # Runs again if a compaction moves the offset before the LRANGE executes
+                offset = int(pipe.get(offset_key) or 0)
+                pipe.multi()
+                if 0 <= end < offset:
+                    return  # the whole range has been compacted
+                pipe.lrange(list_key, max(0, start - offset) if start >= 0 else start,
+                            end - offset if end >= 0 else end)
+            
+            results = self.redis_client.transaction(read, offset_key)
+            return [json.loads(item) for item in (results[0] if results else [])]
+        except Exception as e:
+            logger.error(f"Error reading {field} for session {session_id}: {e}")
+            return []
+    
     async def get_active_sessions(self) -> List[dict]:
         """Get all active interview sessions"""
         return list(self.active_sessions.values())
     
-    async def update_session_data(self, session_id: str, data: dict) -> bool:
-        """Update session data in Redis"""
+    async def update_session_data(self, session_id: str, data: dict, ttl: int = ACTIVE_SESSION_TTL) -> bool:
+        """Update only the given fields; list fields in `data` replace the stored list"""
         try:
-            session_data = await self.get_session(session_id)
-            if session_data:
-                session_data.update(data)
-                self.redis_client.setex(
-                    f"zoom_session:{session_id}", 
-                    3600,
-                    json.dumps(session_data)
-                )
-                return True
-            return False
+            if not self.redis_client.exists(self._key(session_id)):
+                return False
+            
+            pipe = self.redis_client.pipeline()
+            metadata = {}
+            for key, value in data.items():
+                if key in LIST_FIELDS:
+                    pipe.delete(self._key(session_id, key))
+                    if key in TIMELINE_FIELDS:
+                        pipe.delete(self._timeline_key(session_id, key), self._offset_key(session_id, key))
+                    if value:
+                        pipe.rpush(self._key(session_id, key), *(json.dumps(item) for item in value))
+                elif key == "participants":
+                    pipe.delete(self._key(session_id, "participants"))
+                    for user_id, visits in self._visits_by_user(value).items():
+                        pipe.hset(self._key(session_id, "participants"), user_id, json.dumps(visits))
+                else:
+                    metadata[key] = json.dumps(value)
+            if metadata:
+                pipe.hset(self._key(session_id), mapping=metadata)
+            self._expire_all(pipe, session_id, ttl)
+            pipe.execute()
+            return True
         except Exception as e:
             logger.error(f"Error updating session {session_id}: {e}")
             return False
@@ -0,0 +1,206 @@
+"""
+Batch Answer Scoring
+Re-scores recorded interview answers in bulk, across sessions, without replaying the interview flow
+"""
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from chatbot_interviewer import AIInterviewChatbot, ASSESSED_DIMENSIONS
+from interview_bot import InterviewBot
+
+logger = logging.getLogger(__name__)
+
+# Rubrics: AIInterviewChatbot.process_answer scoring and InterviewBot.submit_response scoring
+CHATBOT_RUBRIC = "chatbot"
+INTERVIEW_BOT_RUBRIC = "interview_bot"
+RUBRICS = (CHATBOT_RUBRIC, INTERVIEW_BOT_RUBRIC)
+
+DEFAULT_CHUNK_SIZE = 2000
+# Below this many answers the pool start-up costs more than it saves
+MIN_POOL_ANSWERS = 5000
+
+
+@dataclass
+class AnswerRecord:
+    """One recorded answer
+
+    The chatbot rubric reads ``question_id``; the interview bot rubric reads
+    ``question`` (its ``type`` and ``expected_keywords``).
+    """
+    session_id: str
+    answer: str
+    question_id: str = ""
+    question: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class BatchResult:
+    answer_scores: List[Dict[str, Any]]  # aligned with the input records
+    sessions: Dict[str, Dict[str, Any]]  # session_id -> final assessment / final score
+
+
+# ----------------------
+# Worker side
+# ----------------------
+def _score_chunk(rubric: str, chunk: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+    """Score (answer, question) pairs; runs in pool workers, so it only takes plain data"""
+    if rubric == CHATBOT_RUBRIC:
+        return [AIInterviewChatbot.score_answer(answer, question_id) for answer, question_id in chunk]
+    return [InterviewBot.score_response(answer, question) for answer, question in chunk]
+
+
+def _payload(rubric: str, record: AnswerRecord) -> Tuple[str, Any]:
+    if rubric == CHATBOT_RUBRIC:
+        return record.answer, record.question_id
+    # Only the fields scoring reads are shipped to the workers
+    return record.answer, {"expected_keywords": record.question.get("expected_keywords", [])}
+
+
+def _chunks(records: Iterable[AnswerRecord], size: int) -> Iterator[List[AnswerRecord]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ----------------------
+# Session aggregation
+# ----------------------
+class SessionAggregator:
+    """Running per-session totals, equivalent to the rubric's end-of-interview scoring
+
+    Only sums and counts are kept, so sessions of any length aggregate in
+    constant memory per session.
+    """
+
+    def __init__(self, rubric: str):
+        self.rubric = rubric
+        self._totals: Dict[str, Any] = {}
+
+    def add(self, record: AnswerRecord, score: Dict[str, Any]):
+        if self.rubric == CHATBOT_RUBRIC:
+            totals = self._totals.setdefault(record.session_id, [dict.fromkeys(ASSESSED_DIMENSIONS, 0.0), 0])
+            for dimension in ASSESSED_DIMENSIONS:
+                totals[0][dimension] += score[dimension]
+            totals[1] += 1
+        else:
+            categories = self._totals.setdefault(record.session_id, {})
+            totals = categories.setdefault(record.question.get("type", "general"), [0, 0])
+            totals[0] += score["score"]
+            totals[1] += 1
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        if self.rubric == CHATBOT_RUBRIC:
+            return {
+                session_id: asdict(AIInterviewChatbot.assess_averages(
+                    {dimension: total / count for dimension, total in sums.items()}
+                ))
+                for session_id, (sums, count) in self._totals.items()
+            }
+        return {
+            session_id: InterviewBot.final_score_from_totals(categories)
+            for session_id, categories in self._totals.items()
+        }
+
+
+# ----------------------
+# Entry points
+# ----------------------
+def iter_scores(
+    records: Iterable[AnswerRecord],
+    rubric: str = CHATBOT_RUBRIC,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Tuple[AnswerRecord, Dict[str, Any]]]:
+    """Yield (record, score) in input order, scoring chunks in a process pool
+
+    ``workers=0`` scores in-process; ``None`` uses one worker per CPU.
+    Records are consumed lazily, so input larger than memory can be streamed.
+    """
+    if rubric not in RUBRICS:
+        raise ValueError(f"Unknown rubric {rubric!r}; expected one of {RUBRICS}")
+
+    chunks = _chunks(records, chunk_size)
+    if workers == 0:
+        for chunk in chunks:
+            yield from zip(chunk, _score_chunk(rubric, [_payload(rubric, record) for record in chunk]))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a bounded number of chunks in flight so the input is not read ahead unboundedly
+        in_flight = []
+        max_in_flight = 2 * (workers or os.cpu_count() or 1)
+        for chunk in chunks:
+            future = pool.submit(_score_chunk, rubric, [_payload(rubric, record) for record in chunk])
+            in_flight.append((chunk, future))
+            if len(in_flight) >= max_in_flight:
+                done_chunk, done_future = in_flight.pop(0)
+                yield from zip(done_chunk, done_future.result())
+        for done_chunk, done_future in in_flight:
+            yield from zip(done_chunk, done_future.result())
+
+
+def score_answers(
+    records: List[AnswerRecord],
+    rubric: str = CHATBOT_RUBRIC,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> BatchResult:
+    """Score many answers across sessions and aggregate each session"""
+    if workers is None and len(records) < MIN_POOL_ANSWERS:
+        workers = 0
+
+    aggregator = SessionAggregator(rubric)
+    answer_scores = []
+    for record, score in iter_scores(records, rubric, workers, chunk_size):
+        aggregator.add(record, score)
+        answer_scores.append(score)
+
+    return BatchResult(answer_scores=answer_scores, sessions=aggregator.results())
+
+
+# ----------------------
+# Command line
+# ----------------------
+def _read_records(path: str) -> Iterator[AnswerRecord]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield AnswerRecord(**json.loads(line))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Re-score recorded interview answers in bulk")
+    parser.add_argument("answers", help="JSONL of {session_id, answer, question_id | question}")
+    parser.add_argument("--rubric", choices=RUBRICS, default=CHATBOT_RUBRIC)
+    parser.add_argument("--workers", type=int, default=None, help="0 scores in-process (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--scores-out", default="answer_scores.jsonl")
+    parser.add_argument("--sessions-out", default="session_scores.json")
+    args = parser.parse_args(argv)
+
+    aggregator = SessionAggregator(args.rubric)
+    count = 0
+    with open(args.scores_out, "w", encoding="utf-8") as out:
+        for record, score in iter_scores(_read_records(args.answers), args.rubric, args.workers, args.chunk_size):
+            aggregator.add(record, score)
+            out.write(json.dumps({"session_id": record.session_id, "question_id": record.question_id, **score}) + "\n")
+            count += 1
+
+    sessions = aggregator.results()
+    with open(args.sessions_out, "w", encoding="utf-8") as f:
+        json.dump(sessions, f, indent=2)
+    logger.info(f"Scored {count} answers across {len(sessions)} sessions")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,118 @@
+"""
+Candidate Profile Aggregation
+Fetches a candidate's report sections concurrently and caches the assembled profile until an analysis changes
+"""
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SECTION_TIMEOUT = 2.0
+DEFAULT_PROFILE_TTL = 300
+# Profiles missing a section are kept briefly, so the section is retried soon
+PARTIAL_PROFILE_TTL = 30
+VERSION_TTL = 86400
+
+
+@dataclass
+class ProfileSection:
+    name: str
+    fetch: Callable[[str], Awaitable[Any]]  # candidate_id -> section data
+    timeout: float = DEFAULT_SECTION_TIMEOUT
+    default: Callable[[], Any] = dict  # used when the fetch fails or times out
+
+
+@dataclass
+class CandidateProfile:
+    candidate_id: str
+    version: str
+    sections: Dict[str, Any]
+    missing: Dict[str, str] = field(default_factory=dict)  # section -> "timeout" or the error
+    fetched_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class CandidateProfileAggregator:
+    """Assembles candidate profiles from independently fetched sections
+
+    All sections are fetched at once, each under its own timeout; a section
+    that fails or times out falls back to its default and is reported in
+    ``missing`` instead of failing the profile. Profiles are cached under the
+    candidate's current version token, which ``invalidate`` replaces whenever
+    one of the underlying analyses changes. A fetch that was already running
+    during an invalidation stores its result under the old token, where it is
+    never read again. ``store_get``/``store_set`` are the shared key-value store
+    (e.g. Redis), so invalidation reaches every worker.
+    """
+
+    def __init__(
+        self,
+        sections: Sequence[ProfileSection],
+        store_get: Callable[[str], Optional[str]],
+        store_set: Callable[[str, str, Optional[int]], None],
+        ttl: int = DEFAULT_PROFILE_TTL,
+        partial_ttl: int = PARTIAL_PROFILE_TTL,
+    ):
+        self.sections = list(sections)
+        self.store_get = store_get
+        self.store_set = store_set
+        self.ttl = ttl
+        self.partial_ttl = partial_ttl
+        # Concurrent requests for the same profile version share one fetch
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    async def get_profile(self, candidate_id: str, refresh: bool = False) -> CandidateProfile:
+        version = self.store_get(f"candidate_profile_version:{candidate_id}") or "0"
+        cache_key = f"candidate_profile:{candidate_id}:{version}"
+
+        if not refresh:
+            cached = self.store_get(cache_key)
+            if cached:
+                return CandidateProfile(**json.loads(cached))
+
+        key = (candidate_id, version)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._assemble(candidate_id, version))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _done: self._in_flight.pop(key, None))
+        profile = await asyncio.shield(task)
+
+        ttl = self.ttl if profile.complete else self.partial_ttl
+        self.store_set(cache_key, json.dumps(profile.to_dict()), ttl)
+        return profile
+
+    def invalidate(self, candidate_id: str):
+        """Mark the candidate's cached profile stale after one of its analyses changed"""
+        self.store_set(f"candidate_profile_version:{candidate_id}", uuid.uuid4().hex, VERSION_TTL)
+
+    async def _assemble(self, candidate_id: str, version: str) -> CandidateProfile:
+        results = await asyncio.gather(*(self._fetch(section, candidate_id) for section in self.sections))
+
+        profile = CandidateProfile(candidate_id=candidate_id, version=version, sections={})
+        for section, (value, error) in zip(self.sections, results):
+            profile.sections[section.name] = value
+            if error is not None:
+                profile.missing[section.name] = error
+        return profile
+
+    async def _fetch(self, section: ProfileSection, candidate_id: str) -> Tuple[Any, Optional[str]]:
+        try:
+            return await asyncio.wait_for(section.fetch(candidate_id), timeout=section.timeout), None
+        except asyncio.TimeoutError:
+            logger.warning(f"Profile section {section.name} timed out for candidate {candidate_id}")
+            return section.default(), "timeout"
+        except Exception as e:
+            logger.warning(f"Profile section {section.name} failed for candidate {candidate_id}: {e}")
+            return section.default(), str(e) or type(e).__name__
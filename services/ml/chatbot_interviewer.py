@@ -10,6 +10,9 @@ from dataclasses import dataclass
 from datetime import datetime
 import numpy as np
 
+from lexicon import INTERVIEW_LEXICON, LexiconScan
+from question_bank import QuestionBank, get_default_bank, mark_asked
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,6 +37,7 @@ class InterviewSession:
     current_question_index: int = 0
     session_status: str = "ongoing"
     started_at: datetime = None
+    asked_question_ids: bytes = b""  # bitset over question bank ids
 
 @dataclass
 class CandidateAssessment:
@@ -46,99 +50,22 @@ class CandidateAssessment:
     strengths: List[str]
     areas_for_improvement: List[str]
 
+# Answer score dimensions averaged into the final assessment
+ASSESSED_DIMENSIONS = ("technical_depth", "communication_clarity", "problem_solving", "confidence")
+
+def parse_question_id(question_id: str) -> Optional[Tuple[int, str, int]]:
+    """(question index, category, bank id) from a ``{index}_{category}_q{bank id}`` question id"""
+    try:
+        index, rest = question_id.split("_", 1)
+        category, bank_id = rest.rsplit("_q", 1)
+        return int(index), category, int(bank_id)
+    except ValueError:
+        return None
+
 class AIInterviewChatbot:
-    def __init__(self):
-        # Question templates organized by role and category
-        self.question_library = {
-            "software_developer": {
-                "technical": [
-                    {
-                        "question": "Can you explain how you would optimize a slow database query?",
-                        "keywords": ["index", "indexes", "query optimization", "performance", "query plan", "profiling"],
-                        "difficulty": "intermediate"
-                    },
-                    {
-                        "question": "How would you handle a production bug that only occurs under certain conditions?",
-                        "keywords": ["debugging", "logs", "reproduction", "testing", "edge cases", "monitoring"],
-                        "difficulty": "mid"
-                    },
-                    {
-                        "question": "Describe your approach to code review. What do you look for?",
-                        "keywords": ["clean code", "best practices", "security", "performance", "readability", "design patterns"],
-                        "difficulty": "junior"
-                    },
-                    {
-                        "question": "How would you design a scalable microservices architecture?",
-                        "keywords": ["microservices", "distributed", "scalability", "communication", "database", "api gateway"],
-                        "difficulty": "senior"
-                    }
-                ],
-                "behavioral": [
-                    {
-                        "question": "Tell me about a time when you had to learn a new technology quickly",
-                        "keywords": ["learning", "adaptability", "time management", "problem solving", "persistence"],
-                        "difficulty": "junior"
-                    },
-                    {
-                        "question": "Describe a challenging project you worked on. What made it challenging and how did you handle it?",
-                        "keywords": ["challenge", "problem solving", "persistence", "teamwork", "communication", "solution"],
-                        "difficulty": "mid"
-                    },
-                    {
-                        "question": "How do you stay updated with the latest technologies and industry trends?",
-                        "keywords": ["continuous learning", "technology", "industry", "community", "experiment", "best practices"],
-                        "difficulty": "senior"
-                    }
-                ],
-                "problem_solving": [
-                    {
-                        "question": "How would you verify if a user's email address is valid without using regex?",
-                        "keywords": ["validation", "email", "domains", "servers", "testing", "verification"],
-                        "difficulty": "junior"
-                    },
-                    {
-                        "question": "Design a system to handle massive data uploads with validation",
-                        "keywords": ["system design", "performance", "validation", "data", "architecture", "scalability"],
-                        "difficulty": "senior"
-                    }
-                ]
-            },
-            "data_analyst": {
-                "technical": [
-                    {
-                        "question": "How would you approach analyzing customer behavior data to reduce churn?",
-                        "keywords": ["analysis", "data mining", "patterns", "correlation", "prediction", "visualization"],
-                        "difficulty": "mid"
-                    },
-                    {
-                        "question": "Describe your experience with data cleaning and preprocessing",
-                        "keywords": ["data cleaning", "preprocessing", "quality", "validation", "transformation"],
-                        "difficulty": "junior"
-                    }
-                ],
-                "analytical": [
-                    {
-                        "question": "How do you ensure your data analysis conclusions are reliable and actionable?",
-                        "keywords": ["reliability", "validation", "testing", "confidence", "verification", "quality"],
-                        "difficulty": "mid"
-                    }
-                ]
-            },
-            "general": {
-                "behavioral": [
-                    {
-                        "question": "Tell me about yourself and why you're interested in this role",
-                        "keywords": ["experience", "interest", "motivation", "skills", "background"],
-                        "difficulty": "junior"
-                    },
-                    {
-                        "question": "Where do you see yourself in 5 years?",
-                        "keywords": ["goals", "career growth", "ambition", "development", "long-term"],
-                        "difficulty": "junior"
-                    }
-                ]
-            }
-        }
+    def __init__(self, question_bank: Optional[QuestionBank] = None):
+        # Questions indexed by role, category and difficulty (data/question_bank.json)
+        self.question_bank = question_bank or get_default_bank()
 
     def initiate_interview(self, candidate_id: str, job_role: str) -> InterviewSession:
         """Start a new interview session"""
@@ -164,24 +91,49 @@ class AIInterviewChatbot:
         if session.current_question_index >= 10:  # End after 10 questions
             return self.end_interview(session)
         
+        # A repeated request before the answer gets the same question again
+        pending = self.pending_question(session)
+        if pending is not None:
+            return pending
+        
         # Determine question category based on progress
         categories = ["technical", "behavioral", "problem_solving", "behavioral"]
         category_index = (session.current_question_index // 3) % len(categories)
         question_category = categories[category_index]
         
-        # Get role-specific questions or general questions
-        role_questions = self.question_library.get(session.job_role.lower(), self.question_library["general"])
-        available_questions = role_questions.get(question_category, [])
-        
-        if not available_questions:
-            available_questions = self.question_library["general"]["behavioral"]
-        
-        # Select random question from category
-        selected_question_data = random.choice(available_questions)
+        # Get role-specific questions or general questions, skipping ones already asked
+        selected_question_data = (
+            self.question_bank.sample(session.job_role, question_category, session.asked_question_ids)
+            or self.question_bank.sample("general", "behavioral", session.asked_question_ids)
+        )
         
-        # Ensure we haven't asked this question before
-        question_id = f"{session.current_question_index}_{question_category}"
+        if selected_question_data is None:
+            # Every matching question has been asked; repeat rather than stall the interview
+            selected_question_data = (
+                self.question_bank.sample(session.job_role, question_category)
+                or self.question_bank.sample("general", "behavioral")
+            )
         
+        # Marked as asked once it is answered (process_answer), so retries don't use up the bank
+        question_id = f"{session.current_question_index}_{question_category}_q{selected_question_data['id']}"
+        session.questions_asked.append(question_id)
+        return self._question_payload(session, question_id, question_category, selected_question_data)
+
+    def pending_question(self, session: InterviewSession) -> Optional[Dict]:
+        """The question drawn for the current index and not answered yet, if any"""
+        if not session.questions_asked:
+            return None
+        question_id = session.questions_asked[-1]
+        parsed = parse_question_id(question_id)
+        if parsed is None or parsed[0] != session.current_question_index:
+            return None
+        question_data = self.question_bank.get(parsed[2])
+        if question_data is None:
+            return None
+        return self._question_payload(session, question_id, parsed[1], question_data)
+
+    def _question_payload(self, session: InterviewSession, question_id: str, question_category: str,
+                          selected_question_data: Dict) -> Dict:
         question_obj = InterviewQuestion(
             question_id=question_id,
             question_text=selected_question_data["question"],
@@ -214,8 +166,13 @@ class AIInterviewChatbot:
         except ValueError:
             question_index = session.current_question_index
         
+        # The answered question no longer comes up again (unknown ids are ignored)
+        parsed = parse_question_id(question_id)
+        if parsed is not None and self.question_bank.get(parsed[2]) is not None:
+            session.asked_question_ids = mark_asked(session.asked_question_ids, parsed[2])
+        
         # Score the answer based on the question category
-        answer_score = self._score_answer(answer_text, question_id)
+        answer_score = self.score_answer(answer_text, question_id)
         
         # Store response and score
         session.responses.append(answer_text)
@@ -244,24 +201,26 @@ class AIInterviewChatbot:
             "total_score_so_far": self._calculate_session_progress(session)
         }
 
-    def _score_answer(self, answer_text: str, question_id: str) -> Dict[str, float]:
-        """Score candidate's answer on multiple dimensions"""
-        answer_lower = answer_text.lower()
+    @classmethod
+    def score_answer(cls, answer_text: str, question_id: str) -> Dict[str, float]:
+        """Score candidate's answer on multiple dimensions (stateless, so batch scoring can call it directly)"""
+        # One tokenization and lexicon pass feeds every dimension
+        scan = INTERVIEW_LEXICON.scan(answer_text)
         
         # Technical depth scoring (based on relevant keywords)
-        technical_score = self._calculate_keyword_relevance(answer_text)
+        technical_score = cls._calculate_keyword_relevance(scan)
         
         # Communication clarity (based on response structure and completeness)
-        communication_score = self._calculate_communication_score(answer_text)
+        communication_score = cls._calculate_communication_score(answer_text, scan)
         
         # Problem solving approach (based on analytical language)
-        problem_solving_score = self._calculate_problem_solving_score(answer_text)
+        problem_solving_score = cls._calculate_problem_solving_score(scan)
         
         # Confidence level (based on assertive language)
-        confidence_score = self._calculate_confidence_score(answer_text)
+        confidence_score = cls._calculate_confidence_score(scan)
         
         # Relevance to question
-        relevance_score = self._calculate_relevance_score(answer_text, question_id)
+        relevance_score = cls._calculate_relevance_score(scan, question_id)
         
         return {
             "technical_depth": round(technical_score, 2),
@@ -272,19 +231,13 @@ class AIInterviewChatbot:
             "overall_score": round((technical_score + communication_score + problem_solving_score + confidence_score + relevance_score) / 5, 2)
         }
 
-    def _calculate_keyword_relevance(self, answer_text: str) -> float:
+    @staticmethod
+    def _calculate_keyword_relevance(scan: LexiconScan) -> float:
         """Calculate technical keyword relevance score"""
-        technical_keywords = [
-            "architecture", "design", "algorithm", "database", "performance",
-            "scalability", "security", "testing", "deployment", "optimization",
-            "best practices", "patterns", "framework", "API", "API", "REST"
-        ]
-        
-        answer_lower = answer_text.lower()
-        matches = sum(1 for keyword in technical_keywords if keyword in answer_lower)
-        return min(1.0, matches / 5.0)  # Cap at 1.0 for 5+ keyword matches
+        return min(1.0, scan.count("technical") / 5.0)  # Cap at 1.0 for 5+ keyword matches
 
-    def _calculate_communication_score(self, answer_text: str) -> float:
+    @staticmethod
+    def _calculate_communication_score(answer_text: str, scan: LexiconScan) -> float:
         """Calculate communication clarity score"""
         score = 0.5  # Base score
         
@@ -298,64 +251,41 @@ class AIInterviewChatbot:
             score -= 0.1  # Too verbose
         
         # Structure indicators
-        if any(structure_word in answer_text.lower() for structure_word in ["first", "second", "next", "then", "finally"]):
+        if scan.count("structure"):
             score += 0.1
         
         # Clarity indicators
-        clear_indicators = ["specifically", "for example", "in other words", "to clarify"]
-        if any(indicator in answer_text.lower() for indicator in clear_indicators):
+        if scan.count("clarity"):
             score += 0.2
         
         return min(1.0, max(0.0, score))
 
-    def _calculate_problem_solving_score(self, answer_text: str) -> float:
+    @staticmethod
+    def _calculate_problem_solving_score(scan: LexiconScan) -> float:
         """Calculate problem-solving approach score"""
-        problem_solving_keywords = [
-            "analyze", "identify", "steps", "solution", "approach", "method",
-            "investigate", "troubleshoot", "debug", "solve", "resolve"
-        ]
-        
-        answer_lower = answer_text.lower()
-        keyword_count = sum(1 for keyword in problem_solving_keywords if keyword in answer_lower)
+        keyword_count = scan.count("problem_solving")
         
         # Bonus for showing analytical thinking
-        analytical_phrases = ["let me think", "first i would", "step by step", "my approach"]
-        if any(phrase in answer_lower for phrase in analytical_phrases):
+        if scan.count("analytical"):
             keyword_count += 2
         
         return min(1.0, keyword_count / 8.0)
 
-    def _calculate_confidence_score(self, answer_text: str) -> float:
+    @staticmethod
+    def _calculate_confidence_score(scan: LexiconScan) -> float:
         """Calculate confidence level score"""
-        confident_indicators = [
-            "certainly", "definitely", "absolutely", "confident", "sure",
-            "experienced", "skilled", "proficient", "expert", "understand"
-        ]
-        
-        uncertain_indicators = [
-            "probably", "maybe", "not sure", "think", "guess", "might",
-            "possibly", "not certain", "unclear"
-        ]
-        
-        answer_lower = answer_text.lower()
-        confident_count = sum(1 for word in confident_indicators if word in answer_lower)
-        uncertain_count = sum(1 for word in uncertain_indicators if word in answer_lower)
-        
-        confidence_score = (confident_count * 0.1) - (uncertain_count * 0.05)
+        confidence_score = (scan.count("confident") * 0.1) - (scan.count("uncertain") * 0.05)
         return min(1.0, max(0.0, 0.5 + confidence_score))
 
-    def _calculate_relevance_score(self, answer_text: str, question_id: str) -> float:
+    @staticmethod
+    def _calculate_relevance_score(scan: LexiconScan, question_id: str) -> float:
         """Calculate relevance to the specific question"""
         # Simplified relevance scoring
         relevance_score = 0.5  # Base score
         
-        answer_lower = answer_text.lower()
-        
         # Check for question-related keywords
         if "question" in question_id:
-            relevant_terms = ["experience", "example", "situation", "time", "project"]
-            matches = sum(1 for term in relevant_terms if term in answer_lower)
-            relevance_score += matches * 0.1
+            relevance_score += scan.count("relevance") * 0.1
         
         return min(1.0, relevance_score)
 
@@ -448,12 +378,14 @@ class AIInterviewChatbot:
         
         # Calculate overall scores by category
         overall_scores = {
-            "technical_depth": sum(score["technical_depth"] for score in session.scores) / len(session.scores),
-            "communication_clarity": sum(score["communication_clarity"] for score in session.scores) / len(session.scores),
-            "problem_solving": sum(score["problem_solving"] for score in session.scores) / len(session.scores),
-            "confidence": sum(score["confidence"] for score in session.scores) / len(session.scores)
+            dimension: sum(score[dimension] for score in session.scores) / len(session.scores)
+            for dimension in ASSESSED_DIMENSIONS
         }
-        
+        return self.assess_averages(overall_scores)
+
+    @staticmethod
+    def assess_averages(overall_scores: Dict[str, float]) -> CandidateAssessment:
+        """Build the assessment from per-dimension averages over a session's answers"""
         # Determine overall assessment grade
         overall_average = sum(overall_scores.values()) / len(overall_scores)
         
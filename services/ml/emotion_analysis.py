@@ -4,41 +4,50 @@ Real-time emotion detection and sentiment analysis
 """
 import cv2
 import numpy as np
-import tensorflow as tf
 from PIL import Image
 import base64
 import io
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union
 import logging
+from collections import OrderedDict
 from datetime import datetime
 import json
 
+from emotion_backends import load_backend
+from emotion_stats import EMOTION_LABELS, EmotionFrames, mean_of, summarize
+from face_tracker import DEFAULT_CLASSIFY_EVERY, FaceTracker
+from lexicon import INTERVIEW_LEXICON, LexiconScan
+
 logger = logging.getLogger(__name__)
 
+# Video streams whose face tracks are kept in memory; the least recently used is dropped first.
+# Tracks are per process: all frames of a stream must reach the same worker (one worker, or
+# sticky routing by stream id), or each worker starts its own person ids and timelines.
+MAX_TRACKED_STREAMS = 256
+
 class EmotionAnalyzer:
     """Advanced emotion analysis using computer vision and NLP"""
     
-    def __init__(self):
+    def __init__(self, classify_every: int = DEFAULT_CLASSIFY_EVERY, backend: Optional[str] = None):
+        self.backend = backend  # onnx, keras or auto; EMOTION_BACKEND when None
         self.emotion_model = None
         self.face_cascade = None
-        self.emotion_labels = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
-        self.sentiment_keywords = {
-            'positive': ['excellent', 'great', 'amazing', 'wonderful', 'fantastic', 'outstanding'],
-            'negative': ['terrible', 'awful', 'horrible', 'disappointing', 'frustrating', 'difficult'],
-            'neutral': ['okay', 'fine', 'average', 'normal', 'standard', 'typical']
-        }
+        self.emotion_labels = list(EMOTION_LABELS)
+        self.lexicon = INTERVIEW_LEXICON
+        self.classify_every = classify_every
+        # stream_id -> face tracker of that video stream
+        self.trackers: "OrderedDict[str, FaceTracker]" = OrderedDict()
         
         self._initialize_models()
     
     def _initialize_models(self):
         """Initialize emotion detection models"""
-        try:
-            # Load emotion detection model
-            self.emotion_model = tf.keras.models.load_model('emotion_model.h5')
-            logger.info("✅ Emotion model loaded successfully")
-        except Exception as e:
-            logger.warning(f"⚠️ Emotion model not available: {e}")
-            self.emotion_model = None
+        # Load emotion detection model (ONNX Runtime when converted, TensorFlow otherwise)
+        self.emotion_model = load_backend(self.backend)
+        if self.emotion_model is not None:
+            logger.info(f"✅ Emotion model loaded successfully ({self.emotion_model.name})")
+        else:
+            logger.warning("⚠️ Emotion model not available")
         
         try:
             # Load OpenCV face cascade
@@ -48,8 +57,13 @@ class EmotionAnalyzer:
             logger.warning(f"⚠️ Face cascade not available: {e}")
             self.face_cascade = None
     
-    def analyze_image_emotion(self, image_data: str) -> Dict[str, Any]:
-        """Analyze emotion from base64 encoded image"""
+    def analyze_image_emotion(self, image_data: str, stream_id: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze emotion from base64 encoded image
+        
+        With a ``stream_id`` the image is treated as the next frame of that
+        video stream: faces are tracked across frames, each person keeps their
+        own emotion timeline and is re-classified only every few frames.
+        """
         try:
             # Decode base64 image
             if ',' in image_data:
@@ -64,6 +78,9 @@ class EmotionAnalyzer:
             # Detect faces
             faces = self._detect_faces(cv_image)
             
+            if stream_id is not None:
+                return self._analyze_tracked_faces(cv_image, faces, stream_id)
+            
             if not faces:
                 return {
                     "emotion": "neutral",
@@ -73,10 +90,7 @@ class EmotionAnalyzer:
                 }
             
             # Analyze emotion for each face
-            emotion_results = []
-            for face in faces:
-                emotion_result = self._analyze_face_emotion(cv_image, face)
-                emotion_results.append(emotion_result)
+            emotion_results = self._analyze_faces(cv_image, faces)
             
             # Return primary emotion (highest confidence)
             primary_emotion = max(emotion_results, key=lambda x: x['confidence'])
@@ -108,58 +122,121 @@ class EmotionAnalyzer:
         faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
         return faces.tolist()
     
-    def _analyze_face_emotion(self, image: np.ndarray, face: Tuple[int, int, int, int]) -> Dict[str, Any]:
-        """Analyze emotion for a specific face"""
-        if self.emotion_model is None:
+    def _analyze_tracked_faces(self, image: np.ndarray, faces: List[Tuple[int, int, int, int]],
+                               stream_id: str) -> Dict[str, Any]:
+        """Per-person emotions for one frame of a tracked stream, classifying only the tracks that are due"""
+        tracker = self._tracker(stream_id)
+        tracks = tracker.update(faces)
+        timestamp = datetime.now().isoformat()
+        
+        if not tracks:
             return {
                 "emotion": "neutral",
                 "confidence": 0.5,
-                "all_emotions": {label: 0.14 for label in self.emotion_labels}
+                "face_detected": False,
+                "message": "No face detected in image",
+                "stream_id": stream_id,
+                "people": [],
+                "timestamp": timestamp
             }
         
-        x, y, w, h = face
+        due = [track for track in tracks if tracker.needs_classification(track)]
+        for track, result in zip(due, self._analyze_faces(image, [track.box for track in due])):
+            tracker.record(track, result, classified=True, timestamp=timestamp)
+        due_ids = {track.track_id for track in due}
+        for track in tracks:
+            if track.track_id not in due_ids:
+                tracker.record(track, track.result, classified=False, timestamp=timestamp)
         
-        # Extract face region
-        face_roi = image[y:y+h, x:x+w]
+        people = [{
+            "person_id": track.track_id,
+            "emotion": track.result['emotion'],
+            "confidence": track.result['confidence'],
+            "all_emotions": track.result['all_emotions'],
+            "face_coordinates": list(track.box),
+            "reused": track.track_id not in due_ids
+        } for track in tracks]
+        primary = max(people, key=lambda person: person['confidence'])
         
-        # Convert to grayscale and resize
-        gray_face = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
-        resized_face = cv2.resize(gray_face, (48, 48))
+        return {
+            "emotion": primary['emotion'],
+            "confidence": primary['confidence'],
+            "person_id": primary['person_id'],
+            "all_emotions": primary['all_emotions'],
+            "face_detected": True,
+            "faces_detected": len(tracks),
+            "faces_analyzed": len(due),
+            "stream_id": stream_id,
+            "people": people,
+            "timestamp": timestamp
+        }
+    
+    def _tracker(self, stream_id: str) -> FaceTracker:
+        tracker = self.trackers.get(stream_id)
+        if tracker is None:
+            tracker = self.trackers[stream_id] = FaceTracker(classify_every=self.classify_every)
+            if len(self.trackers) > MAX_TRACKED_STREAMS:
+                self.trackers.popitem(last=False)
+        else:
+            self.trackers.move_to_end(stream_id)
+        return tracker
+    
+    def get_stream_people(self, stream_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Emotion summary and dynamics per person tracked in a stream (None for an unknown stream)"""
+        tracker = self.trackers.get(stream_id)
+        return tracker.summaries() if tracker else None
+    
+    def end_stream(self, stream_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Drop a stream's tracks, returning their final per-person summaries"""
+        tracker = self.trackers.pop(stream_id, None)
+        return tracker.summaries() if tracker else None
+    
+    def _analyze_face_emotion(self, image: np.ndarray, face: Tuple[int, int, int, int]) -> Dict[str, Any]:
+        """Analyze emotion for a specific face"""
+        return self._analyze_faces(image, [face])[0]
+    
+    def _analyze_faces(self, image: np.ndarray, faces: List[Tuple[int, int, int, int]]) -> List[Dict[str, Any]]:
+        """Analyze emotion for several faces of one image with a single batched prediction"""
+        if self.emotion_model is None:
+            return [{
+                "emotion": "neutral",
+                "confidence": 0.5,
+                "all_emotions": {label: 0.14 for label in self.emotion_labels}
+            } for _ in faces]
+        if not faces:
+            return []
         
-        # Normalize
-        normalized_face = resized_face.astype('float32') / 255.0
-        reshaped_face = normalized_face.reshape(1, 48, 48, 1)
+        batch = np.empty((len(faces), 48, 48, 1), dtype='float32')
+        for i, (x, y, w, h) in enumerate(faces):
+            # Extract face region, convert to grayscale, resize and normalize
+            gray_face = cv2.cvtColor(image[y:y+h, x:x+w], cv2.COLOR_BGR2GRAY)
+            batch[i, :, :, 0] = cv2.resize(gray_face, (48, 48)).astype('float32') / 255.0
         
         # Predict emotion
-        predictions = self.emotion_model.predict(reshaped_face, verbose=0)
-        emotion_scores = predictions[0]
-        
-        # Get emotion with highest confidence
-        emotion_idx = np.argmax(emotion_scores)
-        emotion = self.emotion_labels[emotion_idx]
-        confidence = float(emotion_scores[emotion_idx])
-        
-        # Create emotion distribution
-        emotion_distribution = {
-            label: float(score) for label, score in zip(self.emotion_labels, emotion_scores)
-        }
+        predictions = self.emotion_model.predict(batch)
         
-        return {
-            "emotion": emotion,
-            "confidence": confidence,
-            "all_emotions": emotion_distribution,
-            "face_coordinates": face
-        }
+        results = []
+        for face, emotion_scores in zip(faces, predictions):
+            # Get emotion with highest confidence
+            emotion_idx = np.argmax(emotion_scores)
+            results.append({
+                "emotion": self.emotion_labels[emotion_idx],
+                "confidence": float(emotion_scores[emotion_idx]),
+                "all_emotions": {
+                    label: float(score) for label, score in zip(self.emotion_labels, emotion_scores)
+                },
+                "face_coordinates": face
+            })
+        return results
     
     def analyze_text_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment from text using keyword analysis"""
         try:
-            text_lower = text.lower()
-            
-            # Count sentiment keywords
-            positive_count = sum(1 for word in self.sentiment_keywords['positive'] if word in text_lower)
-            negative_count = sum(1 for word in self.sentiment_keywords['negative'] if word in text_lower)
-            neutral_count = sum(1 for word in self.sentiment_keywords['neutral'] if word in text_lower)
+            # Count sentiment keywords (one lexicon pass also covers the emotional indicators)
+            scan = self.lexicon.scan(text)
+            positive_count = scan.count('positive')
+            negative_count = scan.count('negative')
+            neutral_count = scan.count('neutral')
             
             # Calculate sentiment score
             total_words = len(text.split())
@@ -177,7 +254,7 @@ class EmotionAnalyzer:
                 confidence = 0.5
             
             # Analyze emotional indicators
-            emotional_indicators = self._analyze_emotional_indicators(text)
+            emotional_indicators = self._analyze_emotional_indicators(text, scan)
             
             return {
                 "sentiment": sentiment,
@@ -202,21 +279,15 @@ class EmotionAnalyzer:
                 "error": str(e)
             }
     
-    def _analyze_emotional_indicators(self, text: str) -> Dict[str, Any]:
+    def _analyze_emotional_indicators(self, text: str, scan: Optional[LexiconScan] = None) -> Dict[str, Any]:
         """Analyze emotional indicators in text"""
-        text_lower = text.lower()
+        scan = scan or self.lexicon.scan(text)
+        word_count = len(text.split())
         
-        # Stress indicators
-        stress_words = ['stress', 'pressure', 'anxious', 'worried', 'nervous', 'tense']
-        stress_level = sum(1 for word in stress_words if word in text_lower) / len(text.split())
-        
-        # Confidence indicators
-        confidence_words = ['confident', 'sure', 'certain', 'definitely', 'absolutely', 'expert']
-        confidence_level = sum(1 for word in confidence_words if word in text_lower) / len(text.split())
-        
-        # Engagement indicators
-        engagement_words = ['excited', 'interested', 'passionate', 'motivated', 'enthusiastic']
-        engagement_level = sum(1 for word in engagement_words if word in text_lower) / len(text.split())
+        # Stress, confidence and engagement indicators
+        stress_level = scan.count('stress') / word_count
+        confidence_level = scan.count('assurance') / word_count
+        engagement_level = scan.count('engagement') / word_count
         
         return {
             "stress_level": min(stress_level * 10, 1.0),
@@ -224,43 +295,25 @@ class EmotionAnalyzer:
             "engagement_level": min(engagement_level * 10, 1.0)
         }
     
-    def analyze_interview_performance(self, emotion_data: List[Dict], sentiment_data: List[Dict]) -> Dict[str, Any]:
-        """Analyze overall interview performance based on emotion and sentiment data"""
+    def analyze_interview_performance(self, emotion_data: Union[List[Dict], EmotionFrames],
+                                      sentiment_data: List[Dict]) -> Dict[str, Any]:
+        """Analyze overall interview performance based on emotion and sentiment data
+        
+        Per-frame emotion results are packed into a frames x emotions array once
+        and aggregated in vectorized form; callers that already hold the array
+        can pass an EmotionFrames directly.
+        """
         try:
-            if not emotion_data and not sentiment_data:
+            if not len(emotion_data or []) and not sentiment_data:
                 return {"error": "No data provided for analysis"}
             
-            # Calculate average emotion confidence
-            avg_emotion_confidence = 0
-            emotion_distribution = {emotion: 0 for emotion in self.emotion_labels}
-            
-            if emotion_data:
-                total_confidence = sum(data.get('confidence', 0) for data in emotion_data)
-                avg_emotion_confidence = total_confidence / len(emotion_data)
-                
-                # Calculate emotion distribution
-                for data in emotion_data:
-                    if 'all_emotions' in data:
-                        for emotion, score in data['all_emotions'].items():
-                            emotion_distribution[emotion] += score
-                
-                # Normalize distribution
-                total_emotion_score = sum(emotion_distribution.values())
-                if total_emotion_score > 0:
-                    emotion_distribution = {
-                        emotion: score / total_emotion_score 
-                        for emotion, score in emotion_distribution.items()
-                    }
+            emotion_summary = summarize(emotion_data)
+            avg_emotion_confidence = emotion_summary["average_confidence"]
+            emotion_distribution = emotion_summary["emotion_distribution"]
             
             # Calculate average sentiment
-            avg_sentiment_score = 0
-            avg_confidence = 0
-            
-            if sentiment_data:
-                total_sentiment = sum(data.get('sentiment_score', 0) for data in sentiment_data)
-                total_conf = sum(data.get('confidence', 0) for data in sentiment_data)
-                avg_sentiment_score = total_sentiment / len(sentiment_data)
-                avg_confidence = total_conf / len(sentiment_data)
+            avg_sentiment_score = mean_of(sentiment_data, 'sentiment_score')
+            avg_confidence = mean_of(sentiment_data, 'confidence')
             
             # Calculate performance metrics
             performance_score = self._calculate_performance_score(
@@ -277,7 +330,9 @@ class EmotionAnalyzer:
                 "emotion_analysis": {
                     "average_confidence": avg_emotion_confidence,
                     "emotion_distribution": emotion_distribution,
-                    "primary_emotion": max(emotion_distribution.items(), key=lambda x: x[1])[0]
+                    "confidence_weighted_distribution": emotion_summary["confidence_weighted_distribution"],
+                    "primary_emotion": max(emotion_distribution.items(), key=lambda x: x[1])[0],
+                    "dynamics": emotion_summary["dynamics"]
                 },
                 "sentiment_analysis": {
                     "average_sentiment_score": avg_sentiment_score,
@@ -0,0 +1,223 @@
+"""
+Emotion Model Backends
+Pluggable inference for the 48x48 facial-emotion CNN: ONNX Runtime (optionally INT8) with Keras as the fallback
+"""
+import argparse
+import importlib.util
+import logging
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+KERAS_MODEL_PATH = "emotion_model.h5"
+ONNX_MODEL_PATH = "emotion_model.onnx"
+INT8_MODEL_PATH = "emotion_model.int8.onnx"
+INPUT_SHAPE = (48, 48, 1)  # grayscale face crop scaled to [0, 1]
+ONNX_OPSET = 13
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp")
+CALIBRATION_BATCH = 16
+
+
+class EmotionBackend(ABC):
+    """Interface every emotion-model backend implements"""
+
+    name = "base"
+
+    @abstractmethod
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Emotion probabilities (n x 7) for a float32 batch of face crops (n x 48 x 48 x 1)"""
+
+
+# ----------------------
+# Keras / TensorFlow (fallback)
+# ----------------------
+class KerasEmotionBackend(EmotionBackend):
+    """The original .h5 model through TensorFlow; imported only when this backend is chosen"""
+
+    name = "keras"
+
+    def __init__(self, model_path: str = KERAS_MODEL_PATH):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(model_path)
+        import tensorflow as tf
+
+        self.model_path = model_path
+        self.model = tf.keras.models.load_model(model_path)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict(batch, verbose=0))
+
+
+# ----------------------
+# ONNX Runtime
+# ----------------------
+class OnnxEmotionBackend(EmotionBackend):
+    """Converted model (FP32 or INT8) on ONNX Runtime's CPU provider"""
+
+    name = "onnx"
+
+    def __init__(self, model_path: str = ONNX_MODEL_PATH, intra_op_threads: int = 1):
+        if importlib.util.find_spec("onnxruntime") is None:
+            raise RuntimeError("onnxruntime is not installed")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(model_path)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        # One small CNN per request: parallelism comes from the web workers, not from inside the op
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.model_path = model_path
+        self.intra_op_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: np.ascontiguousarray(batch, dtype=np.float32)})[0]
+
+
+BACKEND_REGISTRY: Dict[str, Type[EmotionBackend]] = {
+    OnnxEmotionBackend.name: OnnxEmotionBackend,
+    KerasEmotionBackend.name: KerasEmotionBackend,
+}
+
+
+def create_backend(name: str, **options) -> EmotionBackend:
+    """Instantiate a registered backend by name"""
+    if name not in BACKEND_REGISTRY:
+        raise ValueError(f"Unknown emotion backend: {name}")
+    return BACKEND_REGISTRY[name](**options)
+
+
+def _default_options(name: str) -> Dict:
+    if name == OnnxEmotionBackend.name:
+        quantized = os.environ.get("EMOTION_ONNX_INT8") == "1"
+        return {
+            "model_path": os.environ.get("EMOTION_ONNX_MODEL", INT8_MODEL_PATH if quantized else ONNX_MODEL_PATH),
+            "intra_op_threads": int(os.environ.get("EMOTION_INTRA_OP_THREADS", "1")),
+        }
+    return {"model_path": os.environ.get("EMOTION_KERAS_MODEL", KERAS_MODEL_PATH)}
+
+
+def load_backend(name: Optional[str] = None) -> Optional[EmotionBackend]:
+    """Backend selected by ``name`` or EMOTION_BACKEND (onnx, keras or auto)
+
+    ``auto`` (the default) uses ONNX Runtime when a converted model and
+    onnxruntime are present and falls back to Keras otherwise;
+    EMOTION_ONNX_INT8=1 selects the quantized model. Returns None when no
+    backend can be loaded.
+    """
+    name = name or os.environ.get("EMOTION_BACKEND", "auto")
+    candidates = list(BACKEND_REGISTRY) if name == "auto" else [name]
+    for candidate in candidates:
+        try:
+            backend = create_backend(candidate, **_default_options(candidate))
+            logger.info(f"Emotion backend '{candidate}' ready ({backend.model_path})")
+            return backend
+        except Exception as e:
+            logger.warning(f"Emotion backend '{candidate}' unavailable: {e}")
+    return None
+
+
+# ----------------------
+# One-time conversion
+# ----------------------
+def convert_to_onnx(keras_path: str = KERAS_MODEL_PATH, onnx_path: str = ONNX_MODEL_PATH,
+                    opset: int = ONNX_OPSET) -> str:
+    """Export the Keras model to ONNX with a dynamic batch dimension (needs requirements-convert.txt)"""
+    import tensorflow as tf
+    import tf2onnx
+
+    model = tf.keras.models.load_model(keras_path)
+    spec = (tf.TensorSpec((None,) + INPUT_SHAPE, tf.float32, name="face"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=opset, output_path=onnx_path)
+    return onnx_path
+
+
+def load_face_crops(directory: str, limit: Optional[int] = None) -> np.ndarray:
+    """Face crop images from a directory as a model-ready batch (grayscale, 48x48, [0, 1])"""
+    from PIL import Image
+
+    paths = sorted(p for p in Path(directory).rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES)[:limit]
+    faces = np.empty((len(paths),) + INPUT_SHAPE, dtype=np.float32)
+    for i, path in enumerate(paths):
+        image = Image.open(path).convert("L").resize(INPUT_SHAPE[:2])
+        faces[i, :, :, 0] = np.asarray(image, dtype=np.float32) / 255.0
+    return faces
+
+
+def quantize_int8(onnx_path: str = ONNX_MODEL_PATH, int8_path: str = INT8_MODEL_PATH,
+                  calibration: Optional[np.ndarray] = None) -> str:
+    """INT8 quantization (needs onnx, see requirements-convert.txt)
+
+    With calibration faces, weights and activations are quantized statically
+    (QDQ, per-channel weights), so the convolutions run on integer kernels.
+    Without them only the weights are quantized dynamically: the file
+    shrinks, but small convolutions can run slower than FP32. Either way,
+    compare with emotion_benchmark.py before enabling it.
+    """
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    )
+
+    if calibration is None or not len(calibration):
+        quantize_dynamic(onnx_path, int8_path, op_types_to_quantize=["Conv", "MatMul", "Gemm"],
+                         weight_type=QuantType.QInt8)
+        return int8_path
+
+    import onnxruntime as ort
+
+    input_name = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class FaceReader(CalibrationDataReader):
+        def __init__(self):
+            self.batches = iter(range(0, len(calibration), CALIBRATION_BATCH))
+
+        def get_next(self):
+            start = next(self.batches, None)
+            return None if start is None else {input_name: calibration[start:start + CALIBRATION_BATCH]}
+
+    quantize_static(onnx_path, int8_path, FaceReader(), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True)
+    return int8_path
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """How closely a backend's predictions follow the reference's on the same batch"""
+    return {
+        "top1_agreement": float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1))),
+        "max_abs_diff": float(np.max(np.abs(reference - candidate))),
+        "mean_abs_diff": float(np.mean(np.abs(reference - candidate))),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Convert the Keras emotion model to ONNX (optionally INT8)")
+    parser.add_argument("--keras", default=KERAS_MODEL_PATH)
+    parser.add_argument("--onnx", default=ONNX_MODEL_PATH)
+    parser.add_argument("--int8", default=INT8_MODEL_PATH)
+    parser.add_argument("--no-quantize", action="store_true", help="write only the FP32 model")
+    parser.add_argument("--calibration", help="directory of face crops for static INT8 calibration")
+    parser.add_argument("--skip-convert", action="store_true", help="quantize an existing ONNX model")
+    args = parser.parse_args(argv)
+
+    if not args.skip_convert:
+        print(f"converted {args.keras} -> {convert_to_onnx(args.keras, args.onnx)}")
+    if not args.no_quantize:
+        calibration = load_face_crops(args.calibration) if args.calibration else None
+        kind = f"static, {len(calibration)} calibration faces" if calibration is not None else "dynamic, weights only"
+        print(f"quantized {args.onnx} -> {quantize_int8(args.onnx, args.int8, calibration)} ({kind})")
+    print("check accuracy and latency with: python emotion_benchmark.py --images <face crops dir>")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
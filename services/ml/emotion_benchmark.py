@@ -0,0 +1,110 @@
+"""
+Emotion Backend Benchmark
+Load time, per-frame latency and accuracy parity against the Keras model for each available backend
+
+Latency can be measured on random pixels, but top-1 agreement only means
+something on real faces, so it is reported and checked only with --images.
+"""
+import argparse
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from emotion_backends import (
+    INPUT_SHAPE, INT8_MODEL_PATH, KERAS_MODEL_PATH, ONNX_MODEL_PATH, EmotionBackend, create_backend,
+    load_face_crops, parity
+)
+from emotion_stats import EMOTION_LABELS
+
+DEFAULT_MIN_AGREEMENT = 0.98
+
+
+def load_faces(directory: Optional[str], count: int, seed: int = 7) -> np.ndarray:
+    """Face crops from a directory (grayscale, 48x48, [0, 1]); random pixels, for latency only, when none is given"""
+    if not directory:
+        rng = np.random.default_rng(seed)
+        return rng.random((count,) + INPUT_SHAPE, dtype=np.float32)
+
+    faces = load_face_crops(directory, count)
+    if not len(faces):
+        raise SystemExit(f"No images found in {directory}")
+    return faces
+
+
+def variants(threads: int) -> List[Tuple[str, str, Dict]]:
+    """(label, backend name, options) for every model file present"""
+    found = []
+    if os.path.exists(KERAS_MODEL_PATH):
+        found.append(("keras", "keras", {"model_path": KERAS_MODEL_PATH}))
+    if os.path.exists(ONNX_MODEL_PATH):
+        found.append(("onnx fp32", "onnx", {"model_path": ONNX_MODEL_PATH, "intra_op_threads": threads}))
+    if os.path.exists(INT8_MODEL_PATH):
+        found.append(("onnx int8", "onnx", {"model_path": INT8_MODEL_PATH, "intra_op_threads": threads}))
+    return found
+
+
+def latency_ms(backend: EmotionBackend, faces: np.ndarray, batch: int, repeats: int) -> Dict[str, float]:
+    backend.predict(faces[:batch])  # warm-up
+    timings = []
+    for i in range(repeats):
+        start = (i * batch) % max(1, len(faces) - batch + 1)
+        started = time.perf_counter()
+        backend.predict(faces[start:start + batch])
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"p50": float(np.percentile(timings, 50)), "p95": float(np.percentile(timings, 95))}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark emotion model backends")
+    parser.add_argument("--images", help="directory of face crops for the parity check (without it only latency is measured)")
+    parser.add_argument("-n", "--count", type=int, default=256, help="faces to evaluate")
+    parser.add_argument("--batch", type=int, default=4, help="faces per call in the batched latency run")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=1, help="ONNX Runtime intra-op threads")
+    parser.add_argument("--min-agreement", type=float,
+                        help="exit non-zero if a backend's top-1 agreement with Keras falls below this "
+                             f"(needs --images, default {DEFAULT_MIN_AGREEMENT})")
+    args = parser.parse_args(argv)
+    if args.min_agreement is not None and not args.images:
+        parser.error("--min-agreement needs --images: agreement on random pixels says nothing about accuracy")
+    min_agreement = DEFAULT_MIN_AGREEMENT if args.min_agreement is None else args.min_agreement
+
+    faces = load_faces(args.images, args.count)
+    reference = None
+    failed = False
+    for label, name, options in variants(args.threads):
+        started = time.perf_counter()
+        backend = create_backend(name, **options)
+        load_seconds = time.perf_counter() - started
+
+        predictions = backend.predict(faces)
+        if predictions.shape != (len(faces), len(EMOTION_LABELS)):
+            raise SystemExit(f"{label}: unexpected output shape {predictions.shape}")
+        single = latency_ms(backend, faces, 1, args.repeats)
+        batched = latency_ms(backend, faces, args.batch, args.repeats)
+
+        line = (f"{label:>10}: load {load_seconds:6.2f}s | 1 face p50 {single['p50']:6.2f} ms p95 {single['p95']:6.2f} ms"
+                f" | {args.batch} faces p50 {batched['p50']:6.2f} ms")
+        if reference is None:
+            reference = predictions
+            line += " | reference"
+        else:
+            check = parity(reference, predictions)
+            line += f" | max |diff| {check['max_abs_diff']:.4f}"
+            if args.images:
+                failed |= check["top1_agreement"] < min_agreement
+                line += f", top-1 agreement {check['top1_agreement']:.3f}"
+        print(line)
+
+    if reference is None:
+        raise SystemExit(f"No models found (looked for {KERAS_MODEL_PATH}, {ONNX_MODEL_PATH}, {INT8_MODEL_PATH})")
+    if failed:
+        raise SystemExit(f"Top-1 agreement below {min_agreement}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
@@ -0,0 +1,153 @@
+"""
+Emotion Frame Statistics
+Vectorized aggregation of per-frame emotion scores packed into a frames x emotions array
+"""
+from dataclasses import dataclass
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+EMOTION_LABELS = ('angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral')
+POSITIVE_EMOTIONS = ('happy', 'surprise')
+NEGATIVE_EMOTIONS = ('angry', 'sad', 'fear')
+
+# Half a minute at the interview client's one frame per second
+DEFAULT_WINDOW = 30
+NO_EMOTION = -1  # dominant index of a frame without scores
+
+
+@dataclass
+class EmotionFrames:
+    """Per-frame emotion scores (frames x labels) and detection confidences (frames,)"""
+    scores: np.ndarray
+    confidence: np.ndarray
+    labels: Sequence[str] = EMOTION_LABELS
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]], labels: Sequence[str] = EMOTION_LABELS) -> "EmotionFrames":
+        """Pack analyzer results ({'confidence', 'all_emotions'} per frame); unknown emotions are ignored"""
+        get_scores = itemgetter(*labels) if len(labels) > 1 else (lambda scores: (scores[labels[0]],))
+        empty: Dict[str, float] = {}
+
+        def row(all_emotions) -> Tuple[float, ...]:
+            try:
+                return get_scores(all_emotions)  # one C-level lookup when every label is present
+            except (KeyError, TypeError):
+                return tuple((all_emotions or empty).get(label, 0.0) for label in labels)
+
+        rows = map(row, (record.get('all_emotions') for record in records))
+        scores = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=len(records) * len(labels))
+        scores = scores.reshape(len(records), len(labels))
+        confidence = np.fromiter((record.get('confidence', 0) for record in records), dtype=np.float64,
+                                 count=len(records))
+        return cls(scores=scores, confidence=confidence, labels=tuple(labels))
+
+    def column(self, names: Iterable[str]) -> np.ndarray:
+        """Summed scores of the given emotions per frame"""
+        index = [self.labels.index(name) for name in names if name in self.labels]
+        return self.scores[:, index].sum(axis=1)
+
+
+def normalize(totals: np.ndarray) -> np.ndarray:
+    total = totals.sum()
+    return totals / total if total > 0 else np.zeros_like(totals)
+
+
+def distribution(frames: EmotionFrames) -> np.ndarray:
+    """Share of the summed emotion scores per label"""
+    return normalize(frames.scores.sum(axis=0))
+
+
+def confidence_weighted_distribution(frames: EmotionFrames) -> np.ndarray:
+    """Distribution with each frame weighted by its detection confidence"""
+    return normalize(frames.confidence @ frames.scores)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Means over every ``window`` consecutive rows (cumulative-sum trick, O(n))"""
+    window = max(1, min(window, len(values)))
+    cumulative = np.cumsum(values, axis=0, dtype=np.float64)
+    cumulative = np.concatenate([np.zeros((1,) + values.shape[1:]), cumulative])
+    return (cumulative[window:] - cumulative[:-window]) / window
+
+
+def dominant_runs(frames: EmotionFrames):
+    """Run-length encoding of the per-frame dominant emotion: (starts, lengths, label indices)"""
+    if not len(frames):
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+    dominant = frames.scores.argmax(axis=1)
+    dominant[frames.scores.sum(axis=1) <= 0] = NO_EMOTION
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(dominant)) + 1])
+    lengths = np.diff(np.concatenate([starts, [len(dominant)]]))
+    return starts, lengths, dominant[starts]
+
+
+def emotion_dynamics(frames: EmotionFrames, window: int = DEFAULT_WINDOW) -> Dict[str, Any]:
+    """How emotions moved over the session: negative/positive peaks over rolling windows and dominant-emotion runs"""
+    if not len(frames):
+        return {"frames": 0}
+
+    window = max(1, min(window, len(frames)))
+    totals = rolling_mean(frames.scores.sum(axis=1), window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        negative_share = np.where(totals > 0, rolling_mean(frames.column(NEGATIVE_EMOTIONS), window) / totals, 0.0)
+        positive_share = np.where(totals > 0, rolling_mean(frames.column(POSITIVE_EMOTIONS), window) / totals, 0.0)
+    confidence = rolling_mean(frames.confidence, window)
+
+    starts, lengths, labels = dominant_runs(frames)
+    scored = labels != NO_EMOTION
+    longest_by_emotion = np.zeros(len(frames.labels), dtype=np.int64)
+    np.maximum.at(longest_by_emotion, labels[scored], lengths[scored])
+
+    dynamics: Dict[str, Any] = {
+        "frames": len(frames),
+        "window_frames": window,
+        "peak_negative_window": _peak(negative_share),
+        "peak_positive_window": _peak(positive_share),
+        "lowest_confidence_window": _peak(confidence, lowest=True),
+        "dominant_switches": int(np.count_nonzero(np.diff(labels[scored]))),
+        "longest_run_by_emotion": {
+            label: int(longest) for label, longest in zip(frames.labels, longest_by_emotion) if longest
+        },
+    }
+    if scored.any():
+        best = int(np.argmax(np.where(scored, lengths, -1)))
+        dynamics["longest_run"] = {
+            "emotion": frames.labels[labels[best]],
+            "start_frame": int(starts[best]),
+            "frames": int(lengths[best]),
+        }
+    return dynamics
+
+
+def _peak(series: np.ndarray, lowest: bool = False) -> Dict[str, Any]:
+    index = int(np.argmin(series) if lowest else np.argmax(series))
+    return {"start_frame": index, "value": float(series[index])}
+
+
+def mean_of(records: Sequence[Dict[str, Any]], key: str) -> float:
+    """Mean of one numeric field across records (0 when there are none)"""
+    if not records:
+        return 0.0
+    return float(np.fromiter((record.get(key, 0) for record in records), dtype=np.float64, count=len(records)).mean())
+
+
+def as_label_dict(values: np.ndarray, labels: Sequence[str] = EMOTION_LABELS) -> Dict[str, float]:
+    return {label: float(value) for label, value in zip(labels, values)}
+
+
+def summarize(emotion_data, window: Optional[int] = None) -> Dict[str, Any]:
+    """Distribution, confidence-weighted distribution, mean confidence and dynamics for a session"""
+    frames = emotion_data if isinstance(emotion_data, EmotionFrames) else EmotionFrames.from_records(emotion_data)
+    return {
+        "average_confidence": float(frames.confidence.mean()) if len(frames) else 0.0,
+        "emotion_distribution": as_label_dict(distribution(frames), frames.labels),
+        "confidence_weighted_distribution": as_label_dict(confidence_weighted_distribution(frames), frames.labels),
+        "dynamics": emotion_dynamics(frames, window or DEFAULT_WINDOW),
+    }
@@ -0,0 +1,148 @@
+"""
+Face Tracking
+IoU-based association of face boxes across frames, with a stable person ID and emotion timeline per tracked face
+"""
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from emotion_stats import summarize
+
+Box = Tuple[int, int, int, int]  # x, y, w, h as returned by the face cascade
+
+DEFAULT_IOU_THRESHOLD = 0.3
+# Frames a face may go undetected (turned away, occluded) before its track is dropped
+DEFAULT_MAX_MISSES = 15
+# Frames between two emotion classifications of the same track; results are reused in between
+DEFAULT_CLASSIFY_EVERY = 5
+MAX_TIMELINE_FRAMES = 3600  # an hour at the interview client's one frame per second
+MAX_ENDED_TRACKS = 32
+
+
+def iou_matrix(boxes_a: Sequence[Box], boxes_b: Sequence[Box]) -> np.ndarray:
+    """Intersection over union of every box in ``boxes_a`` with every box in ``boxes_b``"""
+    if not len(boxes_a) or not len(boxes_b):
+        return np.zeros((len(boxes_a), len(boxes_b)))
+    a = np.asarray(boxes_a, dtype=np.float64)[:, None, :]
+    b = np.asarray(boxes_b, dtype=np.float64)[None, :, :]
+    overlap_w = np.clip(np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    overlap_h = np.clip(np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    intersection = overlap_w * overlap_h
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+@dataclass
+class Track:
+    """One person followed across frames"""
+    track_id: str
+    box: Box
+    first_frame: int
+    last_frame: int
+    hits: int = 1
+    misses: int = 0
+    result: Optional[Dict[str, Any]] = None  # last emotion classification
+    classified_frame: Optional[int] = None
+    timeline: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=MAX_TIMELINE_FRAMES))
+
+    def summary(self) -> Dict[str, Any]:
+        """Emotion distribution and dynamics over this person's timeline"""
+        stats = summarize(list(self.timeline))
+        return {
+            "person_id": self.track_id,
+            "first_frame": self.first_frame,
+            "last_frame": self.last_frame,
+            "frames_tracked": self.hits,
+            "face_coordinates": list(self.box),
+            **stats,
+        }
+
+
+class FaceTracker:
+    """Greedy IoU tracker for the faces of one video stream
+
+    Each frame's detections are matched to live tracks by highest overlap
+    (above ``iou_threshold``); unmatched detections start new tracks and
+    tracks unseen for more than ``max_misses`` frames are dropped. A track is
+    due for emotion classification on its first frame and every
+    ``classify_every`` frames after that; in between its last result is
+    reused, so inference cost grows with people rather than frames.
+    """
+
+    def __init__(self, iou_threshold: float = DEFAULT_IOU_THRESHOLD, max_misses: int = DEFAULT_MAX_MISSES,
+                 classify_every: int = DEFAULT_CLASSIFY_EVERY):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.classify_every = max(1, classify_every)
+        self.tracks: Dict[str, Track] = {}
+        # Dropped tracks keep their timelines for the session's per-person summary
+        self.ended: "OrderedDict[str, Track]" = OrderedDict()
+        self.frame = -1
+        self._next_id = 1
+
+    def update(self, boxes: Sequence[Box]) -> List[Track]:
+        """Advance one frame; returns the tracks seen in it, in detection order"""
+        self.frame += 1
+        live = list(self.tracks.values())
+        overlaps = iou_matrix([track.box for track in live], boxes)
+
+        matched: Dict[int, Track] = {}
+        used = set()
+        if overlaps.size:
+            # Highest-overlap pairs first; each track and each detection is used once
+            for t, d in zip(*np.unravel_index(np.argsort(-overlaps, axis=None), overlaps.shape)):
+                if overlaps[t, d] < self.iou_threshold:
+                    break
+                if d in matched or t in used:
+                    continue
+                matched[d] = live[t]
+                used.add(t)
+
+        seen = []
+        for d, box in enumerate(boxes):
+            track = matched.get(d)
+            if track is None:
+                track = Track(track_id=f"person_{self._next_id}", box=tuple(box), first_frame=self.frame,
+                              last_frame=self.frame)
+                self.tracks[track.track_id] = track
+                self._next_id += 1
+            else:
+                track.box = tuple(box)
+                track.last_frame = self.frame
+                track.hits += 1
+                track.misses = 0
+            seen.append(track)
+
+        seen_ids = {track.track_id for track in seen}
+        for track in live:
+            if track.track_id not in seen_ids:
+                track.misses += 1
+                if track.misses > self.max_misses:
+                    self.ended[track.track_id] = self.tracks.pop(track.track_id)
+                    if len(self.ended) > MAX_ENDED_TRACKS:
+                        self.ended.popitem(last=False)
+        return seen
+
+    def needs_classification(self, track: Track) -> bool:
+        return track.result is None or self.frame - track.classified_frame >= self.classify_every
+
+    def record(self, track: Track, result: Dict[str, Any], classified: bool, timestamp: Optional[str] = None):
+        """Store the frame's emotion for a track; ``classified`` marks a fresh inference rather than a reuse"""
+        if classified:
+            track.result = result
+            track.classified_frame = self.frame
+        track.timeline.append({
+            "frame": self.frame,
+            "timestamp": timestamp,
+            "emotion": result["emotion"],
+            "confidence": result["confidence"],
+            "all_emotions": result["all_emotions"],
+            "reused": not classified,
+        })
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """Per-person summaries, tracks still in view first"""
+        return ([dict(track.summary(), active=True) for track in self.tracks.values()] +
+                [dict(track.summary(), active=False) for track in self.ended.values()])
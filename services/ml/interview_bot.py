@@ -8,11 +8,21 @@ from datetime import datetime
 import asyncio
 import aiohttp
 
+from lexicon import INTERVIEW_LEXICON
+from session_manager import SessionManager, create_cold_storage
+from session_store import decode_document, encode_document
+
 class InterviewBot:
     """AI-powered interview bot with dynamic question generation"""
     
-    def __init__(self):
-        self.interview_sessions = {}
+    def __init__(self, session_manager: Optional[SessionManager] = None):
+        # Live sessions are bounded; idle and completed ones move to compressed cold storage
+        self.interview_sessions = session_manager if session_manager is not None else SessionManager(
+            encode=encode_document,
+            decode=decode_document,
+            is_active=lambda session: session['status'] == 'IN_PROGRESS',
+            cold_storage=create_cold_storage(),
+        )
         self.question_templates = self._load_question_templates()
         self.scoring_criteria = self._load_scoring_criteria()
     
@@ -116,7 +126,7 @@ class InterviewBot:
             'status': 'IN_PROGRESS'
         }
         
-        self.interview_sessions[session_id] = session_data
+        self.interview_sessions.put(session_id, session_data)
         
         return {
             'session_id': session_id,
@@ -224,11 +234,11 @@ class InterviewBot:
     async def submit_response(self, session_id: str, question_index: int, 
                             response: str, timestamp: datetime = None) -> Dict[str, Any]:
         """Process candidate response"""
-        if session_id not in self.interview_sessions:
+        # Idle sessions that were evicted are brought back when the candidate returns
+        session = self.interview_sessions.restore(session_id)
+        if session is None:
             return {'error': 'Interview session not found'}
         
-        session = self.interview_sessions[session_id]
-        
         if question_index >= len(session['questions']):
             return {'error': 'Invalid question index'}
         
@@ -267,6 +277,7 @@ class InterviewBot:
             
             result['final_score'] = final_score
             result['summary'] = self._generate_interview_summary(session)
+            self.interview_sessions.archive(session_id)
         else:
             result['next_question'] = session['questions'][next_question_index]
             result['questions_remaining'] = len(session['questions']) - next_question_index
@@ -277,14 +288,20 @@ class InterviewBot:
         """Analyze candidate response using AI/NLP"""
         # This would typically integrate with OpenAI, Anthropic, or similar
         # For now, we'll use keyword matching and heuristics
-        
-        response_lower = response.lower()
+        return self.score_response(response, question)
+    
+    @staticmethod
+    def score_response(response: str, question: Dict) -> Dict[str, Any]:
+        """Keyword and heuristic scoring of one response; stateless so batch scoring can reuse it"""
         score = 0
         feedback_items = []
         
-        # Keyword analysis
+        # Expected keywords ride along as an extra lexicon family, so the response is scanned once
         expected_keywords = question.get('expected_keywords', [])
-        matched_keywords = [kw for kw in expected_keywords if kw in response_lower]
+        scan = INTERVIEW_LEXICON.extend({'expected': expected_keywords}).scan(response)
+        
+        # Keyword analysis
+        matched_keywords = scan.matched('expected')
         
         if expected_keywords:
             keyword_score = (len(matched_keywords) / len(expected_keywords)) * 60
@@ -300,15 +317,13 @@ class InterviewBot:
             score += 10
         
         # Technical terms usage
-        tech_indicators = ['architecture', 'algorithm', 'framework', 'database', 'API', 'performance']
-        tech_terms_used = sum(1 for term in tech_indicators if term in response_lower)
+        tech_terms_used = scan.count('tech_indicators')
         if tech_terms_used > 0:
             score += min(tech_terms_used * 5, 20)
             feedback_items.append('Good use of technical terminology')
         
         # Structure analysis
-        structure_indicators = ['first', 'then', 'finally', 'because', 'however', 'therefore']
-        structure_score = sum(1 for indicator in structure_indicators if indicator in response_lower)
+        structure_score = scan.count('reasoning')
         score += min(structure_score * 3, 10)
         
         # Final scoring
@@ -340,28 +355,30 @@ class InterviewBot:
     
     def _calculate_final_score(self, session: Dict) -> Dict[str, Any]:
         """Calculate final interview score"""
-        responses = session['responses']
-        if not responses:
-            return {'overall_score': 0, 'breakdown': {}}
-        
-        # Calculate average scores by category
-        category_scores = {}
-        
-        total_score = 0
-        for response in responses:
+        # Running [sum, count] of response scores per question type
+        category_totals = {}
+        for response in session['responses']:
             question_type = session['questions'][response['question_index']]['type']
-            if question_type not in category_scores:
-                category_scores[question_type] = []
-            
-            category_scores[question_type].append(response['analysis']['score'])
-            total_score += response['analysis']['score']
+            totals = category_totals.setdefault(question_type, [0, 0])
+            totals[0] += response['analysis']['score']
+            totals[1] += 1
+        
+        return self.final_score_from_totals(category_totals)
+    
+    @classmethod
+    def final_score_from_totals(cls, category_totals: Dict[str, List[float]]) -> Dict[str, Any]:
+        """Final score from per-question-type [score sum, response count] totals"""
+        response_count = sum(count for _total, count in category_totals.values())
+        if not response_count:
+            return {'overall_score': 0, 'breakdown': {}}
         
         # Calculate category averages
         category_averages = {}
-        for category, scores in category_scores.items():
-            category_averages[category] = round(sum(scores) / len(scores), 1)
+        for category, (total, count) in category_totals.items():
+            category_averages[category] = round(total / count, 1)
         
-        overall_score = round(total_score / len(responses), 1)
+        total_score = sum(total for total, _count in category_totals.values())
+        overall_score = round(total_score / response_count, 1)
         
         # Determine strengths and weaknesses
         strengths = []
@@ -378,11 +395,12 @@ class InterviewBot:
             'category_breakdown': category_averages,
             'strengths': strengths,
             'weaknesses': weaknesses,
-            'total_questions': len(responses),
-            'recommendation': self._get_recommendation(overall_score)
+            'total_questions': response_count,
+            'recommendation': cls._get_recommendation(overall_score)
         }
     
-    def _get_recommendation(self, score: float) -> str:
+    @staticmethod
+    def _get_recommendation(score: float) -> str:
         """Get hiring recommendation based on score"""
         if score >= 80:
             return "STRONG_HIRE"
@@ -475,24 +493,24 @@ class InterviewBot:
     
     def get_session_data(self, session_id: str) -> Dict[str, Any]:
         """Get complete interview session data"""
-        if session_id not in self.interview_sessions:
+        session = self.interview_sessions.get(session_id) or self.interview_sessions.load_archived(session_id)
+        if session is None:
             return {'error': 'Session not found'}
         
-        return self.interview_sessions[session_id]
+        return session
     
     def list_active_sessions(self) -> List[Dict[str, str]]:
         """List all active interview sessions"""
         active_sessions = []
         
-        for session_id, session_data in self.interview_sessions.items():
-            if session_data['status'] == 'IN_PROGRESS':
-                active_sessions.append({
-                    'session_id': session_id,
-                    'candidate_id': session_data['candidate_id'],
-                    'interview_type': session_data['interview_type'],
-                    'started_at': session_data['started_at'],
-                    'progress': f"{len(session_data['responses'])}/{len(session_data['questions'])}"
-                })
+        for session_id, session_data in self.interview_sessions.active_items():
+            active_sessions.append({
+                'session_id': session_id,
+                'candidate_id': session_data['candidate_id'],
+                'interview_type': session_data['interview_type'],
+                'started_at': session_data['started_at'],
+                'progress': f"{len(session_data['responses'])}/{len(session_data['questions'])}"
+            })
         
         return active_sessions
 
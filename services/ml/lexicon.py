@@ -0,0 +1,170 @@
+"""
+Interview Lexicon
+Keyword families from the scoring modules compiled into one n-gram table and matched in a single pass
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+(?:['+#.][A-Za-z0-9]+)*[+#]*")
+# All-caps words ("API", "REST", plural "APIs") are matched case-sensitively and never stemmed
+ACRONYM_PATTERN = re.compile(r"([A-Z][A-Z0-9]+)s?")
+# Tokens with digits or symbols ("c++", "c#", "node.js", "python3") are matched verbatim
+TECHNICAL_PATTERN = re.compile(r"[0-9+#.]")
+
+# Suffixes folded so "debugging" matches "debug" and "indexes" matches "index"
+_SUFFIXES = ("ing", "ed", "es", "s", "e")
+_MIN_STEM = 4
+_DOUBLED = set("bdfgklmnprstz")
+# Inflections that mean something else than their stem ("experienced" is not "experience")
+UNSTEMMED_WORDS = frozenset({"experienced"})
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+            token = token[:-len(suffix)]
+            if suffix in ("ing", "ed") and token[-1] == token[-2] and token[-1] in _DOUBLED:
+                token = token[:-1]
+            return token
+    return token
+
+
+@lru_cache(maxsize=65536)
+def normalize(token: str) -> str:
+    """Lookup key of a token: acronyms keep their case, technical terms are only lowercased"""
+    acronym = ACRONYM_PATTERN.fullmatch(token)
+    if acronym:
+        return acronym.group(1)
+    token = token.lower()
+    if token in UNSTEMMED_WORDS or TECHNICAL_PATTERN.search(token):
+        return token
+    return stem(token)
+
+
+def tokenize(text: str) -> List[str]:
+    return [normalize(token) for token in TOKEN_PATTERN.findall(text)]
+
+
+class LexiconScan:
+    """Per-dimension matches of one text"""
+
+    __slots__ = ("token_count", "counts", "_matches")
+
+    def __init__(self, token_count: int, matches: Dict[str, List[Tuple[int, str]]]):
+        self.token_count = token_count
+        self._matches = matches
+        self.counts = {dimension: len(terms) for dimension, terms in matches.items()}
+
+    def count(self, dimension: str) -> int:
+        """Number of distinct terms of a dimension found in the text"""
+        return self.counts.get(dimension, 0)
+
+    def matched(self, dimension: str) -> List[str]:
+        """Matched terms of a dimension, in the order the family lists them"""
+        return [term for _order, term in sorted(self._matches.get(dimension, ()))]
+
+
+class Lexicon:
+    """Keyword families (single words or phrases) tagged by dimension
+
+    Terms are tokenized and stemmed once at compile time; ``scan`` tokenizes
+    the text once, looks each token up and tries phrases only at tokens that
+    start one, so all dimensions are counted in one pass. A term counts once per text, like
+    the ``keyword in text`` checks it replaces, but matches whole words
+    rather than substrings. Words match case-insensitively except acronyms:
+    the term "REST" matches "REST" and "RESTs" but not "rest".
+    """
+
+    def __init__(self, families: Dict[str, Iterable[str]]):
+        self.families = {dimension: list(terms) for dimension, terms in families.items()}
+        # Single words by token, phrases by token tuple, and the phrase lengths starting at each token
+        self._words: Dict[str, List[Tuple[str, int, str]]] = {}
+        self._phrases: Dict[Tuple[str, ...], List[Tuple[str, int, str]]] = {}
+        self._phrase_lengths: Dict[str, Tuple[int, ...]] = {}
+        self._extended: Dict[tuple, "Lexicon"] = {}
+
+        for dimension, terms in self.families.items():
+            for order, term in enumerate(terms):
+                key = tuple(tokenize(term))
+                if not key:
+                    continue
+                if len(key) == 1:
+                    entries = self._words.setdefault(key[0], [])
+                else:
+                    entries = self._phrases.setdefault(key, [])
+                    lengths = set(self._phrase_lengths.get(key[0], ())) | {len(key)}
+                    self._phrase_lengths[key[0]] = tuple(sorted(lengths))
+                if all(entry[0] != dimension for entry in entries):
+                    entries.append((dimension, order, term))
+
+    def scan(self, text: str) -> LexiconScan:
+        tokens = tokenize(text)
+        found: Dict[str, Dict[str, int]] = {}
+        words, phrases, phrase_lengths = self._words, self._phrases, self._phrase_lengths
+
+        for start, token in enumerate(tokens):
+            entries = words.get(token)
+            if entries:
+                for dimension, order, term in entries:
+                    found.setdefault(dimension, {})[term] = order
+            for length in phrase_lengths.get(token, ()):
+                entries = phrases.get(tuple(tokens[start:start + length]))
+                if entries:
+                    for dimension, order, term in entries:
+                        found.setdefault(dimension, {})[term] = order
+
+        matches = {dimension: [(order, term) for term, order in terms.items()] for dimension, terms in found.items()}
+        return LexiconScan(len(tokens), matches)
+
+    def extend(self, families: Dict[str, Sequence[str]]) -> "Lexicon":
+        """This lexicon plus extra families (e.g. a question's expected keywords), cached"""
+        key = tuple(sorted((dimension, tuple(terms)) for dimension, terms in families.items()))
+        lexicon = self._extended.get(key)
+        if lexicon is None:
+            if len(self._extended) >= 1024:
+                self._extended.clear()
+            lexicon = self._extended[key] = Lexicon({**self.families, **families})
+        return lexicon
+
+
+# ----------------------
+# Shared families
+# ----------------------
+INTERVIEW_LEXICON = Lexicon({
+    # AIInterviewChatbot answer scoring
+    "technical": [
+        "architecture", "design", "algorithm", "database", "performance",
+        "scalability", "security", "testing", "deployment", "optimization",
+        "best practices", "patterns", "framework", "API", "REST"
+    ],
+    "structure": ["first", "second", "next", "then", "finally"],
+    "clarity": ["specifically", "for example", "in other words", "to clarify"],
+    "problem_solving": [
+        "analyze", "identify", "steps", "solution", "approach", "method",
+        "investigate", "troubleshoot", "debug", "solve", "resolve"
+    ],
+    "analytical": ["let me think", "first i would", "step by step", "my approach"],
+    "confident": [
+        "certainly", "definitely", "absolutely", "confident", "sure",
+        "experienced", "skilled", "proficient", "expert", "understand"
+    ],
+    "uncertain": [
+        "probably", "maybe", "not sure", "think", "guess", "might",
+        "possibly", "not certain", "unclear"
+    ],
+    "relevance": ["experience", "example", "situation", "time", "project"],
+
+    # InterviewBot response analysis
+    "tech_indicators": ["architecture", "algorithm", "framework", "database", "API", "performance"],
+    "reasoning": ["first", "then", "finally", "because", "however", "therefore"],
+
+    # EmotionAnalyzer text sentiment
+    "positive": ["excellent", "great", "amazing", "wonderful", "fantastic", "outstanding"],
+    "negative": ["terrible", "awful", "horrible", "disappointing", "frustrating", "difficult"],
+    "neutral": ["okay", "fine", "average", "normal", "standard", "typical"],
+    "stress": ["stress", "pressure", "anxious", "worried", "nervous", "tense"],
+    "assurance": ["confident", "sure", "certain", "definitely", "absolutely", "expert"],
+    "engagement": ["excited", "interested", "passionate", "motivated", "enthusiastic"],
+})
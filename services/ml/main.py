@@ -3,6 +3,7 @@ SmartHire AI-Powered Recruitment System
 Enhanced FastAPI Backend with Complete ML Integration
 """
 import os
+import asyncio
 import json
 import logging
 import uuid
@@ -14,7 +15,7 @@ from pathlib import Path
 from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 # ML / utils imports (may be optional)
@@ -24,14 +25,14 @@ try:
     import numpy as np
     import cv2
     from PIL import Image
-    import tensorflow as tf
     from transformers import pipeline
     import spacy
     import redis
     from celery import Celery
     from reportlab.lib.pagesizes import letter
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from report_styles import get_report_styles
+    from emotion_backends import load_backend
 except Exception:
     # If heavy libs are missing, continue — they are optional for running API skeleton.
     pass
@@ -39,7 +40,7 @@ except Exception:
 # Import existing AI modules (optional)
 try:
     from resume_parser import ResumeParser
-    from chatbot_interviewer import AIInterviewChatbot
+    from chatbot_interviewer import AIInterviewChatbot, InterviewSession
     from interview_bot import InterviewBot
     from emotion_analysis import EmotionAnalyzer
     from report_generator import ReportGenerator
@@ -48,10 +49,23 @@ except Exception as e:
     print(f"Warning: AI modules not available: {e}")
     AI_SERVICES_AVAILABLE = False
 
+# Real-time interview modules live in the sibling services/interview_realtime package,
+# which is absent when this directory is built on its own (docker-compose)
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'interview_realtime'))
+try:
+    from fanout import FanoutHub  # type: ignore
+except Exception as e:
+    print(f"Warning: websocket fan-out not available: {e}")
+    FanoutHub = None
+
+from candidate_profile import CandidateProfileAggregator, ProfileSection
+from report_export import ZipStream, safe_name
+from report_jobs import DONE, Priority, ReportJobQueue
+from session_store import SessionConflictError, create_session_store
+
 # Import Zoom interview analysis router if present (optional)
 try:
-    import sys
-    sys.path.append(os.path.join(os.path.dirname(__file__), 'interview_realtime'))
     from zoom_interview_router import router as zoom_router  # type: ignore
     ZOOM_SERVICES_AVAILABLE = True
 except Exception as e:
@@ -111,7 +125,6 @@ except Exception:
 emotion_model = None
 sentiment_analyzer = None
 nlp_model = None
-interview_sessions: Dict[str, Any] = {}
 websocket_connections: Dict[str, List[WebSocket]] = {}
 
 # Initialize AI service instances (if available)
@@ -119,8 +132,12 @@ resume_analyzer = None
 interview_chatbot = None
 emotion_analyzer = None
 report_generator = None
+interview_sessions = None
 
 if AI_SERVICES_AVAILABLE:
+    # Shared across workers (Redis) so any worker can serve any interview
+    interview_sessions = create_session_store(InterviewSession)
+
     try:
         resume_analyzer = ResumeParser()
     except Exception as e:
@@ -179,6 +196,8 @@ class EmotionAnalysisRequest(BaseModel):
     image_data: Optional[str] = None
     text_data: Optional[str] = None
     analysis_type: str = "emotion"
+    candidate_id: Optional[str] = None
+    stream_id: Optional[str] = None  # frames of one video stream are face-tracked per person (in this worker's memory)
 
 
 class AssessmentRequest(BaseModel):
@@ -194,6 +213,12 @@ class ReportRequest(BaseModel):
     format: str = "pdf"
 
 
+class ReportExportRequest(BaseModel):
+    candidate_ids: List[str]
+    report_type: str = "comprehensive"
+    format: str = "pdf"
+
+
 # Response Models
 class APIResponse(BaseModel):
     success: bool
@@ -237,9 +262,10 @@ async def initialize_ml_models():
 
     # Emotion model
     try:
-        if os.path.exists('emotion_model.h5'):
-            emotion_model = tf.keras.models.load_model('emotion_model.h5')
-            logger.info("✅ Emotion model loaded successfully")
+        # Reuse the analyzer's backend rather than loading the model a second time
+        emotion_model = emotion_analyzer.emotion_model if emotion_analyzer else load_backend()
+        if emotion_model is not None:
+            logger.info(f"✅ Emotion model loaded successfully ({emotion_model.name})")
         else:
             logger.warning("Emotion model file not found, creating mock model")
             # Create a mock emotion model
@@ -305,30 +331,45 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(secur
 # WebSocket Manager
 # ----------------------
 class ConnectionManager:
-    def __init__(self):
+    """Websocket registry backed by FanoutHub: sends are queued per connection, never awaited inline
+
+    Without the realtime package it falls back to sending directly.
+    """
+
+    def __init__(self, max_queue: int = 64, policy: str = "drop_oldest"):
+        self.hub = FanoutHub(max_queue=max_queue, policy=policy) if FanoutHub else None
         self.active_connections: List[WebSocket] = []
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, session_id: str = "default"):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        if self.hub:
+            self.hub.add(session_id, websocket)
+        else:
+            self.active_connections.append(websocket)
 
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
+    async def disconnect(self, websocket: WebSocket):
+        if self.hub:
+            await self.hub.remove(websocket)
+        elif websocket in self.active_connections:
             self.active_connections.remove(websocket)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        if self.hub:
+            self.hub.send(websocket, message)
+        else:
+            await websocket.send_text(message)
 
-    async def broadcast(self, message: str):
-        for connection in list(self.active_connections):
-            try:
-                await connection.send_text(message)
-            except Exception:
-                # remove dead connections
+    async def broadcast(self, message: str, session_id: Optional[str] = None):
+        if not self.hub:
+            for connection in list(self.active_connections):
                 try:
-                    self.active_connections.remove(connection)
+                    await connection.send_text(message)
                 except Exception:
-                    pass
+                    self.active_connections.remove(connection)
+            return
+        # The message is already serialized, so every connection shares the same text
+        for topic in ([session_id] if session_id else self.hub.topics()):
+            self.hub.publish(topic, message)
 
 
 manager = ConnectionManager()
@@ -498,6 +539,7 @@ async def register(user_data: UserRegistration):
 async def upload_resume(
     file: UploadFile = File(...),
     job_requirements: Optional[str] = None,
+    candidate_id: Optional[str] = None,
     background_tasks: BackgroundTasks = None
 ):
     """Upload and analyze resume"""
@@ -530,6 +572,8 @@ async def upload_resume(
                 result = process_resume_background(file_path, requirements)
                 analysis_id = str(uuid.uuid4())
                 _set_in_memory(f"resume_analysis:{analysis_id}", json.dumps(result), expire_seconds=3600)
+                if candidate_id:
+                    candidate_profiles.invalidate(candidate_id)
                 # Clean up file
                 try:
                     os.remove(file_path)
@@ -582,12 +626,12 @@ async def start_interview_session(request: InterviewSessionRequest):
         chatbot = interview_chatbot
         session = chatbot.initiate_interview(request.candidate_id, request.job_role)
 
-        # Store session
-        interview_sessions[session.session_id] = session
-
         # Get first question
         first_question = chatbot.get_next_question(session)
 
+        # Store session
+        interview_sessions.create(session)
+
         return APIResponse(
             success=True,
             message="Interview session started",
@@ -609,15 +653,23 @@ async def start_interview_session(request: InterviewSessionRequest):
 async def get_interview_question(session_id: str):
     """Get next interview question"""
     try:
-        if session_id not in interview_sessions:
-            raise HTTPException(status_code=404, detail="Session not found")
-
-        session = interview_sessions[session_id]
         chatbot = interview_chatbot
-        if not chatbot:
+        if not chatbot or interview_sessions is None:
             raise HTTPException(status_code=503, detail="Interview chatbot not available")
 
-        question = chatbot.get_next_question(session)
+        loaded = interview_sessions.get(session_id)
+        if loaded is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        # Refreshes and retries before the answer re-read the pending question without writing
+        question = chatbot.pending_question(loaded[0])
+        if question is None:
+            try:
+                question, _session = interview_sessions.update(session_id, chatbot.get_next_question)
+            except KeyError:
+                raise HTTPException(status_code=404, detail="Session not found")
+            except SessionConflictError as e:
+                raise HTTPException(status_code=409, detail=str(e))
 
         return APIResponse(success=True, message="Question retrieved", data=question)
     except HTTPException:
@@ -631,18 +683,31 @@ async def get_interview_question(session_id: str):
 async def submit_interview_answer(session_id: str, answer_text: str, question_id: str):
     """Submit interview answer"""
     try:
-        if session_id not in interview_sessions:
-            raise HTTPException(status_code=404, detail="Session not found")
-
-        session = interview_sessions[session_id]
         chatbot = interview_chatbot
-        if not chatbot:
+        if not chatbot or interview_sessions is None:
             raise HTTPException(status_code=503, detail="Interview chatbot not available")
 
-        response = chatbot.process_answer(session, answer_text, question_id)
+        def apply_answer(session):
+            # A retry after a concurrent write may find this question already answered
+            try:
+                question_index = int(question_id.split("_")[0])
+            except ValueError:
+                question_index = None
+            if question_index is not None and question_index < session.current_question_index:
+                raise HTTPException(status_code=409, detail="Question already answered")
+            return chatbot.process_answer(session, answer_text, question_id)
 
-        # Update session
-        interview_sessions[session_id] = session
+        try:
+            response, session = interview_sessions.update(session_id, apply_answer)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Session not found")
+        except SessionConflictError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+        candidate_profiles.invalidate(session.candidate_id)
+        if response.get("status") == "interview_completed":
+            # Finished interviews leave the live store; the assessment is already in the response
+            interview_sessions.archive(session_id)
 
         return APIResponse(success=True, message="Answer processed", data=response)
     except HTTPException:
@@ -663,7 +728,7 @@ async def analyze_emotion(request: EmotionAnalysisRequest):
 
         if request.image_data and emotion_analyzer:
             # Analyze image emotion
-            image_result = emotion_analyzer.analyze_image_emotion(request.image_data)
+            image_result = emotion_analyzer.analyze_image_emotion(request.image_data, stream_id=request.stream_id)
             result.update(image_result)
 
         if request.text_data and emotion_analyzer:
@@ -674,12 +739,37 @@ async def analyze_emotion(request: EmotionAnalysisRequest):
         if not result:
             return APIResponse(success=False, message="No analysis performed or AI services unavailable")
 
+        if request.candidate_id:
+            candidate_profiles.invalidate(request.candidate_id)
+
         return APIResponse(success=True, message="Emotion analysis completed", data=result)
     except Exception as e:
         logger.error(f"Emotion analysis error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/emotion/streams/{stream_id}/people", response_model=APIResponse)
+async def get_stream_people(stream_id: str):
+    """Per-person emotion timelines summarized for a face-tracked stream"""
+    if not emotion_analyzer:
+        raise HTTPException(status_code=503, detail="Emotion analyzer not available")
+    people = emotion_analyzer.get_stream_people(stream_id)
+    if people is None:
+        raise HTTPException(status_code=404, detail="Stream not found")
+    return APIResponse(success=True, message="Stream people retrieved", data={"stream_id": stream_id, "people": people})
+
+
+@app.delete("/api/emotion/streams/{stream_id}", response_model=APIResponse)
+async def end_emotion_stream(stream_id: str):
+    """Stop tracking a stream and return its final per-person summaries"""
+    if not emotion_analyzer:
+        raise HTTPException(status_code=503, detail="Emotion analyzer not available")
+    people = emotion_analyzer.end_stream(stream_id)
+    if people is None:
+        raise HTTPException(status_code=404, detail="Stream not found")
+    return APIResponse(success=True, message="Stream ended", data={"stream_id": stream_id, "people": people})
+
+
 # ----------------------
 # Assessment Management
 # ----------------------
@@ -746,51 +836,197 @@ async def generate_recommendations(candidate_id: str) -> List[str]:
     ]
 
 
+# Sections are fetched concurrently; one that is slow or failing leaves a gap instead of failing the report
+candidate_profiles = CandidateProfileAggregator(
+    sections=[
+        ProfileSection("resume_analysis", get_resume_analysis_data),
+        ProfileSection("interview_scores", get_interview_scores_data),
+        ProfileSection("emotion_analysis", get_emotion_analysis_data),
+        ProfileSection("recommendations", generate_recommendations, default=list),
+    ],
+    store_get=_get_in_memory,
+    store_set=_set_in_memory,
+)
+
+
+REPORT_FORMATS = ("pdf", "html", "json")
+REPORT_MEDIA_TYPES = {"pdf": "application/pdf", "html": "text/html", "json": "application/json"}
+MAX_EXPORT_CANDIDATES = 500
+
+
+async def _compose_report(candidate_id: str, report_type: str, fmt: str) -> Dict[str, Any]:
+    """Assemble a candidate's report sections and store them under a new report id"""
+    profile = await candidate_profiles.get_profile(candidate_id)
+
+    report_id = str(uuid.uuid4())
+    report_data = {
+        "report_id": report_id,
+        "candidate_id": candidate_id,
+        "report_type": report_type,
+        "format": fmt,
+        "generated_at": datetime.now().isoformat(),
+        "sections": profile.sections,
+        "missing_sections": profile.missing
+    }
+
+    # Only the data is stored; formats are rendered on demand
+    _set_in_memory(f"report:{report_id}", json.dumps(report_data), expire_seconds=86400)
+    return report_data
+
+
+def _report_candidate_data(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a stored report's sections into the candidate data ReportGenerator renders"""
+    sections = report.get("sections", {})
+    return {
+        "candidate_id": report.get("candidate_id"),
+        "resume_analysis": sections.get("resume_analysis", {}),
+        "interview_analysis": sections.get("interview_scores", {}),
+        "emotion_analysis": sections.get("emotion_analysis", {}),
+        "recommendations": sections.get("recommendations", []),
+    }
+
+
+def _report_document(report_id: str, report: Dict[str, Any]) -> Dict[str, Any]:
+    return report_generator.build_report_document(
+        _report_candidate_data(report),
+        report.get("report_type", "comprehensive"),
+        report_id=report_id,
+        generated_at=report.get("generated_at"),
+    )
+
+
+def _store_report_job(job):
+    """Publish render job status where every worker can read it"""
+    _set_in_memory(f"report_job:{job.job_id}", json.dumps(job.to_dict()), expire_seconds=86400)
+    if job.status == DONE:
+        # Pool workers only write artifacts; the disk budget is enforced here, off the event loop
+        asyncio.get_running_loop().run_in_executor(None, report_generator.artifacts.trim, job.result)
+
+
+# Rendering runs in worker processes; interactive downloads are dispatched ahead of bulk work
+report_jobs = ReportJobQueue(
+    max_workers=int(os.environ.get("REPORT_RENDER_WORKERS", "0")) or None,
+    on_update=_store_report_job,
+) if report_generator else None
+
+
+@app.on_event("shutdown")
+async def shutdown_report_jobs():
+    if report_jobs:
+        report_jobs.shutdown()
+
+
+def _build_basic_pdf(report_id: str, report: Dict[str, Any]) -> str:
+    """Plain section dump used when ReportGenerator is unavailable"""
+    pdf_dir = Path("reports")
+    pdf_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = pdf_dir / f"{report_id}.pdf"
+
+    doc = SimpleDocTemplate(str(pdf_path), pagesize=letter)
+    shared_styles = get_report_styles()
+    styles = shared_styles.sheet
+    story = [Paragraph("SmartHire Candidate Report", shared_styles.basic_title)]
+    story.append(Spacer(1, 20))
+
+    for section, data in report.get("sections", {}).items():
+        story.append(Paragraph(f"<b>{section.replace('_', ' ').title()}</b>", styles['Heading2']))
+        story.append(Paragraph(str(data), styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    doc.build(story)
+    return str(pdf_path)
+
+
 @app.post("/api/reports/generate", response_model=APIResponse)
 async def generate_report(request: ReportRequest):
     """Generate candidate report"""
     try:
-        report_id = str(uuid.uuid4())
-
-        # Compose report data (async gather)
-        resume_data = await get_resume_analysis_data(request.candidate_id)
-        interview_data = await get_interview_scores_data(request.candidate_id)
-        emotion_data = await get_emotion_analysis_data(request.candidate_id)
-        recommendations = await generate_recommendations(request.candidate_id)
-
-        report_data = {
-            "report_id": report_id,
-            "candidate_id": request.candidate_id,
-            "report_type": request.report_type,
-            "format": request.format,
-            "generated_at": datetime.now().isoformat(),
-            "sections": {
-                "resume_analysis": resume_data,
-                "interview_scores": interview_data,
-                "emotion_analysis": emotion_data,
-                "recommendations": recommendations
-            }
-        }
-
-        if report_generator:
-            try:
-                comprehensive_report = report_generator.generate_comprehensive_report(report_data)
-                report_data.update({"generated_report": comprehensive_report})
-            except Exception as e:
-                logger.warning(f"Report generation via generator failed: {e}")
+        report_data = await _compose_report(request.candidate_id, request.report_type, request.format)
+        report_id = report_data["report_id"]
 
-        _set_in_memory(f"report:{report_id}", json.dumps(report_data), expire_seconds=86400)
+        if report_jobs and request.format in REPORT_FORMATS:
+            # Pre-render the requested format in the bulk lane; a download before it finishes promotes it
+            report_jobs.render(f"{report_id}:{request.format}", _report_document(report_id, report_data),
+                               request.format, priority=Priority.BULK)
 
         return APIResponse(
             success=True,
             message="Report generated successfully",
-            data={"report_id": report_id, "download_url": f"/api/reports/download/{report_id}"}
+            data={
+                "report_id": report_id,
+                "download_url": f"/api/reports/download/{report_id}",
+                "status_url": f"/api/reports/{report_id}/status"
+            }
         )
     except Exception as e:
         logger.error(f"Generate report error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/reports/export")
+async def export_reports(request: ReportExportRequest):
+    """Reports for many candidates as one ZIP, streamed entry by entry as renders finish"""
+    if not report_jobs:
+        raise HTTPException(status_code=503, detail="Report rendering not available")
+    if request.format not in REPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {request.format}")
+    candidate_ids = list(dict.fromkeys(request.candidate_ids))
+    if not candidate_ids or len(candidate_ids) > MAX_EXPORT_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"Provide 1 to {MAX_EXPORT_CANDIDATES} candidate ids")
+
+    fmt = request.format
+    reports = await asyncio.gather(*(_compose_report(cid, request.report_type, fmt) for cid in candidate_ids))
+
+    # All renders are queued up front in the bulk lane, so interactive downloads still go first;
+    # each pool worker reuses one ReportGenerator (styles, fonts, compiled template) across entries
+    jobs = []
+    for report in reports:
+        document = _report_document(report["report_id"], report)
+        job = report_jobs.render(f"{report['report_id']}:{fmt}", document, fmt, priority=Priority.BULK)
+        jobs.append((report["candidate_id"], report["report_id"], job.job_id))
+
+    async def rendered(candidate_id: str, report_id: str, job_id: str):
+        try:
+            return candidate_id, report_id, await report_jobs.wait(job_id), None
+        except Exception as e:
+            return candidate_id, report_id, None, str(e)
+
+    async def archive_chunks():
+        archive = ZipStream()
+        manifest = []
+        for next_done in asyncio.as_completed([rendered(*job) for job in jobs]):
+            candidate_id, report_id, artifact_path, error = await next_done
+            entry = {"candidate_id": candidate_id, "report_id": report_id}
+            if error is None:
+                arcname = f"{safe_name(candidate_id)}_{report_id}.{fmt}"
+                chunks = archive.add_file(arcname, str(artifact_path))
+                try:
+                    while True:
+                        # File reads and compression stay off the event loop
+                        chunk = await asyncio.to_thread(next, chunks, None)
+                        if chunk is None:
+                            break
+                        if chunk:
+                            yield chunk
+                    entry["file"] = arcname
+                except FileNotFoundError:
+                    error = "artifact evicted before export"
+            if error is not None:
+                logger.error(f"Export of report {report_id} failed: {error}")
+                entry["error"] = error
+            manifest.append(entry)
+
+        yield archive.add_bytes("manifest.json", json.dumps(manifest, indent=2).encode("utf-8"))
+        yield archive.close()
+
+    filename = f"candidate_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(
+        archive_chunks(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @app.get("/api/reports/download/{report_id}")
 async def download_report(report_id: str, format: str = "pdf"):
     """Download generated report"""
@@ -801,34 +1037,55 @@ async def download_report(report_id: str, format: str = "pdf"):
 
         report = json.loads(report_data_str)
 
-        if format == "pdf":
-            pdf_dir = Path("reports")
-            pdf_dir.mkdir(parents=True, exist_ok=True)
-            pdf_path = pdf_dir / f"{report_id}.pdf"
+        if report_jobs and format in REPORT_FORMATS:
+            document = _report_document(report_id, report)
+            artifact_path = report_generator.artifacts.get(report_generator.artifact_key(document, format), format)
+            if artifact_path is None:
+                job = report_jobs.render(f"{report_id}:{format}", document, format, priority=Priority.INTERACTIVE)
+                artifact_path = await report_jobs.wait(job.job_id)
+            return FileResponse(
+                str(artifact_path),
+                media_type=REPORT_MEDIA_TYPES[format],
+                filename=f"candidate_report_{report_id}.{format}",
+            )
 
-            doc = SimpleDocTemplate(str(pdf_path), pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
+        if format == "pdf":
+            pdf_path = await asyncio.to_thread(_build_basic_pdf, report_id, report)
+            return FileResponse(pdf_path, filename=f"candidate_report_{report_id}.pdf")
 
-            title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=18, spaceAfter=30, alignment=1)
-            story.append(Paragraph("SmartHire Candidate Report", title_style))
-            story.append(Spacer(1, 20))
+        # fallback: return JSON
+        return JSONResponse(content=report)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Download report error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-            for section, data in report.get("sections", {}).items():
-                story.append(Paragraph(f"<b>{section.replace('_', ' ').title()}</b>", styles['Heading2']))
-                story.append(Paragraph(str(data), styles['Normal']))
-                story.append(Spacer(1, 12))
 
-            doc.build(story)
+@app.get("/api/reports/{report_id}/status", response_model=APIResponse)
+async def get_report_status(report_id: str):
+    """Render status (queued / running / done / failed) of each requested format"""
+    try:
+        report_data_str = _get_in_memory(f"report:{report_id}")
+        if not report_data_str:
+            raise HTTPException(status_code=404, detail="Report not found")
 
-            return FileResponse(str(pdf_path), filename=f"candidate_report_{report_id}.pdf")
+        formats = {}
+        for fmt in REPORT_FORMATS:
+            job_str = _get_in_memory(f"report_job:{report_id}:{fmt}")
+            if job_str:
+                job = json.loads(job_str)
+                formats[fmt] = {k: job[k] for k in ("status", "error", "queued_at", "started_at", "finished_at")}
 
-        # fallback: return JSON
-        return JSONResponse(content=report)
+        return APIResponse(
+            success=True,
+            message="Report status retrieved",
+            data={"report_id": report_id, "formats": formats}
+        )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Download report error: {e}")
+        logger.error(f"Report status error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -838,13 +1095,12 @@ async def download_report(report_id: str, format: str = "pdf"):
 @app.websocket("/ws/interview/{session_id}")
 async def websocket_interview_endpoint(websocket: WebSocket, session_id: str):
     """WebSocket endpoint for real-time interview updates"""
-    await manager.connect(websocket)
+    await manager.connect(websocket, session_id)
     try:
         while True:
             try:
                 data = await websocket.receive_text()
             except WebSocketDisconnect:
-                manager.disconnect(websocket)
                 break
             except Exception:
                 # ignore malformed frames
@@ -863,7 +1119,8 @@ async def websocket_interview_endpoint(websocket: WebSocket, session_id: str):
                 if emotion_analyzer:
                     try:
                         img_b64 = message.get("image_data")
-                        image_result = emotion_analyzer.analyze_image_emotion(img_b64)
+                        # Tracked per session in this process; the socket keeps every frame on this worker
+                        image_result = emotion_analyzer.analyze_image_emotion(img_b64, stream_id=session_id)
                         await manager.send_personal_message(json.dumps({"type": "emotion_update", "data": image_result}), websocket)
                     except Exception as e:
                         await manager.send_personal_message(json.dumps({"error": str(e)}), websocket)
@@ -899,7 +1156,7 @@ async def websocket_interview_endpoint(websocket: WebSocket, session_id: str):
 
     finally:
         try:
-            manager.disconnect(websocket)
+            await manager.disconnect(websocket)
         except Exception:
             pass
 
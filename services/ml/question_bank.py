@@ -0,0 +1,117 @@
+"""
+Interview Question Bank
+Loads questions from a data file and indexes them by role, category and difficulty
+"""
+import json
+import logging
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BANK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "question_bank.json")
+GENERAL_ROLE = "general"
+
+
+# ----------------------
+# Asked-question bitsets
+# ----------------------
+def is_asked(asked: bytes, question_id: int) -> bool:
+    byte = question_id >> 3
+    return byte < len(asked) and bool(asked[byte] & (1 << (question_id & 7)))
+
+
+def mark_asked(asked: bytes, question_id: int) -> bytes:
+    """Return a copy of the bitset with `question_id` set"""
+    byte = question_id >> 3
+    bits = bytearray(asked)
+    if byte >= len(bits):
+        bits.extend(b"\x00" * (byte + 1 - len(bits)))
+    bits[byte] |= 1 << (question_id & 7)
+    return bytes(bits)
+
+
+class QuestionBank:
+    """Questions indexed by (role, category, difficulty)
+
+    Question ids are stable integers from the data file and double as bit
+    positions in a session's asked-question bitset, so a session costs one
+    bit per question in the bank.
+    """
+
+    def __init__(self, questions: List[Dict]):
+        self._by_id: Dict[int, Dict] = {}
+        self._index: Dict[Tuple[str, str, Optional[str]], List[int]] = {}
+
+        for question in questions:
+            question_id = int(question["id"])
+            if question_id < 0 or question_id in self._by_id:
+                raise ValueError(f"Question ids must be unique non-negative integers (got {question_id})")
+            question = dict(question, id=question_id, role=question["role"].lower())
+            self._by_id[question_id] = question
+
+            role, category, difficulty = question["role"], question["category"], question["difficulty"]
+            self._index.setdefault((role, category, difficulty), []).append(question_id)
+            self._index.setdefault((role, category, None), []).append(question_id)
+
+        self.roles = {role for role, _category, _difficulty in self._index}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_BANK_PATH) -> "QuestionBank":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        bank = cls(data["questions"])
+        logger.info(f"Loaded {len(bank)} interview questions from {path}")
+        return bank
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, question_id: int) -> Optional[Dict]:
+        return self._by_id.get(question_id)
+
+    def candidates(self, role: str, category: str, difficulty: Optional[str] = None) -> List[int]:
+        """Question ids for a role (general if the role has none), category and optional difficulty"""
+        role = role.lower()
+        if role not in self.roles:
+            role = GENERAL_ROLE
+        return self._index.get((role, category, difficulty), [])
+
+    def sample(
+        self,
+        role: str,
+        category: str,
+        asked: bytes = b"",
+        difficulty: Optional[str] = None,
+        rng: random.Random = None,
+        max_probes: int = 8,
+    ) -> Optional[Dict]:
+        """Pick a question not yet in `asked`, or None if all of them were asked
+
+        A few random probes find an unasked question in expected O(1) while
+        most of the pool is unused; only a nearly exhausted pool is scanned.
+        """
+        rng = rng or random
+        pool = self.candidates(role, category, difficulty)
+        if not pool:
+            return None
+
+        for _ in range(max_probes):
+            question_id = pool[rng.randrange(len(pool))]
+            if not is_asked(asked, question_id):
+                return self._by_id[question_id]
+
+        remaining = [question_id for question_id in pool if not is_asked(asked, question_id)]
+        return self._by_id[rng.choice(remaining)] if remaining else None
+
+
+_default_bank: Optional[QuestionBank] = None
+
+
+def get_default_bank() -> QuestionBank:
+    """Process-wide bank from QUESTION_BANK_PATH or the bundled data file"""
+    global _default_bank
+    if _default_bank is None:
+        _default_bank = QuestionBank.load(os.environ.get("QUESTION_BANK_PATH", DEFAULT_BANK_PATH))
+    return _default_bank
@@ -0,0 +1,88 @@
+"""
+Report Rendering Benchmark
+Reports per second for N distinct candidates, with shared styles or with styles rebuilt per report
+"""
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import report_styles
+from report_generator import ReportGenerator
+
+RENDERERS = ("pdf", "html")
+
+
+def sample_candidate(index: int, rng: random.Random) -> Dict[str, Any]:
+    """Candidate data shaped like main.py's report sections, varied per index"""
+    return {
+        "candidate_id": f"bench_{index:05d}",
+        "candidate_name": f"Candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "job_role": rng.choice(["Backend Engineer", "Data Scientist", "Product Manager"]),
+        "overall_score": rng.uniform(40, 100),
+        "resume_analysis": {
+            "skills_match": rng.uniform(0, 100),
+            "experience_score": rng.uniform(0, 100),
+            "skills": {"technical": ["Python", "SQL", "Docker"], "soft": ["Communication", "Ownership"]},
+            "years_of_experience": rng.randint(0, 15),
+        },
+        "interview_analysis": {
+            "overall_score": rng.uniform(0, 100),
+            "category_breakdown": {c: rng.uniform(0, 100) for c in ("technical", "communication", "problem_solving")},
+            "strengths": ["Clear reasoning"],
+            "weaknesses": ["Limited system design depth"],
+        },
+        "emotion_analysis": {"emotion": "neutral", "confidence": rng.random(), "sentiment": "positive"},
+        "recommendations": [f"Recommendation {i}" for i in range(rng.randint(0, 5))],
+    }
+
+
+def run(count: int, fmt: str, cold_styles: bool, seed: int = 7) -> Dict[str, float]:
+    rng = random.Random(seed)
+    candidates = [sample_candidate(i, rng) for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        started = time.perf_counter()
+        generator = ReportGenerator()
+        setup_seconds = time.perf_counter() - started
+
+        render = generator.generate_pdf_report if fmt == "pdf" else generator.generate_html_report
+        started = time.perf_counter()
+        for i, candidate in enumerate(candidates):
+            if cold_styles:
+                # Emulates building the stylesheet and fixed-section flowables for every report
+                report_styles.get_report_styles.cache_clear()
+                report_styles._parsed_paragraph.cache_clear()
+                report_styles.get_report_styles()
+            render(candidate, f"bench_{i}", path=Path(out_dir) / f"bench_{i}.{fmt}")
+        elapsed = time.perf_counter() - started
+
+    return {
+        "reports": count,
+        "setup_ms": setup_seconds * 1000,
+        "seconds": elapsed,
+        "reports_per_second": count / elapsed if elapsed else float("inf"),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark report rendering throughput")
+    parser.add_argument("-n", "--count", type=int, default=200)
+    parser.add_argument("--format", choices=RENDERERS, default="pdf")
+    parser.add_argument("--compare", action="store_true", help="also run with styles rebuilt for every report")
+    args = parser.parse_args(argv)
+
+    modes = [("shared styles", False)] + ([("per-report styles", True)] if args.compare else [])
+    for label, cold_styles in modes:
+        result = run(args.count, args.format, cold_styles)
+        print(f"{label:>18}: {result['reports_per_second']:8.1f} {args.format} reports/s "
+              f"({result['reports']} in {result['seconds']:.2f}s, generator setup {result['setup_ms']:.1f} ms)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
@@ -0,0 +1,160 @@
+"""
+Report Artifact Cache
+Rendered report files memoized by content hash, with least-recently-used eviction under a disk budget
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+ARTIFACT_PREFIX = "artifact_"
+
+
+def content_hash(document: Dict[str, Any]) -> str:
+    """Stable digest of a report document; identical documents render identical artifacts"""
+    canonical = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    """Rendered artifacts as ``artifact_{hash}.{format}`` files in one directory
+
+    A hit refreshes the file's position in the LRU order (and its mtime, so
+    the order is shared through the file system); after each render the
+    oldest artifacts are deleted until the directory fits ``max_bytes``.
+    Concurrent requests for the same artifact wait for a single render.
+    Files written by other processes sharing the directory are picked up
+    on lookup.
+
+    When several processes write to one directory, only one of them should
+    evict: the others are created with ``evict=False`` and just write files,
+    and the evicting process calls ``trim`` after their renders finish.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES, evict: bool = True):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.evict = evict
+        self._lock = threading.Lock()
+        self._render_locks: Dict[str, threading.Lock] = {}
+        # file name -> size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._load_existing()
+
+    def _load_existing(self):
+        """Index the artifacts in the directory, least recently used first"""
+        self._entries.clear()
+        self.total_bytes = 0
+        existing = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(ARTIFACT_PREFIX) and entry.is_file():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # removed by another process since the listing
+                existing.append((stat.st_mtime, entry.name, stat.st_size))
+        for _mtime, name, size in sorted(existing):
+            self._entries[name] = size
+            self.total_bytes += size
+
+    def path_for(self, digest: str, fmt: str) -> Path:
+        return self.directory / f"{ARTIFACT_PREFIX}{digest}.{fmt}"
+
+    def get(self, digest: str, fmt: str) -> Optional[Path]:
+        path = self.path_for(digest, fmt)
+        with self._lock:
+            if path.name not in self._entries:
+                # Possibly rendered by another process sharing the directory
+                try:
+                    size = path.stat().st_size
+                except FileNotFoundError:
+                    return None
+                self._entries[path.name] = size
+                self.total_bytes += size
+            elif not path.exists():
+                self.total_bytes -= self._entries.pop(path.name)
+                return None
+            self._entries.move_to_end(path.name)
+        try:
+            os.utime(path)  # keeps LRU order across restarts
+        except FileNotFoundError:
+            return None
+        self.hits += 1
+        return path
+
+    def get_or_render(self, digest: str, fmt: str, render: Callable[[Path], None]) -> Path:
+        """Cached artifact, or the result of ``render(path)`` written atomically in its place"""
+        path = self.get(digest, fmt)
+        if path is not None:
+            return path
+
+        path = self.path_for(digest, fmt)
+        with self._lock:
+            render_lock = self._render_locks.setdefault(path.name, threading.Lock())
+        with render_lock:
+            cached = self.get(digest, fmt)
+            if cached is not None:
+                return cached
+
+            self.misses += 1
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            try:
+                render(tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+                with self._lock:
+                    self._render_locks.pop(path.name, None)
+
+            with self._lock:
+                size = path.stat().st_size
+                self.total_bytes += size - self._entries.pop(path.name, 0)
+                self._entries[path.name] = size
+                if self.evict:
+                    self._evict(keep=path.name)
+            return path
+
+    def trim(self, keep: Optional[str] = None):
+        """Re-index the directory, including other processes' artifacts, and evict down to ``max_bytes``
+
+        ``keep`` (a path or file name) is never evicted, e.g. an artifact
+        that is about to be served.
+        """
+        with self._lock:
+            self._load_existing()
+            self._evict(keep=Path(keep).name if keep else None)
+
+    def _evict(self, keep: Optional[str]):
+        for name, size in list(self._entries.items()):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            del self._entries[name]
+            self.total_bytes -= size
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+            logger.info(f"Evicted report artifact {name} ({size} bytes)")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "artifacts": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,155 @@
+"""
+Report Charts
+Chart payloads memoized by their input numbers; static charts are drawn with ReportLab alone
+"""
+import json
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from reportlab.graphics import renderSVG
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.charts.spider import SpiderChart
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.lib import colors
+
+INTERACTIVE = "interactive"  # plotly.js figures, imported only when first needed
+STATIC = "static"  # inline SVG, no plotly or matplotlib
+CHART_MODES = (INTERACTIVE, STATIC)
+
+CHART_CACHE_SIZE = 1024
+
+RESUME_CHART = "resume_chart"
+INTERVIEW_CHART = "interview_chart"
+EMOTION_CHART = "emotion_chart"
+
+RESUME_LABELS = ('Skills Match', 'Experience', 'Education', 'Quality')
+RESUME_FIELDS = ('skills_match', 'experience_score', 'education_score', 'quality_score')
+RESUME_COLORS = ('#3b82f6', '#10b981', '#f59e0b', '#ef4444')
+PIE_COLORS = ('#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#ec4899', '#14b8a6', '#64748b')
+
+TITLES = {
+    RESUME_CHART: "Resume Analysis Breakdown",
+    INTERVIEW_CHART: "Interview Performance Radar",
+    EMOTION_CHART: "Emotion Distribution",
+}
+
+# (labels, values) behind one chart; hashable, so it doubles as the cache key
+ChartInput = Tuple[Tuple[str, ...], Tuple[Any, ...]]
+
+
+def chart_inputs(candidate_data: Dict[str, Any]) -> Dict[str, ChartInput]:
+    """Numbers behind each chart the report shows, keyed by chart name"""
+    inputs = {}
+    if 'resume_analysis' in candidate_data:
+        resume_data = candidate_data['resume_analysis']
+        inputs[RESUME_CHART] = (RESUME_LABELS, tuple(resume_data.get(name, 0) for name in RESUME_FIELDS))
+    if 'interview_analysis' in candidate_data:
+        breakdown = candidate_data['interview_analysis'].get('category_breakdown', {})
+        inputs[INTERVIEW_CHART] = (tuple(breakdown), tuple(breakdown.values()))
+    if 'emotion_analysis' in candidate_data:
+        distribution = candidate_data['emotion_analysis'].get('emotion_distribution', {})
+        inputs[EMOTION_CHART] = (tuple(distribution), tuple(distribution.values()))
+    return inputs
+
+
+# ----------------------
+# Interactive (plotly.js)
+# ----------------------
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "tolist"):
+        # numpy arrays and scalars
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _figure_json(fig) -> str:
+    """Serialize a figure in one pass, safe to embed in a <script> block"""
+    return json.dumps(fig.to_plotly_json(), separators=(",", ":"), default=_json_default).replace("</", "<\\/")
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def interactive_chart(name: str, labels: Tuple[str, ...], values: Tuple[Any, ...]) -> str:
+    """Plotly figure JSON for one chart"""
+    import plotly.graph_objects as go  # deferred: only interactive HTML needs plotly
+
+    if name == RESUME_CHART:
+        fig = go.Figure(data=[go.Bar(x=list(labels), y=list(values), marker_color=list(RESUME_COLORS))])
+        fig.update_layout(title=TITLES[name], height=400)
+    elif name == INTERVIEW_CHART:
+        fig = go.Figure(data=[
+            go.Scatterpolar(
+                r=list(values),
+                theta=[label.replace('_', ' ').title() for label in labels],
+                fill='toself',
+                name='Interview Performance'
+            )
+        ])
+        fig.update_layout(title=TITLES[name], polar=dict(radialaxis=dict(visible=True, range=[0, 100])))
+    else:
+        fig = go.Figure(data=[go.Pie(labels=list(labels), values=list(values))])
+        fig.update_layout(title=TITLES[name])
+    return _figure_json(fig)
+
+
+# ----------------------
+# Static (ReportLab graphics)
+# ----------------------
+def chart_drawing(name: str, labels: Tuple[str, ...], values: Tuple[Any, ...],
+                  width: float = 400, height: float = 220) -> Drawing:
+    """Vector chart as a ReportLab Drawing; a flowable, so it embeds directly in a PDF story"""
+    drawing = Drawing(width, height)
+    drawing.add(String(width / 2, height - 14, TITLES[name], textAnchor='middle',
+                       fontName='Helvetica-Bold', fontSize=11))
+    numbers = [float(value or 0) for value in values]
+    plot_height = height - 50
+
+    if not numbers or not any(numbers):
+        drawing.add(String(width / 2, plot_height / 2, "No data available", textAnchor='middle',
+                           fontName='Helvetica', fontSize=9, fillColor=colors.grey))
+        return drawing
+
+    if name == RESUME_CHART:
+        chart = VerticalBarChart()
+        chart.x, chart.y, chart.width, chart.height = 40, 30, width - 60, plot_height - 10
+        chart.data = [numbers]
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.valueMax = max(100, max(numbers))
+        chart.categoryAxis.categoryNames = list(labels)
+        chart.categoryAxis.labels.fontSize = 8
+        chart.bars.strokeColor = None
+        for index, color in enumerate(RESUME_COLORS[:len(numbers)]):
+            chart.bars[(0, index)].fillColor = colors.HexColor(color)
+    elif name == INTERVIEW_CHART:
+        chart = SpiderChart()
+        chart.x, chart.y, chart.width, chart.height = (width - plot_height) / 2, 10, plot_height, plot_height
+        chart.data = [numbers]
+        chart.labels = [label.replace('_', ' ').title() for label in labels]
+        chart.strands[0].fillColor = colors.HexColor('#bfdbfe')
+        chart.strands[0].strokeColor = colors.HexColor('#1e40af')
+        chart.spokeLabels.fontSize = 8
+    else:
+        chart = Pie()
+        chart.x, chart.y, chart.width, chart.height = (width - plot_height) / 2, 10, plot_height, plot_height
+        chart.data = numbers
+        chart.labels = [str(label) for label in labels]
+        chart.slices.strokeColor = colors.white
+        chart.slices.fontSize = 8
+        for index in range(len(numbers)):
+            chart.slices[index].fillColor = colors.HexColor(PIE_COLORS[index % len(PIE_COLORS)])
+
+    drawing.add(chart)
+    return drawing
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def static_chart(name: str, labels: Tuple[str, ...], values: Tuple[Any, ...]) -> str:
+    """Inline SVG markup for one chart"""
+    svg = renderSVG.drawToString(chart_drawing(name, labels, values))
+    return svg[svg.index("<svg"):]  # drop the XML prolog so it can sit inside HTML
+
+
+def render_charts(candidate_data: Dict[str, Any], mode: str = INTERACTIVE) -> Dict[str, str]:
+    """Chart payloads for the HTML report: plotly JSON or SVG markup, by chart name"""
+    render = static_chart if mode == STATIC else interactive_chart
+    return {name: render(name, labels, values) for name, (labels, values) in chart_inputs(candidate_data).items()}
@@ -0,0 +1,81 @@
+"""
+Report Export Archives
+Incremental ZIP writing, so bulk exports stream to the client entry by entry
+"""
+import re
+import zipfile
+from typing import Iterator, Optional
+
+CHUNK_SIZE = 256 * 1024
+
+# Formats that are already compressed gain nothing from deflate
+STORED_EXTENSIONS = (".pdf", ".png", ".jpg", ".zip")
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that hands written bytes back to the caller"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def safe_name(name: str) -> str:
+    """Archive-safe file name component"""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)[:120] or "unnamed"
+
+
+class ZipStream:
+    """ZIP archive produced as a sequence of byte chunks
+
+    ``zipfile`` writes local headers with data descriptors when the output
+    cannot seek, so each entry can be emitted as soon as it is written and
+    only one read chunk is held in memory at a time.
+    """
+
+    def __init__(self, compression: int = zipfile.ZIP_DEFLATED):
+        self._sink = _ChunkSink()
+        self._zip = zipfile.ZipFile(self._sink, mode="w", compression=compression)
+
+    def add_file(self, arcname: str, path: str, compress_type: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the archive bytes for one file, read in chunks"""
+        if compress_type is None and arcname.lower().endswith(STORED_EXTENSIONS):
+            compress_type = zipfile.ZIP_STORED
+        info = zipfile.ZipInfo.from_file(path, arcname)
+        info.compress_type = self._zip.compression if compress_type is None else compress_type
+
+        with open(path, "rb") as source, self._zip.open(info, mode="w", force_zip64=True) as entry:
+            while True:
+                data = source.read(CHUNK_SIZE)
+                if not data:
+                    break
+                entry.write(data)
+                chunk = self._sink.drain()
+                if chunk:
+                    yield chunk
+        yield self._sink.drain()
+
+    def add_bytes(self, arcname: str, data: bytes) -> bytes:
+        self._zip.writestr(arcname, data)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """Central directory; the last chunk of the archive"""
+        self._zip.close()
+        return self._sink.drain()
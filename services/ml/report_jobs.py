@@ -0,0 +1,203 @@
+"""
+Report Rendering Jobs
+Process-pool job queue for report rendering with status tracking and priority lanes
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # a user waiting on a download
+    BULK = 1  # pre-rendering and exports
+
+
+@dataclass
+class ReportJob:
+    job_id: str
+    priority: int
+    status: str = QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    queued_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# ----------------------
+# Worker side
+# ----------------------
+_worker_generator = None
+
+
+def _render_in_worker(document: Dict[str, Any], fmt: str) -> str:
+    """Render one report format in a pool process, reusing that process's generator
+
+    Workers only write artifacts; the process owning the queue evicts, so
+    the disk budget is enforced once rather than per worker.
+    """
+    global _worker_generator
+    if _worker_generator is None:
+        from report_generator import ReportGenerator
+        _worker_generator = ReportGenerator(evict_artifacts=False)
+    return _worker_generator.render_report(document, fmt)
+
+
+# ----------------------
+# Queue
+# ----------------------
+class ReportJobQueue:
+    """Runs render jobs on a process pool, highest-priority lane first
+
+    At most ``max_workers`` jobs are handed to the pool at a time, so
+    queued jobs wait here rather than in the pool's own FIFO queue; an
+    interactive job submitted behind a long bulk export is started as soon
+    as a worker frees up. A job submitted again while still queued or running
+    returns the existing job, and a higher priority promotes it.
+    ``on_update`` is called with every status change (e.g. to persist it
+    where other workers can read it).
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        on_update: Optional[Callable[[ReportJob], None]] = None,
+        executor=None,
+        max_finished: int = 1000,
+    ):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.on_update = on_update
+        self._executor = executor
+        self._pending: List[Tuple[int, int, str]] = []  # (priority, sequence, job_id) heap
+        self._sequence = itertools.count()
+        self._jobs: Dict[str, ReportJob] = {}
+        self._calls: Dict[str, Tuple[Callable, tuple]] = {}
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._running = 0
+        # Finished jobs stay queryable until this many newer ones finish
+        self.max_finished = max_finished
+        self._finished: Deque[str] = deque()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, job_id: str, fn: Callable, *args, priority: int = Priority.BULK) -> ReportJob:
+        """Queue ``fn(*args)`` for the pool; ``fn`` and its arguments must be picklable"""
+        job = self._jobs.get(job_id)
+        if job is not None and job.status in (QUEUED, RUNNING):
+            if job.status == QUEUED and priority < job.priority:
+                job.priority = priority
+                heapq.heappush(self._pending, (priority, next(self._sequence), job_id))
+            return job
+
+        job = ReportJob(job_id=job_id, priority=priority)
+        self._jobs[job_id] = job
+        self._calls[job_id] = (fn, args)
+        self._futures[job_id] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._pending, (priority, next(self._sequence), job_id))
+        self._notify(job)
+        self._pump()
+        return job
+
+    def render(self, job_id: str, document: Dict[str, Any], fmt: str, priority: int = Priority.BULK) -> ReportJob:
+        """Queue rendering one format of a report document"""
+        return self.submit(job_id, _render_in_worker, document, fmt, priority=priority)
+
+    async def wait(self, job_id: str) -> Any:
+        """Result of a job, raising RuntimeError if it failed"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        future = self._futures.get(job_id)
+        if future is not None:
+            await asyncio.shield(future)
+        if job.status == FAILED:
+            raise RuntimeError(job.error)
+        return job.result
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _pump(self):
+        loop = asyncio.get_running_loop()
+        while self._running < self.max_workers and self._pending:
+            priority, _sequence, job_id = heapq.heappop(self._pending)
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED or priority != job.priority:
+                continue  # stale heap entry left behind by a promotion
+
+            fn, args = self._calls.pop(job_id)
+            job.status = RUNNING
+            job.started_at = datetime.now().isoformat()
+            self._running += 1
+            self._notify(job)
+
+            task = loop.run_in_executor(self.executor, fn, *args)
+            task.add_done_callback(lambda done, job=job: self._finish(job, done))
+
+    def _finish(self, job: ReportJob, done: asyncio.Future):
+        self._running -= 1
+        job.finished_at = datetime.now().isoformat()
+        error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+        if error is None:
+            job.status = DONE
+            job.result = done.result()
+        else:
+            job.status = FAILED
+            job.error = str(error) or type(error).__name__
+            logger.error(f"Report job {job.job_id} failed: {job.error}")
+
+        future = self._futures.get(job.job_id)
+        if future is not None and not future.done():
+            future.set_result(None)
+        self._notify(job)
+        self._retire(job.job_id)
+        self._pump()
+
+    def _retire(self, job_id: str):
+        self._finished.append(job_id)
+        while len(self._finished) > self.max_finished:
+            old_id = self._finished.popleft()
+            old_job = self._jobs.get(old_id)
+            if old_job is not None and old_job.status in (DONE, FAILED):
+                del self._jobs[old_id]
+                self._futures.pop(old_id, None)
+
+    def _notify(self, job: ReportJob):
+        if self.on_update is not None:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                logger.warning(f"Report job status update failed: {e}")
@@ -0,0 +1,180 @@
+"""
+Report Styles
+ReportLab styles, fonts and fixed-section flowables, built once per process and shared by every report
+"""
+import copy
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Mapping, Sequence, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Flowable, Paragraph, Spacer, TableStyle
+
+logger = logging.getLogger(__name__)
+
+# Built-in Type 1 fonts; REPORT_FONT_PATH (and REPORT_FONT_BOLD_PATH) swap in a TrueType
+# family, e.g. one that covers non-Latin candidate names
+DEFAULT_FONT = "Helvetica"
+DEFAULT_BOLD_FONT = "Helvetica-Bold"
+
+# (minimum score, label, colour) from best to worst
+SCORE_BANDS = (
+    (80, "EXCELLENT CANDIDATE", "#059669"),
+    (70, "GOOD CANDIDATE", "#3b82f6"),
+    (60, "AVERAGE CANDIDATE", "#f59e0b"),
+    (float("-inf"), "NEEDS IMPROVEMENT", "#ef4444"),
+)
+
+
+@dataclass(frozen=True)
+class ReportStyles:
+    """Shared paragraph and table styles; treat every style as read-only"""
+    font: str
+    bold_font: str
+    sheet: Mapping[str, ParagraphStyle]
+    title: ParagraphStyle
+    section: ParagraphStyle
+    body: ParagraphStyle
+    score: ParagraphStyle
+    basic_title: ParagraphStyle
+    score_bands: Tuple[Tuple[float, str, ParagraphStyle], ...]
+    info_table: TableStyle
+
+
+def _register_fonts() -> Tuple[str, str]:
+    regular_path = os.environ.get("REPORT_FONT_PATH")
+    if not regular_path:
+        return DEFAULT_FONT, DEFAULT_BOLD_FONT
+    try:
+        pdfmetrics.registerFont(TTFont("ReportSans", regular_path))
+        bold_path = os.environ.get("REPORT_FONT_BOLD_PATH")
+        if not bold_path:
+            return "ReportSans", "ReportSans"
+        pdfmetrics.registerFont(TTFont("ReportSans-Bold", bold_path))
+        return "ReportSans", "ReportSans-Bold"
+    except Exception as e:
+        logger.warning(f"Could not register report font {regular_path}: {e}")
+        return DEFAULT_FONT, DEFAULT_BOLD_FONT
+
+
+@lru_cache(maxsize=None)
+def get_report_styles() -> ReportStyles:
+    """Process-wide styles; fonts are registered on first use"""
+    font, bold_font = _register_fonts()
+    sample = getSampleStyleSheet()
+
+    score_bands = tuple(
+        (minimum, label, ParagraphStyle(
+            f'OverallScore{index}',
+            parent=sample['Heading2'],
+            fontName=bold_font,
+            fontSize=18,
+            textColor=colors.HexColor(color),
+            alignment=1,
+            spaceAfter=20
+        ))
+        for index, (minimum, label, color) in enumerate(SCORE_BANDS)
+    )
+
+    return ReportStyles(
+        font=font,
+        bold_font=bold_font,
+        sheet=MappingProxyType(dict(sample.byName)),
+        title=ParagraphStyle(
+            'CustomTitle',
+            parent=sample['Heading1'],
+            fontName=bold_font,
+            fontSize=24,
+            spaceAfter=30,
+            alignment=1,
+            textColor=colors.HexColor('#1e40af')
+        ),
+        section=ParagraphStyle(
+            'SectionHeader',
+            parent=sample['Heading2'],
+            fontName=bold_font,
+            fontSize=16,
+            spaceAfter=12,
+            spaceBefore=20,
+            textColor=colors.HexColor('#374151')
+        ),
+        body=ParagraphStyle(
+            'BodyText',
+            parent=sample['Normal'],
+            fontName=font,
+            fontSize=11,
+            spaceAfter=6,
+            leading=14
+        ),
+        score=ParagraphStyle(
+            'ScoreText',
+            parent=sample['Normal'],
+            fontName=font,
+            fontSize=12,
+            textColor=colors.HexColor('#059669'),
+            alignment=1
+        ),
+        basic_title=ParagraphStyle(
+            'BasicTitle',
+            parent=sample['Heading1'],
+            fontName=bold_font,
+            fontSize=18,
+            spaceAfter=30,
+            alignment=1
+        ),
+        score_bands=score_bands,
+        info_table=TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), bold_font),
+            ('FONTNAME', (0, 1), (-1, -1), font),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]),
+    )
+
+
+# ----------------------
+# Fixed-section flowables
+# ----------------------
+@lru_cache(maxsize=256)
+def _parsed_paragraph(text: str, style_name: str) -> Paragraph:
+    return Paragraph(text, getattr(get_report_styles(), style_name))
+
+
+def static_paragraph(text: str, style_name: str = "body") -> Paragraph:
+    """Paragraph for fixed text; the markup is parsed once and each call gets its own copy to lay out"""
+    return copy.copy(_parsed_paragraph(text, style_name))
+
+
+def header(title: str = "SmartHire AI Recruitment Report") -> List[Flowable]:
+    return [static_paragraph(title, "title"), Spacer(1, 20)]
+
+
+def section_heading(title: str) -> Paragraph:
+    return static_paragraph(title, "section")
+
+
+def score_block(score: float) -> Paragraph:
+    """Overall score line, coloured by band"""
+    for minimum, label, style in get_report_styles().score_bands:
+        if score >= minimum:
+            return Paragraph(f"{label} - Score: {score:.1f}%", style)
+
+
+def recommendation_list(recommendations: Sequence[str]) -> List[Flowable]:
+    if not recommendations:
+        return [static_paragraph("No specific recommendations available.")]
+    body = get_report_styles().body
+    elements: List[Flowable] = [static_paragraph("Key Recommendations:")]
+    elements.extend(Paragraph(f"{i}. {rec}", body) for i, rec in enumerate(recommendations, 1))
+    return elements
@@ -0,0 +1,297 @@
+"""
+Interview Session Lifecycle
+Keeps live sessions bounded in memory and moves idle or completed ones to compressed cold storage
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDLE_TIMEOUT = 3600
+DEFAULT_MAX_LIVE = 1000
+COLD_RETENTION_SECONDS = 30 * 24 * 3600
+
+
+# ----------------------
+# Cold storage
+# ----------------------
+class ColdStorage(ABC):
+    """Write-mostly store for evicted sessions; blobs are zlib-compressed here"""
+
+    @abstractmethod
+    def put(self, session_id: str, blob: bytes):
+        """Store an evicted session"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[bytes]:
+        """Stored blob, or None"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Remove an archived session"""
+
+
+class FileColdStorage(ColdStorage):
+    """One compressed file per session; files older than ``retention`` are pruned as new ones arrive"""
+
+    def __init__(self, directory: str, retention: float = COLD_RETENTION_SECONDS, prune_interval: float = 3600):
+        self.directory = directory
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        # Session ids come from clients, so never use them as file names directly
+        digest = hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.z")
+
+    def put(self, session_id: str, blob: bytes):
+        path = self._path(session_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(blob))
+        os.replace(tmp_path, path)
+        self._maybe_prune()
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        try:
+            with open(self._path(session_id), "rb") as f:
+                return zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+
+    def delete(self, session_id: str) -> bool:
+        try:
+            os.remove(self._path(session_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _maybe_prune(self):
+        now = time.time()
+        if now - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = now
+        cutoff = now - self.retention
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.endswith(".z") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class RedisColdStorage(ColdStorage):
+    """Compressed blobs under ``{prefix}:{session_id}`` with a retention TTL
+
+    Needs a client created with ``decode_responses=False``.
+    """
+
+    def __init__(self, client, prefix: str = "interview_cold", retention: int = COLD_RETENTION_SECONDS):
+        self.client = client
+        self.prefix = prefix
+        self.retention = retention
+
+    def put(self, session_id: str, blob: bytes):
+        self.client.set(f"{self.prefix}:{session_id}", zlib.compress(blob), ex=self.retention)
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        blob = self.client.get(f"{self.prefix}:{session_id}")
+        return zlib.decompress(blob) if blob is not None else None
+
+    def delete(self, session_id: str) -> bool:
+        return bool(self.client.delete(f"{self.prefix}:{session_id}"))
+
+
+def create_cold_storage(redis_client=None) -> ColdStorage:
+    """Redis when a (binary) client is given, else files under SESSION_COLD_DIR"""
+    if redis_client is not None:
+        return RedisColdStorage(redis_client)
+    directory = os.environ.get("SESSION_COLD_DIR", os.path.join(tempfile.gettempdir(), "smarthire_sessions"))
+    return FileColdStorage(directory)
+
+
+# ----------------------
+# Live sessions
+# ----------------------
+class SessionManager:
+    """Bounded map of live sessions with an index of the active ones
+
+    Sessions are kept in least-recently-used order. Those idle longer than
+    ``idle_timeout`` and the oldest beyond ``max_live`` are encoded and moved
+    to cold storage (or dropped without one); ``archive`` moves a session
+    explicitly, e.g. once its interview completes. Listing active sessions
+    walks the index only, so it costs O(active) rather than O(all sessions).
+
+    Callers that mutate a session in place call ``refresh`` afterwards so
+    the active index follows status changes. Without ``decode``, evicted
+    sessions are only ever written to cold storage, never read back.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[Any], bytes],
+        decode: Optional[Callable[[bytes], Any]] = None,
+        is_active: Callable[[Any], bool] = lambda session: True,
+        cold_storage: Optional[ColdStorage] = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_live: int = DEFAULT_MAX_LIVE,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.encode = encode
+        self.decode = decode
+        self.is_active = is_active
+        self.cold_storage = cold_storage
+        self.idle_timeout = idle_timeout
+        self.max_live = max_live
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._lock = threading.RLock()
+        # session_id -> (session, last_access), oldest access first
+        self._live: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._active: Dict[str, None] = {}  # insertion-ordered set
+        self._last_sweep = clock()
+        self.evicted = 0
+        self.archived = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._live
+
+    def put(self, session_id: str, session: Any):
+        with self._lock:
+            self._live[session_id] = (session, self.clock())
+            self._live.move_to_end(session_id)
+            self._index(session_id, session)
+            self._maintain()
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Live session (marking it used), or None if absent or evicted"""
+        with self._lock:
+            self._maybe_sweep()
+            entry = self._live.get(session_id)
+            if entry is None:
+                return None
+            self._live[session_id] = (entry[0], self.clock())
+            self._live.move_to_end(session_id)
+            return entry[0]
+
+    def refresh(self, session_id: str):
+        """Re-check a session's active status after an in-place change"""
+        with self._lock:
+            entry = self._live.get(session_id)
+            if entry is not None:
+                self._index(session_id, entry[0])
+
+    def restore(self, session_id: str) -> Optional[Any]:
+        """Live session, else bring an evicted but still active session back from cold storage"""
+        with self._lock:
+            session = self.get(session_id)
+            if session is not None:
+                return session
+            session = self.load_archived(session_id)
+            if session is None or not self.is_active(session):
+                return None
+            self.cold_storage.delete(session_id)
+            self.put(session_id, session)
+            return session
+
+    def load_archived(self, session_id: str) -> Optional[Any]:
+        """Read a session from cold storage without making it live"""
+        if self.cold_storage is None or self.decode is None:
+            return None
+        blob = self.cold_storage.get(session_id)
+        return self.decode(blob) if blob is not None else None
+
+    def archive(self, session_id: str) -> bool:
+        """Move a live session to cold storage now"""
+        with self._lock:
+            entry = self._live.pop(session_id, None)
+            self._active.pop(session_id, None)
+            if entry is None:
+                return False
+            self._to_cold(session_id, entry[0])
+            self.archived += 1
+        return True
+
+    def discard(self, session_id: str) -> bool:
+        """Drop a live session without archiving it"""
+        with self._lock:
+            self._active.pop(session_id, None)
+            return self._live.pop(session_id, None) is not None
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session from memory and cold storage"""
+        removed = self.discard(session_id)
+        if self.cold_storage is not None:
+            removed = self.cold_storage.delete(session_id) or removed
+        return removed
+
+    def active_items(self) -> Iterator[Tuple[str, Any]]:
+        """Live active sessions, in the order they became active"""
+        with self._lock:
+            items = [(session_id, self._live[session_id][0]) for session_id in self._active]
+        return iter(items)
+
+    def sweep(self) -> int:
+        """Evict sessions idle past the timeout; returns how many were evicted"""
+        with self._lock:
+            cutoff = self.clock() - self.idle_timeout
+            idle: List[Tuple[str, Any]] = []
+            for session_id, (session, last_access) in self._live.items():
+                if last_access > cutoff:
+                    break  # later entries were used more recently
+                idle.append((session_id, session))
+            for session_id, session in idle:
+                del self._live[session_id]
+                self._active.pop(session_id, None)
+                self._to_cold(session_id, session)
+            self._last_sweep = self.clock()
+            self.evicted += len(idle)
+        return len(idle)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "live": len(self._live),
+            "active": len(self._active),
+            "evicted": self.evicted,
+            "archived": self.archived,
+        }
+
+    def _index(self, session_id: str, session: Any):
+        if self.is_active(session):
+            self._active.setdefault(session_id, None)
+        else:
+            self._active.pop(session_id, None)
+
+    def _maybe_sweep(self):
+        if self.clock() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def _maintain(self):
+        self._maybe_sweep()
+        while len(self._live) > self.max_live:
+            session_id, (session, _last_access) = self._live.popitem(last=False)
+            self._active.pop(session_id, None)
+            self._to_cold(session_id, session)
+            self.evicted += 1
+
+    def _to_cold(self, session_id: str, session: Any):
+        if self.cold_storage is None:
+            return
+        try:
+            self.cold_storage.put(session_id, self.encode(session))
+        except Exception as e:
+            logger.error(f"Failed to move session {session_id} to cold storage: {e}")
@@ -0,0 +1,383 @@
+"""
+Interview Session Store
+Shares InterviewSession state across uvicorn workers with compact serialization and optimistic concurrency
+"""
+import base64
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from session_manager import ColdStorage, SessionManager, create_cold_storage
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# First byte of every stored blob names its encoding
+MSGPACK_FORMAT = b"M"
+JSON_FORMAT = b"J"
+
+SESSION_TTL_SECONDS = 24 * 3600
+
+
+class SessionConflictError(Exception):
+    """The session changed since it was read"""
+
+
+# ----------------------
+# Serialization
+# ----------------------
+def _to_plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, dict):
+        return {k: _to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(v) for v in value]
+    if hasattr(value, "item") and callable(value.item):
+        # numpy scalars from scoring code
+        return value.item()
+    return value
+
+
+def _from_plain(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+        if "__bytes__" in value:
+            return base64.b64decode(value["__bytes__"])
+        return {k: _from_plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_from_plain(v) for v in value]
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_document(document: Dict[str, Any]) -> bytes:
+    """Serialize a dict of plain values and datetimes, preferring msgpack"""
+    plain = _to_plain(document)
+    if MSGPACK_AVAILABLE:
+        return MSGPACK_FORMAT + msgpack.packb(plain, use_bin_type=True)
+    return JSON_FORMAT + json.dumps(plain, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def decode_document(blob: bytes) -> Dict[str, Any]:
+    encoding, payload = blob[:1], blob[1:]
+    if encoding == MSGPACK_FORMAT:
+        plain = msgpack.unpackb(payload, raw=False)
+    elif encoding == JSON_FORMAT:
+        plain = json.loads(payload)
+    else:
+        raise ValueError(f"Unknown session encoding {encoding!r}")
+    return _from_plain(plain)
+
+
+def encode_session(session: Any) -> bytes:
+    """Serialize a session dataclass"""
+    return encode_document({f.name: getattr(session, f.name) for f in dataclasses.fields(session)})
+
+
+def decode_session(blob: bytes, session_cls: Type[T]) -> T:
+    known = {f.name for f in dataclasses.fields(session_cls)}
+    return session_cls(**{k: v for k, v in decode_document(blob).items() if k in known})
+
+
+# ----------------------
+# Stores
+# ----------------------
+class SessionStore(ABC):
+    """Versioned session storage; every successful save bumps the version
+
+    Finished sessions can be ``archive``d: moved out of the live store into
+    cold storage, from where ``load_archived`` still reads them.
+    """
+
+    def __init__(self, session_cls: Type, cold_storage: Optional[ColdStorage] = None):
+        self.session_cls = session_cls
+        self.cold_storage = cold_storage
+
+    @abstractmethod
+    def load_raw(self, session_id: str) -> Optional[Tuple[bytes, int]]:
+        """Stored blob and version, or None"""
+
+    @abstractmethod
+    def version(self, session_id: str) -> Optional[int]:
+        """Current version without transferring the session"""
+
+    @abstractmethod
+    def store_raw(self, session_id: str, blob: bytes, expected_version: int) -> int:
+        """Write if the stored version equals `expected_version` (0 = must not exist); returns the new version"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Remove a session"""
+
+    def get(self, session_id: str) -> Optional[Tuple[Any, int]]:
+        loaded = self.load_raw(session_id)
+        if loaded is None:
+            return None
+        blob, version = loaded
+        return decode_session(blob, self.session_cls), version
+
+    def create(self, session: Any) -> int:
+        return self.store_raw(session.session_id, encode_session(session), 0)
+
+    def save(self, session: Any, expected_version: int) -> int:
+        return self.store_raw(session.session_id, encode_session(session), expected_version)
+
+    def update(self, session_id: str, mutate: Callable[[Any], T], retries: int = 5) -> Tuple[T, Any]:
+        """Read-modify-write with optimistic concurrency
+
+        `mutate` is re-run against fresh state whenever another worker saved
+        the session in between; it returns the value passed back to the caller.
+        Raises KeyError if the session does not exist.
+        """
+        for _attempt in range(retries):
+            loaded = self.get(session_id)
+            if loaded is None:
+                raise KeyError(session_id)
+            session, version = loaded
+            result = mutate(session)
+            try:
+                self.save(session, version)
+                return result, session
+            except SessionConflictError:
+                logger.info(f"Session {session_id} changed concurrently, retrying")
+        raise SessionConflictError(f"Session {session_id} kept changing after {retries} attempts")
+
+    def archive(self, session_id: str) -> bool:
+        """Move a session to cold storage; without one it stays live until it expires"""
+        if self.cold_storage is None:
+            return False
+        loaded = self.load_raw(session_id)
+        if loaded is None:
+            return False
+        self.cold_storage.put(session_id, loaded[0])
+        return self.delete(session_id)
+
+    def load_archived(self, session_id: str) -> Optional[Any]:
+        if self.cold_storage is None:
+            return None
+        blob = self.cold_storage.get(session_id)
+        return decode_session(blob, self.session_cls) if blob is not None else None
+
+
+class InMemorySessionStore(SessionStore):
+    """Single-process stand-in; stores serialized blobs so callers never share mutable state
+
+    Sessions expire after ``ttl`` seconds unused, like the Redis store's key
+    TTL, and at most ``max_sessions`` are kept; expired and overflowing
+    sessions go to cold storage.
+    """
+
+    def __init__(self, session_cls: Type, cold_storage: Optional[ColdStorage] = None,
+                 ttl: int = SESSION_TTL_SECONDS, max_sessions: int = 10000):
+        super().__init__(session_cls, cold_storage)
+        self._lock = threading.Lock()
+        # session_id -> (blob, version); cold copies hold just the blob and are never revived
+        # into the live map, so a version number is never reused for different content
+        self._data = SessionManager(
+            encode=lambda entry: entry[0],
+            cold_storage=cold_storage,
+            idle_timeout=ttl,
+            max_live=max_sessions,
+        )
+
+    def load_raw(self, session_id: str) -> Optional[Tuple[bytes, int]]:
+        with self._lock:
+            return self._data.get(session_id)
+
+    def version(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            stored = self._data.get(session_id)
+            return stored[1] if stored else None
+
+    def store_raw(self, session_id: str, blob: bytes, expected_version: int) -> int:
+        with self._lock:
+            stored = self._data.get(session_id)
+            current = stored[1] if stored else 0
+            if current != expected_version:
+                raise SessionConflictError(f"Session {session_id} is at version {current}, expected {expected_version}")
+            self._data.put(session_id, (blob, current + 1))
+            return current + 1
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._data.discard(session_id)
+
+    def archive(self, session_id: str) -> bool:
+        with self._lock:
+            return self._data.archive(session_id)
+
+
+# Compare-and-set: KEYS[1] hash, ARGV = expected version, blob, ttl
+_CAS_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'v') or '0')
+if current ~= tonumber(ARGV[1]) then
+    return -current - 1
+end
+redis.call('HSET', KEYS[1], 'v', current + 1, 'd', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return current + 1
+"""
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions as Redis hashes {v: version, d: blob}, written with an atomic compare-and-set script
+
+    Needs a client created with ``decode_responses=False`` since blobs are binary.
+    """
+
+    def __init__(self, session_cls: Type, client, prefix: str = "interview_session", ttl: int = SESSION_TTL_SECONDS,
+                 cold_storage: Optional[ColdStorage] = None):
+        super().__init__(session_cls, cold_storage)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self._cas = client.register_script(_CAS_SCRIPT)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}:{session_id}"
+
+    def load_raw(self, session_id: str) -> Optional[Tuple[bytes, int]]:
+        version, blob = self.client.hmget(self._key(session_id), "v", "d")
+        if blob is None:
+            return None
+        return blob, int(version)
+
+    def version(self, session_id: str) -> Optional[int]:
+        version = self.client.hget(self._key(session_id), "v")
+        return int(version) if version is not None else None
+
+    def store_raw(self, session_id: str, blob: bytes, expected_version: int) -> int:
+        result = int(self._cas(keys=[self._key(session_id)], args=[expected_version, blob, self.ttl]))
+        if result < 0:
+            raise SessionConflictError(
+                f"Session {session_id} is at version {-result - 1}, expected {expected_version}"
+            )
+        return result
+
+    def delete(self, session_id: str) -> bool:
+        return bool(self.client.delete(self._key(session_id)))
+
+
+class CachedSessionStore(SessionStore):
+    """Per-worker LRU read-through cache in front of another store
+
+    A cached blob is reused only while the backing version still matches,
+    which costs a version lookup instead of transferring the session;
+    ``max_staleness`` seconds lets hot sessions skip even that check.
+    """
+
+    def __init__(self, backend: SessionStore, max_entries: int = 256, max_staleness: float = 0.0):
+        super().__init__(backend.session_cls, backend.cold_storage)
+        self.backend = backend
+        self.max_entries = max_entries
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        # session_id -> (blob, version, validated_at)
+        self._cache: "OrderedDict[str, Tuple[bytes, int, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def load_raw(self, session_id: str) -> Optional[Tuple[bytes, int]]:
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is not None:
+                self._cache.move_to_end(session_id)
+
+        now = time.monotonic()
+        if cached is not None:
+            blob, version, validated_at = cached
+            if now - validated_at <= self.max_staleness or self.backend.version(session_id) == version:
+                self.hits += 1
+                self._remember(session_id, blob, version, now)
+                return blob, version
+
+        self.misses += 1
+        loaded = self.backend.load_raw(session_id)
+        if loaded is None:
+            self._forget(session_id)
+            return None
+        self._remember(session_id, loaded[0], loaded[1], now)
+        return loaded
+
+    def version(self, session_id: str) -> Optional[int]:
+        return self.backend.version(session_id)
+
+    def store_raw(self, session_id: str, blob: bytes, expected_version: int) -> int:
+        try:
+            version = self.backend.store_raw(session_id, blob, expected_version)
+        except SessionConflictError:
+            self._forget(session_id)
+            raise
+        self._remember(session_id, blob, version, time.monotonic())
+        return version
+
+    def delete(self, session_id: str) -> bool:
+        self._forget(session_id)
+        return self.backend.delete(session_id)
+
+    def archive(self, session_id: str) -> bool:
+        self._forget(session_id)
+        return self.backend.archive(session_id)
+
+    def _remember(self, session_id: str, blob: bytes, version: int, validated_at: float):
+        with self._lock:
+            self._cache[session_id] = (blob, version, validated_at)
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _forget(self, session_id: str):
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+
+def create_session_store(session_cls: Type, cache_entries: int = 256) -> SessionStore:
+    """Store selected by SESSION_STORE_BACKEND (redis | memory); falls back to memory if Redis is unreachable
+
+    Archived sessions go to Redis alongside live ones, or to files under
+    SESSION_COLD_DIR with the in-memory store.
+    """
+    backend_name = os.environ.get("SESSION_STORE_BACKEND", "redis")
+    backend: SessionStore
+
+    if backend_name == "redis":
+        try:
+            import redis
+            client = redis.Redis(
+                host='localhost',
+                port=6379,
+                db=0,
+                decode_responses=False,
+                socket_connect_timeout=1,
+            )
+            client.ping()
+            backend = RedisSessionStore(session_cls, client, cold_storage=create_cold_storage(client))
+            logger.info("Interview sessions stored in Redis")
+        except Exception as e:
+            logger.warning(f"Redis session store unavailable ({e}); using in-memory sessions (single worker only)")
+            backend = InMemorySessionStore(session_cls, create_cold_storage())
+    else:
+        backend = InMemorySessionStore(session_cls, create_cold_storage())
+
+    return CachedSessionStore(backend, max_entries=cache_entries)
@@ -0,0 +1,51 @@
+"""
+Interview Chatbot Tests
+Question draws stay pending until answered, so repeated requests don't use up the bank
+"""
+from chatbot_interviewer import AIInterviewChatbot, InterviewSession, parse_question_id
+from question_bank import QuestionBank, is_asked
+from session_store import InMemorySessionStore
+
+
+def make_bank() -> QuestionBank:
+    return QuestionBank([
+        {"id": i, "role": "general", "category": category, "difficulty": "medium",
+         "question": f"{category} question {i}", "keywords": []}
+        for i, category in enumerate(["technical", "technical", "behavioral", "behavioral"])
+    ])
+
+
+def test_parse_question_id():
+    assert parse_question_id("4_problem_solving_q12") == (4, "problem_solving", 12)
+    assert parse_question_id("not-a-question") is None
+
+
+def test_repeated_requests_return_the_pending_question():
+    chatbot = AIInterviewChatbot(make_bank())
+    store = InMemorySessionStore(InterviewSession)
+    session = chatbot.initiate_interview("candidate_1", "general")
+    store.create(session)
+
+    first, _session = store.update(session.session_id, chatbot.get_next_question)
+    version = store.version(session.session_id)
+
+    # A refresh finds the pending question without writing; a retried draw returns it too
+    stored = store.get(session.session_id)[0]
+    assert chatbot.pending_question(stored) == first
+    assert chatbot.get_next_question(stored) == first
+    assert stored.questions_asked == [first["question_id"]]
+    assert stored.asked_question_ids == b""
+    assert store.version(session.session_id) == version
+
+
+def test_answer_marks_the_question_asked():
+    chatbot = AIInterviewChatbot(make_bank())
+    session = chatbot.initiate_interview("candidate_1", "general")
+    question = chatbot.get_next_question(session)
+
+    response = chatbot.process_answer(session, "I designed and tested the service", question["question_id"])
+
+    bank_id = parse_question_id(question["question_id"])[2]
+    assert is_asked(session.asked_question_ids, bank_id)
+    assert response["next_question"]["question_id"] != question["question_id"]
+    assert session.questions_asked == [question["question_id"], response["next_question"]["question_id"]]
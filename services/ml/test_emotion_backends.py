@@ -0,0 +1,121 @@
+"""
+Emotion Backend Tests
+ONNX Runtime inference, INT8 and Keras parity and backend selection on a small fixture model
+"""
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from onnx import TensorProto, helper, numpy_helper
+
+from emotion_backends import INPUT_SHAPE, OnnxEmotionBackend, load_backend, parity, quantize_int8
+from emotion_stats import EMOTION_LABELS
+
+
+def fixture_faces(count: int, seed: int = 1) -> np.ndarray:
+    return np.random.default_rng(seed).random((count,) + INPUT_SHAPE, dtype=np.float32)
+
+
+def build_fixture_model(path, seed: int = 0) -> str:
+    """A small CNN with the production model's input and output layout (N x 48 x 48 x 1 -> N x 7)"""
+    rng = np.random.default_rng(seed)
+    weights = {
+        "W1": rng.normal(0, 0.3, (16, 1, 3, 3)), "B1": np.zeros(16),
+        "W2": rng.normal(0, 0.3, (32, 16, 3, 3)), "B2": np.zeros(32),
+        "W3": rng.normal(0, 0.5, (32, len(EMOTION_LABELS))), "B3": np.zeros(len(EMOTION_LABELS)),
+    }
+    nodes = [
+        helper.make_node("Transpose", ["face"], ["nchw"], perm=[0, 3, 1, 2]),
+        helper.make_node("Conv", ["nchw", "W1", "B1"], ["conv1"], pads=[1, 1, 1, 1]),
+        helper.make_node("Relu", ["conv1"], ["relu1"]),
+        helper.make_node("MaxPool", ["relu1"], ["pool1"], kernel_shape=[2, 2], strides=[2, 2]),
+        helper.make_node("Conv", ["pool1", "W2", "B2"], ["conv2"], pads=[1, 1, 1, 1]),
+        helper.make_node("Relu", ["conv2"], ["relu2"]),
+        helper.make_node("GlobalAveragePool", ["relu2"], ["pooled"]),
+        helper.make_node("Flatten", ["pooled"], ["features"]),
+        helper.make_node("Gemm", ["features", "W3", "B3"], ["logits"]),
+        helper.make_node("Softmax", ["logits"], ["probs"], axis=1),
+    ]
+    graph = helper.make_graph(
+        nodes, "emotion_fixture",
+        [helper.make_tensor_value_info("face", TensorProto.FLOAT, ["N", *INPUT_SHAPE])],
+        [helper.make_tensor_value_info("probs", TensorProto.FLOAT, ["N", len(EMOTION_LABELS)])],
+        [numpy_helper.from_array(value.astype(np.float32), name) for name, value in weights.items()],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return str(path)
+
+
+@pytest.fixture
+def onnx_model(tmp_path):
+    return build_fixture_model(tmp_path / "emotion_model.onnx")
+
+
+def test_onnx_backend_returns_probabilities(onnx_model):
+    backend = OnnxEmotionBackend(onnx_model)
+    predictions = backend.predict(fixture_faces(5))
+
+    assert predictions.shape == (5, len(EMOTION_LABELS))
+    assert np.allclose(predictions.sum(axis=1), 1.0, atol=1e-5)
+    # Batched and single-face calls agree
+    assert np.allclose(backend.predict(fixture_faces(5)[:1]), predictions[:1], atol=1e-6)
+
+
+def test_static_int8_model_follows_fp32(onnx_model, tmp_path):
+    calibration = fixture_faces(64, seed=2)
+    int8_path = quantize_int8(onnx_model, str(tmp_path / "emotion_model.int8.onnx"), calibration)
+
+    faces = fixture_faces(64, seed=3)
+    check = parity(OnnxEmotionBackend(onnx_model).predict(faces), OnnxEmotionBackend(int8_path).predict(faces))
+    assert check["max_abs_diff"] < 0.05
+    assert check["top1_agreement"] >= 0.9
+
+
+def test_onnx_matches_keras(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    pytest.importorskip("tf2onnx")
+    from emotion_backends import KerasEmotionBackend, convert_to_onnx
+
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(INPUT_SHAPE),
+        tf.keras.layers.Conv2D(8, 3, activation="relu"),
+        tf.keras.layers.MaxPooling2D(),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(len(EMOTION_LABELS), activation="softmax"),
+    ])
+    keras_path = str(tmp_path / "emotion_model.h5")
+    model.save(keras_path)
+    onnx_path = convert_to_onnx(keras_path, str(tmp_path / "emotion_model.onnx"))
+
+    # An FP32 conversion should reproduce the Keras outputs on any input
+    faces = fixture_faces(16)
+    check = parity(KerasEmotionBackend(keras_path).predict(faces), OnnxEmotionBackend(onnx_path).predict(faces))
+    assert check["max_abs_diff"] < 1e-4
+    assert check["top1_agreement"] == 1.0
+
+
+def test_load_backend_prefers_onnx(onnx_model, monkeypatch):
+    monkeypatch.setenv("EMOTION_ONNX_MODEL", onnx_model)
+    backend = load_backend("auto")
+    assert isinstance(backend, OnnxEmotionBackend)
+    assert backend.model_path == onnx_model
+
+
+def test_load_backend_returns_none_without_models(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMOTION_ONNX_MODEL", str(tmp_path / "missing.onnx"))
+    monkeypatch.setenv("EMOTION_KERAS_MODEL", str(tmp_path / "missing.h5"))
+    assert load_backend("auto") is None
+    assert load_backend("onnx") is None
+
+
+def test_benchmark_agreement_gate_needs_images():
+    from emotion_benchmark import main
+
+    with pytest.raises(SystemExit) as exited:
+        main(["--min-agreement", "0.9"])
+    assert exited.value.code == 2